@@ -1,5 +1,6 @@
 import os
 from functools import lru_cache
+from typing import Literal, Optional, cast
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
@@ -12,6 +13,36 @@ class Settings(BaseModel):
     echo_sql: bool = Field(default=False)
     auth_secret: str = Field(..., description="Bearer token secret (required)")
     auth_algorithm: str = Field(default="HS256")
+    pending_expiry_minutes: int = Field(default=30, ge=1)
+    sweeper_enabled: bool = Field(default=False)
+    sweeper_batch_size: int = Field(default=200, ge=1)
+    sweeper_rate_per_second: float = Field(default=500.0, gt=0)
+    sweeper_interval_seconds: float = Field(default=30.0, gt=0)
+    hold_default_ttl_minutes: int = Field(default=10, ge=1)
+    hold_max_ttl_minutes: int = Field(default=30, ge=1)
+    hold_sweeper_enabled: bool = Field(default=False)
+    hold_sweeper_batch_size: int = Field(default=200, ge=1)
+    hold_sweeper_interval_seconds: float = Field(default=60.0, gt=0)
+    audit_log_path: Optional[str] = Field(default=None)
+    audit_fsync: bool = Field(default=False)
+    audit_batch_max: int = Field(default=512, ge=1)
+    audit_max_pending: int = Field(default=10_000, ge=1)
+    audit_ack_timeout_seconds: float = Field(default=5.0, gt=0)
+    audit_segment_dir: Optional[str] = Field(default=None)
+    audit_segment_max_bytes: int = Field(default=64 * 1024 * 1024, ge=1)
+    audit_segment_max_age_seconds: float = Field(default=3600.0, gt=0)
+    audit_segment_compression: Literal["none", "gzip", "zstd"] = Field(default="gzip")
+    audit_relay_batch_size: int = Field(default=500, ge=1)
+    audit_relay_interval_seconds: float = Field(default=0.5, gt=0)
+    stream_max_pending: int = Field(default=64, ge=1)
+    stream_heartbeat_seconds: float = Field(default=15.0, gt=0)
+    invalidation_bus_dir: Optional[str] = Field(default=None)
+    policy_cache_ttl_seconds: float = Field(default=60.0, gt=0)
+    availability_snapshot_path: Optional[str] = Field(default=None)
+    availability_snapshot_shops: tuple[int, ...] = Field(default=())
+    availability_snapshot_slots_per_shop: int = Field(default=4096, ge=1)
+    availability_snapshot_horizon_days: int = Field(default=14, ge=1)
+    availability_snapshot_refresh_seconds: float = Field(default=5.0, gt=0)
 
 
 @lru_cache
@@ -24,4 +55,82 @@ def get_settings() -> Settings:
         echo_sql=bool(int(os.getenv("ECHO_SQL", "0"))),
         auth_secret=auth_secret,
         auth_algorithm=os.getenv("AUTH_ALGORITHM", Settings.model_fields["auth_algorithm"].default),
+        pending_expiry_minutes=int(
+            os.getenv("PENDING_EXPIRY_MINUTES", Settings.model_fields["pending_expiry_minutes"].default)
+        ),
+        sweeper_enabled=bool(int(os.getenv("SWEEPER_ENABLED", "0"))),
+        sweeper_batch_size=int(os.getenv("SWEEPER_BATCH_SIZE", Settings.model_fields["sweeper_batch_size"].default)),
+        sweeper_rate_per_second=float(
+            os.getenv("SWEEPER_RATE_PER_SECOND", Settings.model_fields["sweeper_rate_per_second"].default)
+        ),
+        sweeper_interval_seconds=float(
+            os.getenv("SWEEPER_INTERVAL_SECONDS", Settings.model_fields["sweeper_interval_seconds"].default)
+        ),
+        hold_default_ttl_minutes=int(
+            os.getenv("HOLD_DEFAULT_TTL_MINUTES", Settings.model_fields["hold_default_ttl_minutes"].default)
+        ),
+        hold_max_ttl_minutes=int(
+            os.getenv("HOLD_MAX_TTL_MINUTES", Settings.model_fields["hold_max_ttl_minutes"].default)
+        ),
+        hold_sweeper_enabled=bool(int(os.getenv("HOLD_SWEEPER_ENABLED", "0"))),
+        hold_sweeper_batch_size=int(
+            os.getenv("HOLD_SWEEPER_BATCH_SIZE", Settings.model_fields["hold_sweeper_batch_size"].default)
+        ),
+        hold_sweeper_interval_seconds=float(
+            os.getenv("HOLD_SWEEPER_INTERVAL_SECONDS", Settings.model_fields["hold_sweeper_interval_seconds"].default)
+        ),
+        audit_log_path=os.getenv("AUDIT_LOG_PATH") or None,
+        audit_fsync=bool(int(os.getenv("AUDIT_FSYNC", "0"))),
+        audit_batch_max=int(os.getenv("AUDIT_BATCH_MAX", Settings.model_fields["audit_batch_max"].default)),
+        audit_max_pending=int(os.getenv("AUDIT_MAX_PENDING", Settings.model_fields["audit_max_pending"].default)),
+        audit_ack_timeout_seconds=float(
+            os.getenv("AUDIT_ACK_TIMEOUT_SECONDS", Settings.model_fields["audit_ack_timeout_seconds"].default)
+        ),
+        audit_segment_dir=os.getenv("AUDIT_SEGMENT_DIR") or None,
+        audit_segment_max_bytes=int(
+            os.getenv("AUDIT_SEGMENT_MAX_BYTES", Settings.model_fields["audit_segment_max_bytes"].default)
+        ),
+        audit_segment_max_age_seconds=float(
+            os.getenv("AUDIT_SEGMENT_MAX_AGE_SECONDS", Settings.model_fields["audit_segment_max_age_seconds"].default)
+        ),
+        audit_segment_compression=cast(
+            Literal["none", "gzip", "zstd"],
+            os.getenv("AUDIT_SEGMENT_COMPRESSION", Settings.model_fields["audit_segment_compression"].default),
+        ),
+        audit_relay_batch_size=int(
+            os.getenv("AUDIT_RELAY_BATCH_SIZE", Settings.model_fields["audit_relay_batch_size"].default)
+        ),
+        audit_relay_interval_seconds=float(
+            os.getenv("AUDIT_RELAY_INTERVAL_SECONDS", Settings.model_fields["audit_relay_interval_seconds"].default)
+        ),
+        stream_max_pending=int(os.getenv("STREAM_MAX_PENDING", Settings.model_fields["stream_max_pending"].default)),
+        stream_heartbeat_seconds=float(
+            os.getenv("STREAM_HEARTBEAT_SECONDS", Settings.model_fields["stream_heartbeat_seconds"].default)
+        ),
+        invalidation_bus_dir=os.getenv("INVALIDATION_BUS_DIR") or None,
+        policy_cache_ttl_seconds=float(
+            os.getenv("POLICY_CACHE_TTL_SECONDS", Settings.model_fields["policy_cache_ttl_seconds"].default)
+        ),
+        availability_snapshot_path=os.getenv("AVAILABILITY_SNAPSHOT_PATH") or None,
+        availability_snapshot_shops=tuple(
+            int(shop_id) for shop_id in os.getenv("AVAILABILITY_SNAPSHOT_SHOPS", "").split(",") if shop_id.strip()
+        ),
+        availability_snapshot_slots_per_shop=int(
+            os.getenv(
+                "AVAILABILITY_SNAPSHOT_SLOTS_PER_SHOP",
+                Settings.model_fields["availability_snapshot_slots_per_shop"].default,
+            )
+        ),
+        availability_snapshot_horizon_days=int(
+            os.getenv(
+                "AVAILABILITY_SNAPSHOT_HORIZON_DAYS",
+                Settings.model_fields["availability_snapshot_horizon_days"].default,
+            )
+        ),
+        availability_snapshot_refresh_seconds=float(
+            os.getenv(
+                "AVAILABILITY_SNAPSHOT_REFRESH_SECONDS",
+                Settings.model_fields["availability_snapshot_refresh_seconds"].default,
+            )
+        ),
     )
@@ -6,6 +6,14 @@ class DuplicateReservationError(Exception):
     pass
 
 
+class OverlappingReservationError(DuplicateReservationError):
+    """The user already holds an active reservation whose slot overlaps in time."""
+
+
+class ActiveReservationConflictError(DuplicateReservationError):
+    """The active-reservation unique key rejected the flush; the transaction must be rolled back."""
+
+
 class CapacityError(Exception):
     pass
 
@@ -20,3 +28,11 @@ class CancelNotAllowedError(Exception):
 
 class RescheduleNotAllowedError(Exception):
     pass
+
+
+class HoldNotFoundError(Exception):
+    pass
+
+
+class WaitlistNotAllowedError(Exception):
+    pass
@@ -1,14 +1,35 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Iterable, Protocol
+from typing import Iterable, Protocol, Sequence
 
-from ..models import Reservation, ReservationStatus, Slot, SlotStatus
+from ..models import (
+    AuditOutbox,
+    ChangeLog,
+    Reservation,
+    ReservationStatus,
+    SeatHold,
+    ShopPolicy,
+    Slot,
+    SlotStatus,
+    WaitlistEntry,
+)
+from .services import (
+    AvailabilityBucket,
+    BookingPolicy,
+    ChangeEvent,
+    OccupancyColumns,
+    ReservationRef,
+    ShopReservationCursor,
+    ShopReservationRow,
+)
 
 
 class SlotRepository(Protocol):
     async def get_for_update(self, slot_id: int) -> Slot | None: ...
 
+    async def lock_many_skip_locked(self, slot_ids: Sequence[int]) -> list[Slot]: ...
+
     async def create(
         self,
         *,
@@ -28,6 +49,63 @@ class SlotRepository(Protocol):
         seat_id: int | None,
     ) -> Iterable[tuple[Slot, int]]: ...
 
+    async def list_with_reserved_for_shops(
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> Iterable[tuple[Slot, int]]: ...
+
+    async def list_overlapping_with_reserved(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> Iterable[tuple[Slot, int]]: ...
+
+    async def next_available(
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> Iterable[tuple[Slot, int]]: ...
+
+    async def best_fit_seat_slots(
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> list[int]: ...
+
+    async def availability_buckets(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> list[AvailabilityBucket]: ...
+
+    async def bulk_update_status(
+        self,
+        *,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+        status: SlotStatus,
+    ) -> list[int]: ...
+
 
 class ReservationRepository(Protocol):
     async def user_has_active(self, slot_id: int, user_id: int) -> bool: ...
@@ -55,3 +133,127 @@ class ReservationRepository(Protocol):
     async def cancel(self, reservation: Reservation) -> Reservation: ...
 
     async def reschedule(self, reservation: Reservation) -> Reservation: ...
+
+    async def resize(self, reservation: Reservation) -> Reservation: ...
+
+    async def list_active_in_range(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+    ) -> list[tuple[Reservation, Slot]]: ...
+
+    async def lock_active_for_shop(
+        self,
+        shop_id: int,
+        *,
+        slot_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+        seat_id: int | None,
+    ) -> list[ReservationRef]: ...
+
+    async def list_overlapping_party(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> list[tuple[datetime, datetime, int]]: ...
+
+    async def lock_user(self, user_id: int) -> None: ...
+
+    async def user_has_overlapping(
+        self,
+        shop_id: int,
+        user_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> bool: ...
+
+    async def bulk_cancel(self, reservation_ids: Sequence[int]) -> int: ...
+
+    async def lock_expired_pending(self, created_before: datetime, limit: int) -> list[ReservationRef]: ...
+
+    async def list_shop_page(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        statuses: Sequence[ReservationStatus],
+        after: ShopReservationCursor | None,
+        slot_limit: int,
+    ) -> tuple[list[ShopReservationRow], ShopReservationCursor | None]: ...
+
+
+class HoldRepository(Protocol):
+    async def create(
+        self,
+        *,
+        slot: Slot,
+        user_id: int,
+        party_size: int,
+        expires_at: datetime,
+    ) -> SeatHold: ...
+
+    async def get_for_update(self, hold_id: int, user_id: int) -> SeatHold | None: ...
+
+    async def consume(self, slot: Slot, hold: SeatHold) -> None: ...
+
+    async def reclaim_expired(self, slot: Slot, now: datetime) -> int: ...
+
+    async def slots_with_expired(self, now: datetime, limit: int) -> list[int]: ...
+
+
+class WaitlistRepository(Protocol):
+    async def add(self, *, slot_id: int, user_id: int, party_size: int) -> WaitlistEntry: ...
+
+    async def earliest_fitting(self, slot_id: int, max_party_size: int) -> WaitlistEntry | None: ...
+
+    async def remove(self, entry: WaitlistEntry) -> None: ...
+
+    async def remove_for_user(self, entry_id: int, user_id: int) -> bool: ...
+
+
+class AuditOutboxRepository(Protocol):
+    async def add_many(self, payloads: Sequence[str]) -> None: ...
+
+    async def lock_unshipped(self, limit: int) -> list[AuditOutbox]: ...
+
+    async def mark_shipped(self, ids: Sequence[int], shipped_at: datetime) -> int: ...
+
+
+class ChangeLogRepository(Protocol):
+    async def append(self, events: Sequence[ChangeEvent]) -> dict[int, int]: ...
+
+    async def last_seq(self, shop_id: int) -> int: ...
+
+    async def list_since(self, shop_id: int, since: int, limit: int) -> list[ChangeLog]: ...
+
+
+class ShopPolicyRepository(Protocol):
+    async def get(self, shop_id: int) -> ShopPolicy | None: ...
+
+    async def get_for_update(self, shop_id: int) -> ShopPolicy | None: ...
+
+    async def get_booking_policy(self, shop_id: int) -> BookingPolicy: ...
+
+    async def save(self, shop_id: int, policy: BookingPolicy, *, window_capacity: int | None) -> ShopPolicy: ...
+
+
+class DashboardRepository(Protocol):
+    async def occupancy_columns(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> OccupancyColumns: ...
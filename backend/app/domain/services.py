@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Sequence
 
-from ..models import SlotStatus
-from .errors import CapacityError, DuplicateReservationError, SlotNotOpenError
+from ..models import CapacityMode, ReservationStatus, SlotStatus
+from .errors import CapacityError, DuplicateReservationError, OverlappingReservationError, SlotNotOpenError
 
 
 @dataclass(frozen=True)
@@ -10,21 +12,259 @@ class SlotSnapshot:
     capacity: int
     reserved: int
     user_has_active_reservation: bool
+    held: int = 0
+    # Time-window capacity mode: most guests present at once over the slot's interval.
+    window_capacity: int | None = None
+    window_peak: int = 0
+    # Only computed for shops whose policy rejects a user's overlapping reservations.
+    user_has_overlapping_reservation: bool = False
+    max_party_size: int | None = None
+
+
+@dataclass(frozen=True)
+class ReservationRef:
+    """Lightweight row used by set-based operations (no ORM identity map)."""
+
+    reservation_id: int
+    slot_id: int
+    shop_id: int
+    user_id: int
+    party_size: int
+    status: ReservationStatus
+    version: int
+
+
+@dataclass(frozen=True)
+class ShopReservationRow:
+    """Compact row of the shop-side reservation listing (columns only, no ORM objects)."""
+
+    reservation_id: int
+    slot_id: int
+    seat_id: int | None
+    starts_at: datetime
+    ends_at: datetime
+    user_id: int
+    party_size: int
+    status: ReservationStatus
+    version: int
+
+
+@dataclass(frozen=True)
+class ShopReservationCursor:
+    """Keyset position in (slot starts_at, slot id, reservation id) order; rows up to it were returned."""
+
+    starts_at: datetime
+    slot_id: int
+    reservation_id: int
+
+
+# Cursor reservation id meaning "past every reservation of the slot".
+MAX_RESERVATION_ID = 2**63 - 1
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One row of a shop's change feed (entity is "slot" or "reservation")."""
+
+    shop_id: int
+    entity: str
+    entity_id: int
+    slot_id: int
+    action: str
+    status: str
+    version: int | None = None
+
+
+@dataclass(frozen=True)
+class AvailabilityDelta:
+    """Availability of one slot right after a commit, as pushed to stream subscribers."""
+
+    slot_id: int
+    shop_id: int
+    seat_id: int | None
+    starts_at: datetime
+    ends_at: datetime
+    capacity: int
+    remaining: int
+    status: SlotStatus
+
+
+@dataclass(frozen=True)
+class AvailabilityBucket:
+    """Totals over a shop's open slots starting in one JST day or hour (starts_at is UTC)."""
+
+    starts_at: datetime
+    capacity: int
+    reserved: int
+    bookable_slots: int
+
+
+NO_SEAT = -1
+
+
+@dataclass(frozen=True)
+class OccupancyColumns:
+    """Open slots and their active reservations, column-wise.
+
+    Times are UTC epoch seconds; seat is NO_SEAT for shop-level slots.
+    """
+
+    slot_seat: Sequence[int]
+    slot_start: Sequence[int]
+    slot_end: Sequence[int]
+    slot_capacity: Sequence[int]
+    res_seat: Sequence[int]
+    res_start: Sequence[int]
+    res_end: Sequence[int]
+    res_party: Sequence[int]
+
+
+@dataclass(frozen=True)
+class DwellOption:
+    """Consecutive slots of one seat that together cover a requested stay.
+
+    `remaining` is the smallest remaining capacity among the slots, before booking.
+    """
+
+    seat_id: int | None
+    slot_ids: tuple[int, ...]
+    starts_at: datetime
+    ends_at: datetime
+    remaining: int
+
+
+@dataclass(frozen=True)
+class ReservationStatusChange:
+    reservation_id: int
+    slot_id: int
+    shop_id: int
+    user_id: int
+    party_size: int
+    status_from: ReservationStatus
+    status_to: ReservationStatus
+    version: int
+
+
+@dataclass(frozen=True)
+class BookingPolicy:
+    """Shop policy as read on the booking path; the defaults apply to shops without a row.
+
+    Immutable so one instance can be shared by every request of a worker. Window
+    capacity itself is not here: it is always read under the policy row lock.
+    """
+
+    cutoff_days: int = 2
+    default_dwell_minutes: int = 60
+    max_party_size: int | None = None
+    reject_user_overlap: bool = False
+    capacity_mode: CapacityMode = CapacityMode.SLOT
 
 
 def validate_reservation(snapshot: SlotSnapshot, *, party_size: int) -> int:
     """
     Pure validation: ensures slot is open, not duplicated, and capacity is sufficient.
+    Live seat holds (other than the one being consumed) count as taken capacity.
     Returns remaining capacity after booking if OK. Raises domain errors otherwise.
     """
     if snapshot.user_has_active_reservation:
         raise DuplicateReservationError("user already has an active reservation for this slot")
+    if snapshot.user_has_overlapping_reservation:
+        raise OverlappingReservationError("user already has an overlapping reservation")
     if snapshot.status != SlotStatus.OPEN:
         raise SlotNotOpenError("slot is not open")
     if party_size <= 0:
         raise CapacityError("party_size must be positive")
+    if snapshot.max_party_size is not None and party_size > snapshot.max_party_size:
+        raise CapacityError("party size exceeds the shop limit")
 
-    remaining = snapshot.capacity - snapshot.reserved
+    remaining = snapshot.capacity - snapshot.reserved - snapshot.held
     if party_size > remaining:
         raise CapacityError("capacity exceeded")
+    if snapshot.window_capacity is not None and snapshot.window_peak + party_size > snapshot.window_capacity:
+        raise CapacityError("time-window capacity exceeded")
     return remaining - party_size
+
+
+def peak_concurrent(
+    intervals: Iterable[tuple[datetime, datetime, int]],
+    *,
+    start: datetime,
+    end: datetime,
+) -> int:
+    """Largest total party_size present at one instant within [start, end).
+
+    Sweep line over (starts_at, ends_at, party_size) intervals: sorting the +/-
+    events is O(n log n). Intervals are half-open, so at equal times departures
+    are applied before arrivals and back-to-back bookings do not add up.
+    """
+    events: list[tuple[datetime, int]] = []
+    for starts_at, ends_at, party_size in intervals:
+        lo, hi = max(starts_at, start), min(ends_at, end)
+        if lo < hi:
+            events.append((lo, party_size))
+            events.append((hi, -party_size))
+    events.sort()
+    peak = present = 0
+    for _, delta in events:
+        present += delta
+        peak = max(peak, present)
+    return peak
+
+
+def live_held(held: int | None, held_until: datetime | None, *, now: datetime) -> int:
+    """Capacity taken by holds according to the denormalized slot columns.
+
+    Once `held_until` has passed every hold on the slot is expired, even if the
+    sweeper has not reclaimed them yet.
+    """
+    if not held or held_until is None or held_until <= now:
+        return 0
+    return held
+
+
+def merge_dwell_options(
+    slots: Iterable[AvailabilityDelta],
+    *,
+    starts_at: datetime,
+    ends_at: datetime,
+    party_size: int,
+) -> list[DwellOption]:
+    """Per seat, the run of back-to-back slots covering [starts_at, ends_at) with room for the party.
+
+    `slots` must be ordered by (seat_id, starts_at); one pass, constant work per slot.
+    Closed, full or non-adjacent slots break a run. Slots overlapping the current run
+    (duplicates of the same period) are skipped.
+    """
+    options: list[DwellOption] = []
+    run: list[AvailabilityDelta] = []
+    done_seat: object = object()  # sentinel: no seat completed yet (seat_id may be None)
+    for slot in slots:
+        if run and slot.seat_id != run[0].seat_id:
+            run = []
+        if slot.seat_id == done_seat or slot.ends_at <= starts_at:
+            continue
+        if run and slot.starts_at < run[-1].ends_at:
+            continue
+        fits = slot.status == SlotStatus.OPEN and slot.remaining >= party_size
+        if not fits or (run and slot.starts_at != run[-1].ends_at):
+            run = []
+            if not fits:
+                continue
+        if not run and slot.starts_at > starts_at:
+            # Later runs of this seat start even later: the stay cannot begin on time.
+            done_seat = slot.seat_id
+            continue
+        run.append(slot)
+        if slot.ends_at >= ends_at:
+            options.append(
+                DwellOption(
+                    seat_id=slot.seat_id,
+                    slot_ids=tuple(s.slot_id for s in run),
+                    starts_at=starts_at,
+                    ends_at=ends_at,
+                    remaining=min(s.remaining for s in run),
+                )
+            )
+            done_seat = slot.seat_id
+            run = []
+    return options
@@ -1,14 +1,66 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, List, Optional, Tuple, cast
+from typing import Any, List, Optional, Sequence, Tuple, cast
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import (
+    DateTime,
+    Select,
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from ..domain.repositories import ReservationRepository, SlotRepository
-from ..models import Reservation, ReservationStatus, Slot, SlotStatus
+from ..domain.errors import ActiveReservationConflictError
+from ..domain.repositories import (
+    AuditOutboxRepository,
+    ChangeLogRepository,
+    DashboardRepository,
+    HoldRepository,
+    ReservationRepository,
+    ShopPolicyRepository,
+    SlotRepository,
+    WaitlistRepository,
+)
+from ..domain.services import (
+    MAX_RESERVATION_ID,
+    NO_SEAT,
+    AvailabilityBucket,
+    BookingPolicy,
+    ChangeEvent,
+    OccupancyColumns,
+    ReservationRef,
+    ShopReservationCursor,
+    ShopReservationRow,
+)
+from ..models import (
+    AuditOutbox,
+    ChangeLog,
+    Reservation,
+    ReservationStatus,
+    SeatHold,
+    ShopChangeSeq,
+    ShopPolicy,
+    Slot,
+    SlotStatus,
+    User,
+    WaitlistEntry,
+)
+from ..utils.policy_cache import get_policy_cache
+
+# DATE_FORMAT patterns truncating a JST datetime to the start of its bucket.
+BUCKET_FORMATS = {"day": "%Y-%m-%d 00:00:00", "hour": "%Y-%m-%d %H:00:00"}
 
 
 class SqlAlchemySlotRepository(SlotRepository):
@@ -19,6 +71,12 @@ class SqlAlchemySlotRepository(SlotRepository):
         result = await self.session.scalar(select(Slot).where(Slot.id == slot_id).with_for_update())
         return result if isinstance(result, Slot) else None
 
+    async def lock_many_skip_locked(self, slot_ids: Sequence[int]) -> List[Slot]:
+        if not slot_ids:
+            return []
+        stmt = select(Slot).where(Slot.id.in_(slot_ids)).order_by(Slot.id).with_for_update(skip_locked=True)
+        return list((await self.session.scalars(stmt)).all())
+
     async def create(
         self,
         *,
@@ -72,24 +130,261 @@ class SqlAlchemySlotRepository(SlotRepository):
         rows = await self.session.execute(stmt)
         return [(slot, int(reserved)) for slot, reserved in rows.all()]
 
+    async def list_with_reserved_for_shops(
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> List[Tuple[Slot, int]]:
+        """`list_with_reserved` for several shops in one grouped query, ordered by shop then start."""
+        if not shop_ids:
+            return []
+        stmt: Select[Tuple[Slot, Any]] = (
+            select(
+                Slot,
+                func.coalesce(func.sum(Reservation.party_size), 0).label("reserved"),
+            )
+            .outerjoin(
+                Reservation,
+                (Reservation.slot_id == Slot.id) & (Reservation.status != ReservationStatus.CANCELLED),
+            )
+            .where(
+                Slot.shop_id.in_(shop_ids),
+                Slot.starts_at >= start,
+                Slot.ends_at <= end,
+            )
+            .group_by(Slot.id)
+            .order_by(Slot.shop_id, Slot.starts_at, Slot.id)
+        )
+        rows = await self.session.execute(stmt)
+        return [(slot, int(reserved)) for slot, reserved in rows.all()]
+
+    async def list_overlapping_with_reserved(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> List[Tuple[Slot, int]]:
+        """Slots overlapping [start, end) ordered by seat then start, for one merge pass per seat.
+
+        `starts_from` bounds the idx_slots_shop_starts range from below (slots started
+        before it cannot reach `start`).
+        """
+        stmt: Select[Tuple[Slot, Any]] = (
+            select(
+                Slot,
+                func.coalesce(func.sum(Reservation.party_size), 0).label("reserved"),
+            )
+            .outerjoin(
+                Reservation,
+                (Reservation.slot_id == Slot.id) & (Reservation.status != ReservationStatus.CANCELLED),
+            )
+            .where(
+                Slot.shop_id == shop_id,
+                Slot.starts_at >= starts_from,
+                Slot.starts_at < end,
+                Slot.ends_at > start,
+            )
+            .group_by(Slot.id)
+            .order_by(Slot.seat_id, Slot.starts_at, Slot.id)
+        )
+        rows = await self.session.execute(stmt)
+        return [(slot, int(reserved)) for slot, reserved in rows.all()]
+
+    async def next_available(
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> List[Tuple[Slot, int]]:
+        """Earliest open slots from `after` with room for the party.
+
+        Walks idx_slots_shop_starts in order and checks each slot with a correlated
+        SUM over idx_res_slot_status, so MySQL stops after `limit` matches instead of
+        aggregating the whole horizon.
+        """
+        reserved = (
+            select(func.coalesce(func.sum(Reservation.party_size), 0))
+            .where(Reservation.slot_id == Slot.id, Reservation.status != ReservationStatus.CANCELLED)
+            .correlate(Slot)
+            .scalar_subquery()
+        )
+        # Same rule as domain.services.live_held, evaluated in SQL.
+        held = case((Slot.held_until > now, Slot.held), else_=0)
+        stmt: Select[Tuple[Slot, Any]] = (
+            select(Slot, reserved.label("reserved"))
+            .where(
+                Slot.shop_id == shop_id,
+                Slot.starts_at >= after,
+                Slot.status == SlotStatus.OPEN,
+                Slot.capacity - held - reserved >= party_size,
+            )
+            .order_by(Slot.starts_at, Slot.id)
+            .limit(limit)
+        )
+        if seat_id is not None:
+            stmt = stmt.where(Slot.seat_id == seat_id)
+        rows = await self.session.execute(stmt)
+        return [(slot, int(reserved)) for slot, reserved in rows.all()]
+
+    async def best_fit_seat_slots(
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> List[int]:
+        """Ids of open seat slots starting at `starts_at` with room for the party, tightest fit first.
+
+        The (shop_id, starts_at) equality is one idx_slots_shop_starts range (the seats of
+        that time); ordering by what would be left keeps large tables for large parties.
+        No rows are locked here.
+        """
+        reserved = (
+            select(func.coalesce(func.sum(Reservation.party_size), 0))
+            .where(Reservation.slot_id == Slot.id, Reservation.status != ReservationStatus.CANCELLED)
+            .correlate(Slot)
+            .scalar_subquery()
+        )
+        held = case((Slot.held_until > now, Slot.held), else_=0)
+        remaining = Slot.capacity - held - reserved
+        stmt = (
+            select(Slot.id)
+            .where(
+                Slot.shop_id == shop_id,
+                Slot.starts_at == starts_at,
+                Slot.seat_id.is_not(None),
+                Slot.status == SlotStatus.OPEN,
+                remaining >= party_size,
+            )
+            .order_by(remaining, Slot.capacity, Slot.id)
+            .limit(limit)
+        )
+        return [int(slot_id) for slot_id in (await self.session.scalars(stmt)).all()]
+
+    async def availability_buckets(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> List[AvailabilityBucket]:
+        """Per JST day/hour totals of open slots starting in [start, end), grouped in MySQL.
+
+        Numeric offsets in CONVERT_TZ need no time zone tables; JST has no DST.
+        """
+        held = case((Slot.held_until > now, Slot.held), else_=0)
+        per_slot = (
+            select(
+                Slot.starts_at,
+                Slot.capacity,
+                held.label("held"),
+                func.coalesce(func.sum(Reservation.party_size), 0).label("reserved"),
+            )
+            .outerjoin(
+                Reservation,
+                (Reservation.slot_id == Slot.id) & (Reservation.status != ReservationStatus.CANCELLED),
+            )
+            .where(
+                Slot.shop_id == shop_id,
+                Slot.starts_at >= start,
+                Slot.starts_at < end,
+                Slot.status == SlotStatus.OPEN,
+            )
+            .group_by(Slot.id)
+            .subquery()
+        )
+        jst = func.convert_tz(per_slot.c.starts_at, "+00:00", "+09:00")
+        bucket_start = func.convert_tz(
+            func.date_format(jst, BUCKET_FORMATS[bucket]), "+09:00", "+00:00", type_=DateTime
+        ).label("bucket_start")
+        stmt = (
+            select(
+                bucket_start,
+                func.sum(per_slot.c.capacity),
+                func.sum(per_slot.c.reserved),
+                func.sum(case((per_slot.c.capacity - per_slot.c.held - per_slot.c.reserved > 0, 1), else_=0)),
+            )
+            .group_by(bucket_start)
+            .order_by(bucket_start)
+        )
+        rows = await self.session.execute(stmt)
+        return [
+            AvailabilityBucket(
+                starts_at=starts_at,
+                capacity=int(capacity),
+                reserved=int(reserved),
+                bookable_slots=int(bookable),
+            )
+            for starts_at, capacity, reserved, bookable in rows.all()
+        ]
+
+    async def bulk_update_status(
+        self,
+        *,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+        status: SlotStatus,
+    ) -> List[int]:
+        # Lock the ids first (MySQL has no UPDATE ... RETURNING) so callers can report exactly which slots changed.
+        select_stmt = select(Slot.id).where(
+            Slot.shop_id == shop_id,
+            Slot.starts_at >= start,
+            Slot.ends_at <= end,
+            Slot.status != status,
+        )
+        if seat_id is not None:
+            select_stmt = select_stmt.where(Slot.seat_id == seat_id)
+        ids = list((await self.session.scalars(select_stmt.order_by(Slot.id).with_for_update())).all())
+        if ids:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            await self.session.execute(
+                update(Slot)
+                .where(Slot.id.in_(ids))
+                .values(status=status, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        return ids
+
+
+MYSQL_DUPLICATE_ENTRY = 1062
+
+
+async def _flush_reservation(session: AsyncSession) -> None:
+    """Flush, turning a uq_res_active_user_slot collision into the domain error."""
+    try:
+        await session.flush()
+    except IntegrityError as exc:
+        args = getattr(exc.orig, "args", ())
+        if args and args[0] == MYSQL_DUPLICATE_ENTRY and "uq_res_active_user_slot" in str(args[-1]):
+            raise ActiveReservationConflictError("user already has an active reservation for this slot") from exc
+        raise
+
 
 class SqlAlchemyReservationRepository(ReservationRepository):
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
     async def user_has_active(self, slot_id: int, user_id: int) -> bool:
-        stmt = select(Reservation.id).where(
-            Reservation.slot_id == slot_id,
-            Reservation.user_id == user_id,
-            Reservation.status != ReservationStatus.CANCELLED,
-        )
+        # Index-only on uq_res_active_user_slot (cancelled rows have active_slot_id NULL).
+        stmt = select(Reservation.id).where(Reservation.active_slot_id == slot_id, Reservation.user_id == user_id)
         return await self.session.scalar(stmt) is not None
 
     async def sum_reserved(self, slot_id: int) -> int:
-        stmt = select(func.coalesce(func.sum(Reservation.party_size), 0)).where(
-            Reservation.slot_id == slot_id,
-            Reservation.status != ReservationStatus.CANCELLED,
-        )
+        # Index-only on idx_res_active_slot_party.
+        stmt = select(func.coalesce(func.sum(Reservation.party_size), 0)).where(Reservation.active_slot_id == slot_id)
         return int(await self.session.scalar(stmt) or 0)
 
     async def get_for_user_for_update(self, reservation_id: int, user_id: int) -> Optional[Tuple[Reservation, Slot]]:
@@ -120,7 +415,7 @@ class SqlAlchemyReservationRepository(ReservationRepository):
             updated_at=now,
         )
         self.session.add(reservation)
-        await self.session.flush()
+        await _flush_reservation(self.session)
         return reservation
 
     async def list_by_user(
@@ -154,6 +449,615 @@ class SqlAlchemyReservationRepository(ReservationRepository):
         return reservation
 
     async def reschedule(self, reservation: Reservation) -> Reservation:
+        self.session.add(reservation)
+        await _flush_reservation(self.session)
+        return reservation
+
+    async def resize(self, reservation: Reservation) -> Reservation:
+        # One UPDATE of party_size, version and updated_at on the already locked row.
         self.session.add(reservation)
         await self.session.flush()
         return reservation
+
+    async def list_active_in_range(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+    ) -> List[Tuple[Reservation, Slot]]:
+        stmt: Select[Tuple[Reservation, Slot]] = (
+            select(Reservation, Slot)
+            .join(Slot, Reservation.slot_id == Slot.id)
+            .where(
+                Slot.shop_id == shop_id,
+                Slot.starts_at >= start,
+                Slot.ends_at <= end,
+                Reservation.status != ReservationStatus.CANCELLED,
+            )
+            .order_by(Slot.starts_at, Reservation.id)
+        )
+        if seat_id is not None:
+            stmt = stmt.where(Slot.seat_id == seat_id)
+        rows = await self.session.execute(stmt)
+        return cast(List[Tuple[Reservation, Slot]], list(rows.all()))
+
+    async def lock_active_for_shop(
+        self,
+        shop_id: int,
+        *,
+        slot_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+        seat_id: int | None,
+    ) -> List[ReservationRef]:
+        stmt = (
+            select(
+                Reservation.id,
+                Reservation.slot_id,
+                Reservation.user_id,
+                Reservation.party_size,
+                Reservation.status,
+                Reservation.version,
+            )
+            .join(Slot, Reservation.slot_id == Slot.id)
+            .where(Slot.shop_id == shop_id, Reservation.status != ReservationStatus.CANCELLED)
+            .order_by(Reservation.id)
+            .with_for_update(of=Reservation)
+        )
+        if slot_id is not None:
+            stmt = stmt.where(Reservation.slot_id == slot_id)
+        if start is not None:
+            stmt = stmt.where(Slot.starts_at >= start)
+        if end is not None:
+            stmt = stmt.where(Slot.ends_at <= end)
+        if seat_id is not None:
+            stmt = stmt.where(Slot.seat_id == seat_id)
+        rows = await self.session.execute(stmt)
+        return [
+            ReservationRef(
+                reservation_id=res_id,
+                slot_id=res_slot_id,
+                shop_id=shop_id,
+                user_id=user_id,
+                party_size=party_size,
+                status=res_status,
+                version=version,
+            )
+            for res_id, res_slot_id, user_id, party_size, res_status, version in rows.all()
+        ]
+
+    async def lock_expired_pending(self, created_before: datetime, limit: int) -> List[ReservationRef]:
+        # Served by idx_res_status_created; SKIP LOCKED keeps the sweeper off rows user traffic holds.
+        stmt = (
+            select(
+                Reservation.id,
+                Reservation.slot_id,
+                Slot.shop_id,
+                Reservation.user_id,
+                Reservation.party_size,
+                Reservation.status,
+                Reservation.version,
+            )
+            .join(Slot, Reservation.slot_id == Slot.id)
+            .where(
+                Reservation.status == ReservationStatus.REQUEST_PENDING,
+                Reservation.created_at < created_before,
+            )
+            .order_by(Reservation.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=Reservation)
+        )
+        rows = await self.session.execute(stmt)
+        return [
+            ReservationRef(
+                reservation_id=res_id,
+                slot_id=slot_id,
+                shop_id=shop_id,
+                user_id=user_id,
+                party_size=party_size,
+                status=res_status,
+                version=version,
+            )
+            for res_id, slot_id, shop_id, user_id, party_size, res_status, version in rows.all()
+        ]
+
+    async def list_overlapping_party(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> List[Tuple[datetime, datetime, int]]:
+        """(starts_at, ends_at, party_size) of active reservations whose slot overlaps [start, end).
+
+        `starts_from` bounds the idx_slots_shop_starts range scan (start minus the longest slot);
+        reservations are read from idx_res_active_slot_party alone.
+        """
+        stmt = (
+            select(Slot.starts_at, Slot.ends_at, Reservation.party_size)
+            .join(Reservation, Reservation.active_slot_id == Slot.id)
+            .where(
+                Slot.shop_id == shop_id,
+                Slot.starts_at >= starts_from,
+                Slot.starts_at < end,
+                Slot.ends_at > start,
+            )
+        )
+        if exclude_reservation_id is not None:
+            stmt = stmt.where(Reservation.id != exclude_reservation_id)
+        rows = await self.session.execute(stmt)
+        return [(starts_at, ends_at, int(party_size)) for starts_at, ends_at, party_size in rows.all()]
+
+    async def lock_user(self, user_id: int) -> None:
+        """Lock the user row, serializing the user's bookings across slots (taken after the slot lock)."""
+        await self.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+
+    async def user_has_overlapping(
+        self,
+        shop_id: int,
+        user_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> bool:
+        """Whether the user has an active reservation on a slot of the shop overlapping [start, end).
+
+        One bounded idx_slots_shop_starts range probed by (active_slot_id, user_id) on
+        uq_res_active_user_slot, so the cost does not grow with the user's history.
+        """
+        stmt = (
+            select(Reservation.id)
+            .join(Slot, Reservation.active_slot_id == Slot.id)
+            .where(
+                Slot.shop_id == shop_id,
+                Slot.starts_at >= starts_from,
+                Slot.starts_at < end,
+                Slot.ends_at > start,
+                Reservation.user_id == user_id,
+            )
+            .limit(1)
+        )
+        if exclude_reservation_id is not None:
+            stmt = stmt.where(Reservation.id != exclude_reservation_id)
+        return await self.session.scalar(stmt) is not None
+
+    async def bulk_cancel(self, reservation_ids: Sequence[int]) -> int:
+        if not reservation_ids:
+            return 0
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        stmt = (
+            update(Reservation)
+            .where(Reservation.id.in_(reservation_ids), Reservation.status != ReservationStatus.CANCELLED)
+            .values(status=ReservationStatus.CANCELLED, version=Reservation.version + 1, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return int(result.rowcount or 0)
+
+    async def list_shop_page(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        statuses: Sequence[ReservationStatus],
+        after: ShopReservationCursor | None,
+        slot_limit: int,
+    ) -> tuple[list[ShopReservationRow], ShopReservationCursor | None]:
+        """Reservations of the next `slot_limit` slots after `after`, in (starts_at, slot, id) order.
+
+        The slot window is a keyset range on idx_slots_shop_starts; its reservations come
+        from idx_res_slot_status, so the cost of a page does not grow with its offset.
+        Returns the rows and, when the window was full, the position after its last slot.
+        """
+        lower = start if after is None or after.starts_at < start else after.starts_at
+        window_stmt = (
+            select(Slot.id, Slot.seat_id, Slot.starts_at, Slot.ends_at)
+            .where(Slot.shop_id == shop_id, Slot.starts_at >= lower, Slot.starts_at < end)
+            .order_by(Slot.starts_at, Slot.id)
+            .limit(slot_limit)
+        )
+        if after is not None:
+            # A slot-complete cursor must not bring its own slot back into the window.
+            if after.reservation_id == MAX_RESERVATION_ID:
+                same_start = Slot.id > after.slot_id
+            else:
+                same_start = Slot.id >= after.slot_id
+            window_stmt = window_stmt.where(
+                or_(Slot.starts_at > after.starts_at, and_(Slot.starts_at == after.starts_at, same_start))
+            )
+        window = window_stmt.subquery()
+        on = [Reservation.slot_id == window.c.id]
+        if statuses:
+            on.append(Reservation.status.in_(statuses))
+        if after is not None:
+            # The cursor's own slot may have been cut mid-way: resume after its last returned row.
+            on.append(or_(window.c.id != after.slot_id, Reservation.id > after.reservation_id))
+        stmt = (
+            select(
+                window.c.id,
+                window.c.seat_id,
+                window.c.starts_at,
+                window.c.ends_at,
+                Reservation.id,
+                Reservation.user_id,
+                Reservation.party_size,
+                Reservation.status,
+                Reservation.version,
+            )
+            # Outer join so that empty slots still mark how far the window reached.
+            .select_from(window.outerjoin(Reservation, and_(*on)))
+            .order_by(window.c.starts_at, window.c.id, Reservation.id)
+        )
+        rows: list[ShopReservationRow] = []
+        slots: list[tuple[datetime, int]] = []
+        for slot_id, seat_id, starts_at, ends_at, res_id, user_id, party_size, res_status, version in (
+            await self.session.execute(stmt)
+        ).all():
+            if not slots or slots[-1][1] != slot_id:
+                slots.append((starts_at, slot_id))
+            if res_id is None:
+                continue
+            rows.append(
+                ShopReservationRow(
+                    reservation_id=res_id,
+                    slot_id=slot_id,
+                    seat_id=seat_id,
+                    starts_at=starts_at,
+                    ends_at=ends_at,
+                    user_id=user_id,
+                    party_size=party_size,
+                    status=res_status,
+                    version=version,
+                )
+            )
+        if len(slots) < slot_limit:
+            return rows, None
+        last_starts_at, last_slot_id = slots[-1]
+        return rows, ShopReservationCursor(last_starts_at, last_slot_id, MAX_RESERVATION_ID)
+
+
+class SqlAlchemyHoldRepository(HoldRepository):
+    """Seat holds. Callers must hold the slot row lock; slot.held/held_until are kept in sync here."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def create(
+        self,
+        *,
+        slot: Slot,
+        user_id: int,
+        party_size: int,
+        expires_at: datetime,
+    ) -> SeatHold:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        hold = SeatHold(
+            slot_id=slot.id,
+            user_id=user_id,
+            party_size=party_size,
+            expires_at=expires_at,
+            created_at=now,
+        )
+        self.session.add(hold)
+        slot.held = (slot.held or 0) + party_size
+        slot.held_until = expires_at if slot.held_until is None else max(slot.held_until, expires_at)
+        await self.session.flush()
+        return hold
+
+    async def get_for_update(self, hold_id: int, user_id: int) -> SeatHold | None:
+        stmt = select(SeatHold).where(SeatHold.id == hold_id, SeatHold.user_id == user_id).with_for_update()
+        result = await self.session.scalar(stmt)
+        return result if isinstance(result, SeatHold) else None
+
+    async def consume(self, slot: Slot, hold: SeatHold) -> None:
+        await self.session.delete(hold)
+        slot.held = max((slot.held or 0) - hold.party_size, 0)
+        if slot.held == 0:
+            slot.held_until = None
+        await self.session.flush()
+
+    async def reclaim_expired(self, slot: Slot, now: datetime) -> int:
+        result = await self.session.execute(
+            delete(SeatHold)
+            .where(SeatHold.slot_id == slot.id, SeatHold.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            return slot.held or 0
+        total, latest = (
+            await self.session.execute(
+                select(func.coalesce(func.sum(SeatHold.party_size), 0), func.max(SeatHold.expires_at)).where(
+                    SeatHold.slot_id == slot.id
+                )
+            )
+        ).one()
+        slot.held = int(total)
+        slot.held_until = latest
+        await self.session.flush()
+        return slot.held
+
+    async def slots_with_expired(self, now: datetime, limit: int) -> List[int]:
+        stmt = select(SeatHold.slot_id).where(SeatHold.expires_at <= now).distinct().limit(limit)
+        return [int(slot_id) for slot_id in (await self.session.scalars(stmt)).all()]
+
+
+class SqlAlchemyWaitlistRepository(WaitlistRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add(self, *, slot_id: int, user_id: int, party_size: int) -> WaitlistEntry:
+        entry = WaitlistEntry(
+            slot_id=slot_id,
+            user_id=user_id,
+            party_size=party_size,
+            created_at=datetime.now(timezone.utc).replace(tzinfo=None),
+        )
+        self.session.add(entry)
+        await self.session.flush()
+        return entry
+
+    async def earliest_fitting(self, slot_id: int, max_party_size: int) -> WaitlistEntry | None:
+        # Loose index scan over idx_waitlist_slot_party_created: the head of each
+        # party_size group, so the cost depends on distinct sizes (<= capacity), not queue length.
+        heads = (
+            await self.session.execute(
+                select(WaitlistEntry.party_size, func.min(WaitlistEntry.created_at))
+                .where(WaitlistEntry.slot_id == slot_id, WaitlistEntry.party_size <= max_party_size)
+                .group_by(WaitlistEntry.party_size)
+            )
+        ).all()
+        if not heads:
+            return None
+        party_size, created_at = min(heads, key=lambda head: (head[1], head[0]))
+        stmt = (
+            select(WaitlistEntry)
+            .where(
+                WaitlistEntry.slot_id == slot_id,
+                WaitlistEntry.party_size == party_size,
+                WaitlistEntry.created_at == created_at,
+            )
+            .order_by(WaitlistEntry.id)
+            .limit(1)
+            .with_for_update()
+        )
+        result = await self.session.scalar(stmt)
+        return result if isinstance(result, WaitlistEntry) else None
+
+    async def remove(self, entry: WaitlistEntry) -> None:
+        await self.session.delete(entry)
+        await self.session.flush()
+
+    async def remove_for_user(self, entry_id: int, user_id: int) -> bool:
+        result = await self.session.execute(
+            delete(WaitlistEntry)
+            .where(WaitlistEntry.id == entry_id, WaitlistEntry.user_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+
+class SqlAlchemyAuditOutboxRepository(AuditOutboxRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add_many(self, payloads: Sequence[str]) -> None:
+        if not payloads:
+            return
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        await self.session.execute(
+            insert(AuditOutbox),
+            [{"payload": payload, "created_at": now} for payload in payloads],
+        )
+
+    async def lock_unshipped(self, limit: int) -> List[AuditOutbox]:
+        # SKIP LOCKED lets several relays drain without shipping the same row twice.
+        stmt = (
+            select(AuditOutbox)
+            .where(AuditOutbox.shipped_at.is_(None))
+            .order_by(AuditOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list((await self.session.scalars(stmt)).all())
+
+    async def mark_shipped(self, ids: Sequence[int], shipped_at: datetime) -> int:
+        if not ids:
+            return 0
+        result = await self.session.execute(
+            update(AuditOutbox)
+            .where(AuditOutbox.id.in_(ids))
+            .values(shipped_at=shipped_at)
+            .execution_options(synchronize_session=False)
+        )
+        return int(result.rowcount or 0)
+
+
+class SqlAlchemyChangeLogRepository(ChangeLogRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _reserve_seq(self, shop_id: int, count: int) -> int:
+        """Bump the shop's counter by `count` and return the new last seq.
+
+        The counter row stays locked until commit, so seqs become visible in commit order
+        and a reader never skips a row that commits later with a lower seq.
+        """
+        upsert = mysql_insert(ShopChangeSeq).values(shop_id=shop_id, last_seq=count)
+        await self.session.execute(upsert.on_duplicate_key_update(last_seq=ShopChangeSeq.last_seq + count))
+        last_seq = await self.session.scalar(select(ShopChangeSeq.last_seq).where(ShopChangeSeq.shop_id == shop_id))
+        return int(last_seq or 0)
+
+    async def append(self, events: Sequence[ChangeEvent]) -> dict[int, int]:
+        """Append events; returns the last seq assigned per shop."""
+        if not events:
+            return {}
+        by_shop: dict[int, list[ChangeEvent]] = {}
+        for event in events:
+            by_shop.setdefault(event.shop_id, []).append(event)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows: list[dict[str, Any]] = []
+        last_seqs: dict[int, int] = {}
+        # Ascending shop_id keeps the counter lock order consistent across transactions.
+        for shop_id in sorted(by_shop):
+            shop_events = by_shop[shop_id]
+            last_seqs[shop_id] = await self._reserve_seq(shop_id, len(shop_events))
+            first_seq = last_seqs[shop_id] - len(shop_events) + 1
+            rows.extend(
+                {
+                    "shop_id": shop_id,
+                    "seq": first_seq + i,
+                    "entity": event.entity,
+                    "entity_id": event.entity_id,
+                    "slot_id": event.slot_id,
+                    "action": event.action,
+                    "status": event.status,
+                    "version": event.version,
+                    "created_at": now,
+                }
+                for i, event in enumerate(shop_events)
+            )
+        await self.session.execute(insert(ChangeLog), rows)
+        return last_seqs
+
+    async def last_seq(self, shop_id: int) -> int:
+        """Last committed seq of the shop (0 if it has no changes), without locking."""
+        last_seq = await self.session.scalar(select(ShopChangeSeq.last_seq).where(ShopChangeSeq.shop_id == shop_id))
+        return int(last_seq or 0)
+
+    async def list_since(self, shop_id: int, since: int, limit: int) -> List[ChangeLog]:
+        stmt = (
+            select(ChangeLog)
+            .where(ChangeLog.shop_id == shop_id, ChangeLog.seq > since)
+            .order_by(ChangeLog.seq)
+            .limit(limit)
+        )
+        return list((await self.session.scalars(stmt)).all())
+
+
+class SqlAlchemyShopPolicyRepository(ShopPolicyRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get(self, shop_id: int) -> ShopPolicy | None:
+        result = await self.session.scalar(select(ShopPolicy).where(ShopPolicy.shop_id == shop_id))
+        return result if isinstance(result, ShopPolicy) else None
+
+    async def get_for_update(self, shop_id: int) -> ShopPolicy | None:
+        stmt = (
+            select(ShopPolicy)
+            .where(ShopPolicy.shop_id == shop_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.scalar(stmt)
+        return result if isinstance(result, ShopPolicy) else None
+
+    async def get_booking_policy(self, shop_id: int) -> BookingPolicy:
+        """Read through the worker's policy cache; no query on a hit."""
+        cache = get_policy_cache()
+        generation = 0
+        if cache is not None:
+            cached = cache.get(shop_id)
+            if cached is not None:
+                return cached
+            # Taken before the read: an invalidation arriving meanwhile keeps the result out.
+            generation = cache.generation(shop_id)
+        row = await self.session.execute(
+            select(
+                ShopPolicy.cutoff_days,
+                ShopPolicy.default_dwell_minutes,
+                ShopPolicy.max_party_size,
+                ShopPolicy.reject_user_overlap,
+                ShopPolicy.capacity_mode,
+            ).where(ShopPolicy.shop_id == shop_id)
+        )
+        values = row.first()
+        # Shops without a row are cached too, so they also stop hitting the database.
+        policy = BookingPolicy(**values._asdict()) if values is not None else BookingPolicy()
+        if cache is not None:
+            cache.put(shop_id, policy, generation=generation)
+        return policy
+
+    async def save(self, shop_id: int, policy: BookingPolicy, *, window_capacity: int | None) -> ShopPolicy:
+        values = {
+            "cutoff_days": policy.cutoff_days,
+            "default_dwell_minutes": policy.default_dwell_minutes,
+            "max_party_size": policy.max_party_size,
+            "reject_user_overlap": policy.reject_user_overlap,
+            "capacity_mode": policy.capacity_mode,
+            "window_capacity": window_capacity,
+            "updated_at": datetime.now(timezone.utc).replace(tzinfo=None),
+        }
+        upsert = mysql_insert(ShopPolicy).values(shop_id=shop_id, **values)
+        await self.session.execute(upsert.on_duplicate_key_update(**values))
+        saved = await self.get_for_update(shop_id)
+        if saved is None:  # pragma: no cover - the row was just written in this transaction
+            raise RuntimeError(f"shop policy {shop_id} missing after upsert")
+        return saved
+
+
+def _epoch(column: Any) -> Any:
+    # TIMESTAMPDIFF on the stored UTC value; UNIX_TIMESTAMP would apply the session time zone.
+    return func.timestampdiff(literal_column("SECOND"), literal("1970-01-01 00:00:00"), column)
+
+
+class SqlAlchemyDashboardRepository(DashboardRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def occupancy_columns(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> OccupancyColumns:
+        """Open slots overlapping [start, end) and their active reservations as plain int columns.
+
+        Epoch seconds are computed in MySQL, so no datetime objects are built per row.
+        """
+        in_range = (
+            Slot.shop_id == shop_id,
+            Slot.starts_at >= starts_from,
+            Slot.starts_at < end,
+            Slot.ends_at > start,
+            Slot.status == SlotStatus.OPEN,
+        )
+        seat = func.coalesce(Slot.seat_id, NO_SEAT)
+        slot_rows = (
+            await self.session.execute(
+                select(seat, _epoch(Slot.starts_at), _epoch(Slot.ends_at), Slot.capacity).where(*in_range)
+            )
+        ).all()
+        res_rows = (
+            await self.session.execute(
+                select(seat, _epoch(Slot.starts_at), _epoch(Slot.ends_at), Reservation.party_size)
+                .join(Slot, Slot.id == Reservation.slot_id)
+                .where(*in_range, Reservation.status != ReservationStatus.CANCELLED)
+            )
+        ).all()
+        slot_seat, slot_start, slot_end, slot_capacity = _columns(slot_rows, 4)
+        res_seat, res_start, res_end, res_party = _columns(res_rows, 4)
+        return OccupancyColumns(
+            slot_seat=slot_seat,
+            slot_start=slot_start,
+            slot_end=slot_end,
+            slot_capacity=slot_capacity,
+            res_seat=res_seat,
+            res_start=res_start,
+            res_end=res_end,
+            res_party=res_party,
+        )
+
+
+def _columns(rows: Sequence[Any], width: int) -> list[tuple[int, ...]]:
+    if not rows:
+        return [() for _ in range(width)]
+    return [tuple(int(value) for value in column) for column in zip(*rows)]
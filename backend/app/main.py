@@ -1,13 +1,127 @@
-from typing import Awaitable, Callable
+import asyncio
+import contextlib
+from datetime import timedelta
+from typing import AsyncIterator, Awaitable, Callable
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import Response
 
-from .routers import reservations, slots
+from .config import get_settings
+from .database import async_session
+from .routers import holds, reservations, shops, slots, waitlist
+from .utils.audit_log import set_audit_sink, write_to_logger
+from .utils.audit_segments import SegmentedAuditWriter
+from .utils.audit_sink import AuditSink, FileAuditWriter
+from .utils.availability_snapshot import AvailabilitySnapshot, set_availability_snapshot
+from .utils.availability_stream import AvailabilityHub, set_availability_hub
+from .utils.invalidation_bus import InvalidationBus, set_invalidation_bus
+from .utils.policy_cache import new_policy_cache, set_policy_cache
 from .utils.request_id import generate_request_id, set_request_id
+from .workers.audit_relay import AuditRelay
+from .workers.hold_sweeper import HoldSweeper
+from .workers.pending_sweeper import PendingSweeper
+from .workers.snapshot_refresher import SnapshotRefresher
 
-app = FastAPI(title="Reservation API")
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    audit_file: FileAuditWriter | SegmentedAuditWriter | None = None
+    if settings.audit_segment_dir:
+        audit_file = SegmentedAuditWriter(
+            settings.audit_segment_dir,
+            max_bytes=settings.audit_segment_max_bytes,
+            max_age_seconds=settings.audit_segment_max_age_seconds,
+            compression=settings.audit_segment_compression,
+            fsync=settings.audit_fsync,
+        )
+    elif settings.audit_log_path:
+        audit_file = FileAuditWriter(settings.audit_log_path, fsync=settings.audit_fsync)
+    audit_sink = AuditSink(
+        audit_file or write_to_logger,
+        max_batch=settings.audit_batch_max,
+        max_pending=settings.audit_max_pending,
+        ack_timeout=settings.audit_ack_timeout_seconds,
+    )
+    audit_sink.start()
+    set_audit_sink(audit_sink)
+    relay = AuditRelay(
+        async_session,
+        audit_sink.submit,
+        batch_size=settings.audit_relay_batch_size,
+        interval_seconds=settings.audit_relay_interval_seconds,
+    )
+    bus = InvalidationBus(settings.invalidation_bus_dir)
+    policy_cache = new_policy_cache(settings.policy_cache_ttl_seconds)
+    bus.subscribe(policy_cache.handle)
+    bus.start()
+    set_invalidation_bus(bus)
+    set_policy_cache(policy_cache)
+    hub = AvailabilityHub(max_pending=settings.stream_max_pending)
+    set_availability_hub(hub)
+    tasks: list[asyncio.Task[None]] = [
+        asyncio.create_task(relay.run_forever()),
+        asyncio.create_task(hub.run_heartbeat(settings.stream_heartbeat_seconds)),
+    ]
+    snapshot: AvailabilitySnapshot | None = None
+    if settings.availability_snapshot_path and settings.availability_snapshot_shops:
+        snapshot = AvailabilitySnapshot(
+            settings.availability_snapshot_path,
+            settings.availability_snapshot_shops,
+            slots_per_shop=settings.availability_snapshot_slots_per_shop,
+            # A few missed refreshes before reads fall back to MySQL.
+            max_age_seconds=settings.availability_snapshot_refresh_seconds * 3,
+        )
+        snapshot.open()
+        hub.add_listener(snapshot)
+        set_availability_snapshot(snapshot)
+        refresher = SnapshotRefresher(
+            async_session,
+            snapshot,
+            horizon_days=settings.availability_snapshot_horizon_days,
+            interval_seconds=settings.availability_snapshot_refresh_seconds,
+        )
+        tasks.append(asyncio.create_task(refresher.run_forever()))
+    if settings.sweeper_enabled:
+        sweeper = PendingSweeper(
+            async_session,
+            expiry=timedelta(minutes=settings.pending_expiry_minutes),
+            batch_size=settings.sweeper_batch_size,
+            rate_per_second=settings.sweeper_rate_per_second,
+            interval_seconds=settings.sweeper_interval_seconds,
+        )
+        tasks.append(asyncio.create_task(sweeper.run_forever()))
+    if settings.hold_sweeper_enabled:
+        hold_sweeper = HoldSweeper(
+            async_session,
+            batch_size=settings.hold_sweeper_batch_size,
+            interval_seconds=settings.hold_sweeper_interval_seconds,
+        )
+        tasks.append(asyncio.create_task(hold_sweeper.run_forever()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        set_availability_hub(None)
+        hub.close()
+        if snapshot is not None:
+            set_availability_snapshot(None)
+            snapshot.close()
+        set_policy_cache(None)
+        set_invalidation_bus(None)
+        bus.close()
+        set_audit_sink(None)
+        await audit_sink.close()
+        if audit_file is not None:
+            audit_file.close()
+
+
+app = FastAPI(title="Reservation API", lifespan=lifespan)
 
 # CORS for local frontend (adjust origins as needed)
 app.add_middleware(
@@ -40,3 +154,6 @@ async def request_id_middleware(request: Request, call_next: Callable[[Request],
 
 app.include_router(slots.router)
 app.include_router(reservations.router)
+app.include_router(holds.router)
+app.include_router(waitlist.router)
+app.include_router(shops.router)
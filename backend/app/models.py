@@ -4,9 +4,9 @@ from datetime import datetime
 from enum import StrEnum
 from typing import Optional
 
-from sqlalchemy import CheckConstraint, Enum, ForeignKey, Index, UniqueConstraint
+from sqlalchemy import CheckConstraint, Computed, Enum, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.sql.sqltypes import BigInteger, DateTime, Integer, String
+from sqlalchemy.sql.sqltypes import BigInteger, Boolean, DateTime, Integer, String, Text
 
 
 class Base(DeclarativeBase):
@@ -19,6 +19,11 @@ class SlotStatus(StrEnum):
     BLOCKED = "blocked"
 
 
+class CapacityMode(StrEnum):
+    SLOT = "slot"
+    WINDOW = "window"
+
+
 class ReservationStatus(StrEnum):
     REQUEST_PENDING = "request_pending"
     BOOKED = "booked"
@@ -60,6 +65,7 @@ class Slot(Base):
         UniqueConstraint("shop_id", "seat_id", "starts_at", "ends_at", name="uq_slots"),
         Index("idx_slots_shop", "shop_id"),
         Index("idx_slots_seat", "seat_id"),
+        Index("idx_slots_shop_starts", "shop_id", "starts_at"),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -77,6 +83,10 @@ class Slot(Base):
         nullable=False,
         default=SlotStatus.OPEN,
     )
+    # Denormalized total of live holds (see SeatHold) so availability reads need no join.
+    # held_until is the latest expiry among them; once it passes every hold is stale.
+    held: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    held_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
 
@@ -88,9 +98,13 @@ class Reservation(Base):
     __tablename__ = "reservations"
     __table_args__ = (
         CheckConstraint("party_size >= 1", name="chk_res_party_size"),
-        UniqueConstraint("user_id", "slot_id", name="uq_res_user_slot"),
-        Index("idx_res_slot", "slot_id"),
+        # One active reservation per (user, slot); cancelled rows have active_slot_id NULL.
+        Index("uq_res_active_user_slot", "active_slot_id", "user_id", unique=True),
+        Index("idx_res_active_slot_party", "active_slot_id", "party_size"),
+        # Shop listing: idx_slots_shop_starts range, then (slot_id, status) per slot.
+        Index("idx_res_slot_status", "slot_id", "status"),
         Index("idx_res_user", "user_id"),
+        Index("idx_res_status_created", "status", "created_at"),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -106,8 +120,115 @@ class Reservation(Base):
         nullable=False,
         default=ReservationStatus.REQUEST_PENDING,
     )
+    # slot_id while active, NULL once cancelled (maintained by MySQL).
+    active_slot_id: Mapped[Optional[int]] = mapped_column(
+        BigInteger,
+        Computed("IF(status = 'cancelled', NULL, slot_id)", persisted=False),
+        nullable=True,
+    )
     version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
 
     slot: Mapped["Slot"] = relationship(back_populates="reservations")
+
+
+class SeatHold(Base):
+    __tablename__ = "holds"
+    __table_args__ = (
+        CheckConstraint("party_size >= 1", name="chk_holds_party_size"),
+        Index("idx_holds_slot_expires", "slot_id", "expires_at"),
+        Index("idx_holds_expires", "expires_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    slot_id: Mapped[int] = mapped_column(ForeignKey("slots.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    party_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        CheckConstraint("party_size >= 1", name="chk_waitlist_party_size"),
+        UniqueConstraint("slot_id", "user_id", name="uq_waitlist_slot_user"),
+        Index("idx_waitlist_slot_created", "slot_id", "created_at"),
+        # Fit-selection: one seek per distinct party_size instead of scanning the queue.
+        Index("idx_waitlist_slot_party_created", "slot_id", "party_size", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    slot_id: Mapped[int] = mapped_column(ForeignKey("slots.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    party_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+
+
+class AuditOutbox(Base):
+    __tablename__ = "audit_outbox"
+    __table_args__ = (
+        # Relay drains `shipped_at IS NULL` in id order.
+        Index("idx_outbox_shipped_id", "shipped_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+    shipped_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
+
+
+class ShopChangeSeq(Base):
+    """Per-shop change counter; its row lock orders `change_log` writes by commit."""
+
+    __tablename__ = "shop_change_seq"
+
+    shop_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+
+    shop_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    entity: Mapped[str] = mapped_column(String(16), nullable=False)
+    entity_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    slot_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    action: Mapped[str] = mapped_column(String(32), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    version: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+
+
+class ShopPolicy(Base):
+    """Per-shop booking settings; a shop without a row uses the defaults."""
+
+    __tablename__ = "shop_policies"
+    __table_args__ = (
+        CheckConstraint("default_dwell_minutes >= 1", name="chk_policy_dwell"),
+        CheckConstraint("capacity_mode = 'slot' OR window_capacity >= 1", name="chk_policy_window_capacity"),
+        CheckConstraint("cutoff_days >= 0", name="chk_policy_cutoff"),
+        CheckConstraint("max_party_size IS NULL OR max_party_size >= 1", name="chk_policy_max_party"),
+    )
+
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id"), primary_key=True, autoincrement=False)
+    default_dwell_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=60)
+    # "window": besides slot capacity, at most window_capacity guests may be present at any instant.
+    capacity_mode: Mapped[CapacityMode] = mapped_column(
+        Enum(
+            CapacityMode,
+            values_callable=lambda enum_cls: [e.value for e in enum_cls],
+            native_enum=False,
+        ),
+        nullable=False,
+        default=CapacityMode.SLOT,
+    )
+    window_capacity: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Reject a booking when the user already has an active reservation overlapping it in this shop.
+    reject_user_overlap: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Users cannot cancel, reschedule or shrink a reservation within this many days of its start.
+    cutoff_days: Mapped[int] = mapped_column(Integer, nullable=False, default=2)
+    max_party_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
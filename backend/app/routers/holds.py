@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..deps import get_current_user_id, get_session
+from ..domain.errors import CapacityError, DuplicateReservationError, SlotNotOpenError
+from ..infrastructure.repositories import (
+    SqlAlchemyHoldRepository,
+    SqlAlchemyReservationRepository,
+    SqlAlchemySlotRepository,
+)
+from ..schemas import HoldCreate, HoldRead
+from ..usecases import holds as hold_usecase
+
+router = APIRouter(prefix="", tags=["holds"])
+
+
+@router.post("/holds", response_model=HoldRead, status_code=status.HTTP_201_CREATED)
+async def create_hold(
+    payload: HoldCreate,
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(get_current_user_id),
+) -> HoldRead:
+    settings = get_settings()
+    ttl_minutes = payload.ttl_minutes or settings.hold_default_ttl_minutes
+    if ttl_minutes > settings.hold_max_ttl_minutes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"ttl_minutes must be <= {settings.hold_max_ttl_minutes}",
+        )
+
+    slot_repo = SqlAlchemySlotRepository(session)
+    res_repo = SqlAlchemyReservationRepository(session)
+    hold_repo = SqlAlchemyHoldRepository(session)
+    async with session.begin():
+        try:
+            hold, _ = await hold_usecase.create_hold(
+                slot_repo,
+                res_repo,
+                hold_repo,
+                slot_id=payload.slot_id,
+                user_id=user_id,
+                party_size=payload.party_size,
+                ttl=timedelta(minutes=ttl_minutes),
+                now=datetime.now(timezone.utc).replace(tzinfo=None),
+            )
+        except SlotNotOpenError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="slot not available")
+        except DuplicateReservationError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="duplicate reservation for this slot")
+        except CapacityError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="capacity exceeded")
+
+    return HoldRead.from_db(hold=hold)
@@ -8,15 +8,38 @@ from ..domain.errors import (
     CancelNotAllowedError,
     CapacityError,
     DuplicateReservationError,
+    HoldNotFoundError,
+    OverlappingReservationError,
     RescheduleNotAllowedError,
     SlotNotOpenError,
     VersionConflictError,
 )
-from ..infrastructure.repositories import SqlAlchemyReservationRepository, SqlAlchemySlotRepository
-from ..models import ReservationStatus
-from ..schemas import ReservationCancel, ReservationCreate, ReservationRead, ReservationReschedule
+from ..domain.services import AvailabilityDelta, ChangeEvent
+from ..infrastructure.repositories import (
+    SqlAlchemyAuditOutboxRepository,
+    SqlAlchemyChangeLogRepository,
+    SqlAlchemyHoldRepository,
+    SqlAlchemyReservationRepository,
+    SqlAlchemyShopPolicyRepository,
+    SqlAlchemySlotRepository,
+    SqlAlchemyWaitlistRepository,
+)
+from ..models import Reservation, ReservationStatus, Slot
+from ..schemas import (
+    ReservationCancel,
+    ReservationCreate,
+    ReservationRead,
+    ReservationReschedule,
+    ReservationResize,
+)
+from ..usecases import changes as change_usecase
 from ..usecases import reservations as reservation_usecase
-from ..utils.audit_log import emit_audit_log
+from ..usecases import slots as slot_usecase
+from ..usecases import waitlist as waitlist_usecase
+from ..utils.audit_log import AuditRecord, emit_audit_log, emit_audit_logs
+from ..utils.availability_stream import availability_subscribed, publish_availability
+from ..utils.invalidation_bus import publish_invalidations
+from ..utils.time import to_utc_naive
 
 router = APIRouter(prefix="", tags=["reservations"])
 
@@ -29,17 +52,41 @@ async def create_reservation(
 ) -> ReservationRead:
     slot_repo = SqlAlchemySlotRepository(session)
     res_repo = SqlAlchemyReservationRepository(session)
+    hold_repo = SqlAlchemyHoldRepository(session)
+    shop_id, starts_at = payload.shop_id, payload.starts_at
+    if payload.slot_id is None and (shop_id is None or starts_at is None or payload.hold_id is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="slot_id, or shop_id and starts_at without hold_id, is required",
+        )
+    if starts_at is not None and starts_at.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="starts_at must have timezone")
     async with session.begin():
         try:
-            reservation, slot = await reservation_usecase.create_reservation(
-                slot_repo,
-                res_repo,
-                slot_id=payload.slot_id,
-                user_id=user_id,
-                party_size=payload.party_size,
-            )
+            if payload.slot_id is not None:
+                reservation, slot = await reservation_usecase.create_reservation(
+                    slot_repo,
+                    res_repo,
+                    hold_repo=hold_repo,
+                    slot_id=payload.slot_id,
+                    user_id=user_id,
+                    party_size=payload.party_size,
+                    hold_id=payload.hold_id,
+                    policy_repo=SqlAlchemyShopPolicyRepository(session),
+                )
+            elif shop_id is not None and starts_at is not None:
+                reservation, slot = await reservation_usecase.create_reservation_any_seat(
+                    slot_repo,
+                    res_repo,
+                    hold_repo=hold_repo,
+                    shop_id=shop_id,
+                    starts_at=to_utc_naive(starts_at),
+                    user_id=user_id,
+                    party_size=payload.party_size,
+                    policy_repo=SqlAlchemyShopPolicyRepository(session),
+                )
             try:
-                emit_audit_log(
+                await emit_audit_log(
                     action="reservation.created",
                     initiator="user",
                     reservation_id=reservation.id,
@@ -50,18 +97,31 @@ async def create_reservation(
                     status_from=None,
                     status_to=reservation.status,
                     version=reservation.version,
+                    outbox=SqlAlchemyAuditOutboxRepository(session),
                 )
             except RuntimeError as exc:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="audit log failed"
                 ) from exc
+            seqs = await SqlAlchemyChangeLogRepository(session).append(
+                [change_usecase.reservation_changed(reservation, shop_id=slot.shop_id, action="created")]
+            )
+            deltas: list[AvailabilityDelta] = []
+            if availability_subscribed(slot.shop_id):
+                deltas.append(await slot_usecase.slot_availability(res_repo, slot))
         except SlotNotOpenError:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="slot not available")
+        except HoldNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="hold not found or expired")
+        except OverlappingReservationError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="overlapping reservation exists")
         except DuplicateReservationError:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="duplicate reservation for this slot")
         except CapacityError:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="capacity exceeded")
 
+    publish_availability(deltas, seq=seqs.get(slot.shop_id, 0))
+    publish_invalidations(shops=[slot.shop_id], slots=[slot.id], users=[user_id])
     return ReservationRead.from_db(reservation=reservation, slot=slot, shop_id=slot.shop_id)
 
 
@@ -111,9 +171,10 @@ async def cancel_reservation(
                 reservation_id=reservation_id,
                 user_id=user_id,
                 version=version,
+                policy_repo=SqlAlchemyShopPolicyRepository(session),
             )
             try:
-                emit_audit_log(
+                await emit_audit_log(
                     action="reservation.cancelled",
                     initiator="user",
                     reservation_id=updated.id,
@@ -124,11 +185,27 @@ async def cancel_reservation(
                     status_from=previous_status,
                     status_to=updated.status,
                     version=updated.version,
+                    outbox=SqlAlchemyAuditOutboxRepository(session),
                 )
             except RuntimeError as exc:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="audit log failed"
                 ) from exc
+            changes: list[ChangeEvent] = []
+            users = [user_id]
+            if previous_status != updated.status:
+                changes.append(change_usecase.reservation_changed(updated, shop_id=slot.shop_id, action="cancelled"))
+                # Freed capacity goes to the waitlist in the same transaction.
+                promoted = await _promote_waitlist(session, res_repo, slot)
+                changes += [
+                    change_usecase.reservation_changed(reservation, shop_id=slot.shop_id, action="created")
+                    for reservation in promoted
+                ]
+                users += [reservation.user_id for reservation in promoted]
+            seqs = await SqlAlchemyChangeLogRepository(session).append(changes)
+            deltas = []
+            if changes and availability_subscribed(slot.shop_id):
+                deltas.append(await slot_usecase.slot_availability(res_repo, slot))
         except SlotNotOpenError:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="reservation not found")
         except VersionConflictError:
@@ -136,6 +213,9 @@ async def cancel_reservation(
         except CancelNotAllowedError:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="cancellation not allowed within cutoff")
 
+    if changes:
+        publish_availability(deltas, seq=seqs.get(slot.shop_id, 0))
+        publish_invalidations(shops=[slot.shop_id], slots=[slot.id], users=users)
     return ReservationRead.from_db(reservation=updated, slot=slot, shop_id=slot.shop_id)
 
 
@@ -159,9 +239,10 @@ async def reschedule_reservation(
                 user_id=user_id,
                 new_slot_id=payload.slot_id,
                 version=version,
+                policy_repo=SqlAlchemyShopPolicyRepository(session),
             )
             try:
-                emit_audit_log(
+                await emit_audit_log(
                     action="reservation.rescheduled",
                     initiator="user",
                     reservation_id=updated.id,
@@ -173,15 +254,28 @@ async def reschedule_reservation(
                     status_to=updated.status,
                     version=updated.version,
                     extra={"slot_id_from": previous_slot_id},
+                    outbox=SqlAlchemyAuditOutboxRepository(session),
                 )
             except RuntimeError as exc:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="audit log failed"
                 ) from exc
+            seqs = await SqlAlchemyChangeLogRepository(session).append(
+                [change_usecase.reservation_changed(updated, shop_id=slot.shop_id, action="rescheduled")]
+            )
+            deltas = []
+            if previous_slot_id != slot.id and availability_subscribed(slot.shop_id):
+                # The previous slot is still locked from get_for_user_for_update.
+                previous_slot = await slot_repo.get_for_update(previous_slot_id)
+                for changed in (slot, previous_slot):
+                    if changed is not None:
+                        deltas.append(await slot_usecase.slot_availability(res_repo, changed))
         except SlotNotOpenError:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="slot not available")
         except VersionConflictError:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="version conflict")
+        except OverlappingReservationError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="overlapping reservation exists")
         except DuplicateReservationError:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="duplicate reservation for this slot")
         except CapacityError:
@@ -189,10 +283,119 @@ async def reschedule_reservation(
         except RescheduleNotAllowedError:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="reschedule not allowed")
 
+    publish_availability(deltas, seq=seqs.get(slot.shop_id, 0))
+    if previous_slot_id != slot.id:
+        publish_invalidations(shops=[slot.shop_id], slots=[slot.id, previous_slot_id], users=[user_id])
+    return ReservationRead.from_db(reservation=updated, slot=slot, shop_id=slot.shop_id)
+
+
+@router.post("/me/reservations/{reservation_id}/resize", response_model=ReservationRead)
+async def resize_reservation(
+    reservation_id: int = Path(..., ge=1),
+    payload: ReservationResize = Body(...),
+    if_match: str | None = Header(default=None, alias="If-Match"),
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(get_current_user_id),
+) -> ReservationRead:
+    version = _extract_version(if_match, payload)
+    res_repo = SqlAlchemyReservationRepository(session)
+    async with session.begin():
+        try:
+            updated, slot, previous_party_size = await reservation_usecase.resize_reservation(
+                res_repo,
+                reservation_id=reservation_id,
+                user_id=user_id,
+                party_size=payload.party_size,
+                version=version,
+                policy_repo=SqlAlchemyShopPolicyRepository(session),
+            )
+            changes: list[ChangeEvent] = []
+            users = [user_id]
+            if previous_party_size != updated.party_size:
+                try:
+                    await emit_audit_log(
+                        action="reservation.resized",
+                        initiator="user",
+                        reservation_id=updated.id,
+                        slot_id=slot.id,
+                        shop_id=slot.shop_id,
+                        user_id=user_id,
+                        party_size=updated.party_size,
+                        status_from=updated.status,
+                        status_to=updated.status,
+                        version=updated.version,
+                        extra={"party_size_from": previous_party_size},
+                        outbox=SqlAlchemyAuditOutboxRepository(session),
+                    )
+                except RuntimeError as exc:
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="audit log failed"
+                    ) from exc
+                changes.append(change_usecase.reservation_changed(updated, shop_id=slot.shop_id, action="resized"))
+            if updated.party_size < previous_party_size:
+                promoted = await _promote_waitlist(session, res_repo, slot)
+                changes += [
+                    change_usecase.reservation_changed(reservation, shop_id=slot.shop_id, action="created")
+                    for reservation in promoted
+                ]
+                users += [reservation.user_id for reservation in promoted]
+            seqs = await SqlAlchemyChangeLogRepository(session).append(changes)
+            deltas = []
+            if changes and availability_subscribed(slot.shop_id):
+                deltas.append(await slot_usecase.slot_availability(res_repo, slot))
+        except SlotNotOpenError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="reservation not found")
+        except VersionConflictError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="version conflict")
+        except CapacityError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="capacity exceeded")
+        except CancelNotAllowedError:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="party size cannot shrink within cutoff")
+
+    if changes:
+        publish_availability(deltas, seq=seqs.get(slot.shop_id, 0))
+        publish_invalidations(shops=[slot.shop_id], slots=[slot.id], users=users)
     return ReservationRead.from_db(reservation=updated, slot=slot, shop_id=slot.shop_id)
 
 
-def _extract_version(if_match: str | None, payload: ReservationCancel | ReservationReschedule | None) -> int:
+async def _promote_waitlist(
+    session: AsyncSession, res_repo: SqlAlchemyReservationRepository, slot: Slot
+) -> list[Reservation]:
+    """Hand capacity freed on `slot` to the waitlist in the caller's transaction and audit the new bookings."""
+    promoted = await waitlist_usecase.promote_waitlist(
+        res_repo,
+        SqlAlchemyWaitlistRepository(session),
+        slot=slot,
+        policy_repo=SqlAlchemyShopPolicyRepository(session),
+    )
+    try:
+        await emit_audit_logs(
+            [
+                AuditRecord(
+                    action="reservation.created",
+                    initiator="system",
+                    reservation_id=reservation.id,
+                    slot_id=slot.id,
+                    shop_id=slot.shop_id,
+                    user_id=reservation.user_id,
+                    party_size=reservation.party_size,
+                    status_from=None,
+                    status_to=reservation.status,
+                    version=reservation.version,
+                    message="promoted from waitlist",
+                )
+                for reservation in promoted
+            ],
+            outbox=SqlAlchemyAuditOutboxRepository(session),
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="audit log failed") from exc
+    return promoted
+
+
+def _extract_version(
+    if_match: str | None, payload: ReservationCancel | ReservationReschedule | ReservationResize | None
+) -> int:
     """Prefer If-Match; otherwise Body.version. Require version >= 1."""
     if if_match:
         token = if_match.strip()
@@ -0,0 +1,247 @@
+from datetime import datetime, timezone
+from typing import Iterator, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..deps import get_current_user_id, get_session
+from ..domain.services import BookingPolicy, ReservationStatusChange
+from ..infrastructure.repositories import (
+    SqlAlchemyAuditOutboxRepository,
+    SqlAlchemyChangeLogRepository,
+    SqlAlchemyDashboardRepository,
+    SqlAlchemyReservationRepository,
+    SqlAlchemyShopPolicyRepository,
+)
+from ..models import ReservationStatus
+from ..schemas import (
+    ChangeFeed,
+    ChangeRead,
+    OccupancyDashboard,
+    ShopCancelledReservation,
+    ShopPolicyRead,
+    ShopPolicyUpdate,
+    ShopReservationCancel,
+    ShopReservationItem,
+    ShopReservationPage,
+)
+from ..usecases import changes as change_usecase
+from ..usecases import dashboard as dashboard_usecase
+from ..usecases import policies as policy_usecase
+from ..usecases import reservations as reservation_usecase
+from ..utils.audit_log import AuditRecord, emit_audit_logs
+from ..utils.invalidation_bus import publish_invalidations
+from ..utils.time import to_utc_naive
+
+router = APIRouter(prefix="/shops", tags=["shops"], dependencies=[Depends(get_current_user_id)])
+
+STREAM_CHUNK_SIZE = 500
+
+
+@router.get("/{shop_id}/reservations", response_model=ShopReservationPage)
+async def list_shop_reservations(
+    shop_id: int,
+    start: datetime = Query(..., alias="from", description="JST start datetime (ISO 8601), slot start inclusive"),
+    end: datetime = Query(..., alias="to", description="JST end datetime (ISO 8601), slot start exclusive"),
+    status_filter: list[ReservationStatus] = Query(default=[], alias="status"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=100, ge=1, le=reservation_usecase.MAX_SHOP_RESERVATIONS_LIMIT),
+    session: AsyncSession = Depends(get_session),
+) -> ShopReservationPage:
+    """Reservations of a shop by slot start, paged with a keyset cursor."""
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="from/to must have timezone")
+    try:
+        rows, next_cursor, has_more = await reservation_usecase.list_shop_reservations(
+            SqlAlchemyReservationRepository(session),
+            shop_id=shop_id,
+            start=to_utc_naive(start),
+            end=to_utc_naive(end),
+            statuses=status_filter,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return ShopReservationPage(
+        reservations=[ShopReservationItem.from_row(row=row) for row in rows],
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
+
+
+@router.post("/{shop_id}/reservations/cancel")
+async def cancel_shop_reservations(
+    shop_id: int,
+    payload: ShopReservationCancel,
+    session: AsyncSession = Depends(get_session),
+) -> StreamingResponse:
+    """Cancel all active reservations in a slot or range; streams cancelled rows as NDJSON."""
+    if (payload.start is not None and payload.start.tzinfo is None) or (
+        payload.end is not None and payload.end.tzinfo is None
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start/end must have timezone")
+    utc_start = to_utc_naive(payload.start) if payload.start is not None else None
+    utc_end = to_utc_naive(payload.end) if payload.end is not None else None
+
+    res_repo = SqlAlchemyReservationRepository(session)
+    async with session.begin():
+        try:
+            cancelled = await reservation_usecase.cancel_shop_reservations(
+                res_repo,
+                shop_id=shop_id,
+                slot_id=payload.slot_id,
+                start=utc_start,
+                end=utc_end,
+                seat_id=payload.seat_id,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        try:
+            await emit_audit_logs(
+                [
+                    AuditRecord(
+                        action="reservation.shop_cancelled",
+                        initiator="shop",
+                        reservation_id=change.reservation_id,
+                        slot_id=change.slot_id,
+                        shop_id=change.shop_id,
+                        user_id=change.user_id,
+                        party_size=change.party_size,
+                        status_from=change.status_from,
+                        status_to=change.status_to,
+                        version=change.version,
+                        message=payload.message,
+                    )
+                    for change in cancelled
+                ],
+                outbox=SqlAlchemyAuditOutboxRepository(session),
+            )
+        except RuntimeError as exc:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="audit log failed") from exc
+        await SqlAlchemyChangeLogRepository(session).append(
+            change_usecase.reservations_changed(cancelled, action="shop_cancelled")
+        )
+
+    return StreamingResponse(
+        _iter_ndjson(cancelled),
+        media_type="application/x-ndjson",
+        headers={"X-Cancelled-Count": str(len(cancelled))},
+    )
+
+
+@router.get("/{shop_id}/policy", response_model=ShopPolicyRead)
+async def get_shop_policy(
+    shop_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> ShopPolicyRead:
+    policy = await SqlAlchemyShopPolicyRepository(session).get(shop_id)
+    if policy is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="policy not found")
+    return ShopPolicyRead.from_db(policy=policy)
+
+
+@router.put("/{shop_id}/policy", response_model=ShopPolicyRead)
+async def update_shop_policy(
+    shop_id: int,
+    payload: ShopPolicyUpdate,
+    session: AsyncSession = Depends(get_session),
+) -> ShopPolicyRead:
+    """Replace the shop's booking policy; every worker's policy cache drops it after commit."""
+    async with session.begin():
+        try:
+            policy = await policy_usecase.update_shop_policy(
+                SqlAlchemyShopPolicyRepository(session),
+                shop_id=shop_id,
+                policy=BookingPolicy(
+                    cutoff_days=payload.cutoff_days,
+                    default_dwell_minutes=payload.default_dwell_minutes,
+                    max_party_size=payload.max_party_size,
+                    reject_user_overlap=payload.reject_user_overlap,
+                    capacity_mode=payload.capacity_mode,
+                ),
+                window_capacity=payload.window_capacity,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        except IntegrityError as exc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="shop not found") from exc
+        result = ShopPolicyRead.from_db(policy=policy)
+
+    publish_invalidations(policies=[shop_id])
+    return result
+
+
+@router.get("/{shop_id}/changes", response_model=ChangeFeed)
+async def list_changes(
+    shop_id: int,
+    since: int = Query(default=0, ge=0, description="cursor: next_cursor of the previous page (0 = from the start)"),
+    limit: int = Query(default=100, ge=1, le=change_usecase.MAX_CHANGES_LIMIT),
+    session: AsyncSession = Depends(get_session),
+) -> ChangeFeed:
+    """Slot/reservation mutations of a shop in commit order, for incremental sync."""
+    rows, next_cursor, has_more = await change_usecase.list_changes(
+        SqlAlchemyChangeLogRepository(session),
+        shop_id=shop_id,
+        since=since,
+        limit=limit,
+    )
+    return ChangeFeed(
+        changes=[ChangeRead.from_db(change=row) for row in rows],
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
+
+
+@router.get("/{shop_id}/dashboard/occupancy", response_model=OccupancyDashboard)
+async def occupancy_dashboard(
+    shop_id: int,
+    start: datetime = Query(..., description="JST start datetime (ISO 8601)"),
+    end: datetime = Query(..., description="JST end datetime (ISO 8601)"),
+    bucket_minutes: int = Query(default=60, ge=dashboard_usecase.MIN_BUCKET_MINUTES, le=24 * 60),
+    session: AsyncSession = Depends(get_session),
+) -> OccupancyDashboard:
+    """Seat x time-bucket utilization (reserved seat-time / open seat-time, in percent)."""
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start/end must have timezone")
+    try:
+        grid = await dashboard_usecase.occupancy(
+            SqlAlchemyDashboardRepository(session),
+            shop_id=shop_id,
+            start=to_utc_naive(start),
+            end=to_utc_naive(end),
+            bucket_minutes=bucket_minutes,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return OccupancyDashboard(
+        bucket_minutes=bucket_minutes,
+        seats=grid.seats,
+        bucket_starts=[datetime.fromtimestamp(edge, timezone.utc) for edge in grid.bucket_starts],
+        occupancy=grid.occupancy,
+        seat_utilization=grid.seat_utilization,
+        hour_utilization=grid.hour_utilization,
+    )
+
+
+def _iter_ndjson(changes: Sequence[ReservationStatusChange]) -> Iterator[bytes]:
+    """Serialize rows in chunks so large cancellations are not rendered as one body."""
+    for offset in range(0, len(changes), STREAM_CHUNK_SIZE):
+        chunk = changes[offset : offset + STREAM_CHUNK_SIZE]
+        yield b"".join(
+            ShopCancelledReservation(
+                reservation_id=change.reservation_id,
+                slot_id=change.slot_id,
+                user_id=change.user_id,
+                party_size=change.party_size,
+                status_from=change.status_from,
+                status_to=change.status_to,
+                version=change.version,
+            )
+            .model_dump_json()
+            .encode()
+            + b"\n"
+            for change in chunk
+        )
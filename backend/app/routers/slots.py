@@ -1,19 +1,95 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..deps import get_current_user_id, get_session
-from ..infrastructure.repositories import SqlAlchemySlotRepository
-from ..schemas import SlotAvailability, SlotAvailabilityList, SlotCreate, SlotRead
+from ..domain.services import AvailabilityDelta
+from ..infrastructure.repositories import (
+    SqlAlchemyChangeLogRepository,
+    SqlAlchemyReservationRepository,
+    SqlAlchemyShopPolicyRepository,
+    SqlAlchemySlotRepository,
+)
+from ..schemas import (
+    AvailabilityBucketRead,
+    AvailabilityHeatmap,
+    DwellOptionRead,
+    DwellSearchResult,
+    MultiShopAvailability,
+    ReservationRead,
+    ShopAvailability,
+    SlotAvailability,
+    SlotAvailabilityList,
+    SlotBulkStatusResult,
+    SlotBulkStatusUpdate,
+    SlotCreate,
+    SlotRead,
+)
+from ..usecases import changes as change_usecase
 from ..usecases import slots as slot_usecase
+from ..utils.availability_snapshot import get_availability_snapshot
+from ..utils.availability_stream import (
+    availability_subscribed,
+    encode_frame,
+    get_availability_hub,
+    publish_availability,
+)
+from ..utils.invalidation_bus import publish_invalidations
 from ..utils.time import to_utc_naive, utc_naive_to_jst
 
 router = APIRouter(prefix="/shops", tags=["slots"], dependencies=[Depends(get_current_user_id)])
 
 
+@router.get("/availability", response_model=MultiShopAvailability)
+async def list_availability_for_shops(
+    shop_id: list[int] = Query(..., description="Repeat for each shop (at most 100)"),
+    start: datetime = Query(..., description="JST start datetime (ISO 8601)"),
+    end: datetime = Query(..., description="JST end datetime (ISO 8601)"),
+    session: AsyncSession = Depends(get_session),
+) -> MultiShopAvailability:
+    """Availability of many shops over one window: hot shops from the snapshot, the rest in one IN query.
+
+    The body is built in one piece: the rows are already in memory after the query, and
+    MAX_BATCH_SHOPS bounds the response to 100 shops' slots over the window.
+    """
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start/end must have timezone")
+    utc_start = to_utc_naive(start)
+    utc_end = to_utc_naive(end)
+    shop_ids = list(dict.fromkeys(shop_id))
+    if len(shop_ids) > slot_usecase.MAX_BATCH_SHOPS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="too many shops")
+    from_snapshot: dict[int, SlotAvailabilityList] = {}
+    snapshot = get_availability_snapshot()
+    if snapshot is not None:
+        for sid in shop_ids:
+            deltas = snapshot.query(sid, start=utc_start, end=utc_end, seat_id=None)
+            if deltas is not None:
+                from_snapshot[sid] = _snapshot_list(deltas)
+    try:
+        grouped = await slot_usecase.list_availability_for_shops(
+            SqlAlchemySlotRepository(session),
+            shop_ids=[sid for sid in shop_ids if sid not in from_snapshot],
+            start=utc_start,
+            end=utc_end,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return MultiShopAvailability(
+        shops=[
+            ShopAvailability(
+                shop_id=sid,
+                items=from_snapshot[sid].items if sid in from_snapshot else _availability_list(grouped[sid]).items,
+            )
+            for sid in shop_ids
+        ]
+    )
+
+
 @router.get("/{shop_id}/slots/availability", response_model=SlotAvailabilityList)
 async def list_availability(
     shop_id: int,
@@ -27,6 +103,12 @@ async def list_availability(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start/end must have timezone")
     utc_start = to_utc_naive(start)
     utc_end = to_utc_naive(end)
+    snapshot = get_availability_snapshot()
+    if snapshot is not None:
+        # Hot shops are answered from shared memory; None means not covered or stale.
+        deltas = snapshot.query(shop_id, start=utc_start, end=utc_end, seat_id=seat_id)
+        if deltas is not None:
+            return _snapshot_list(deltas)
     rows = await slot_usecase.list_availability(
         slot_repo,
         shop_id=shop_id,
@@ -34,20 +116,146 @@ async def list_availability(
         end=utc_end,
         seat_id=seat_id,
     )
-    return SlotAvailabilityList(
+    return _availability_list(rows)
+
+
+@router.get("/{shop_id}/slots/heatmap", response_model=AvailabilityHeatmap)
+async def availability_heatmap(
+    shop_id: int,
+    start: datetime = Query(..., description="JST start datetime (ISO 8601)"),
+    end: datetime = Query(..., description="JST end datetime (ISO 8601)"),
+    bucket: Literal["day", "hour"] = Query(default="day"),
+    session: AsyncSession = Depends(get_session),
+) -> AvailabilityHeatmap:
+    """Calendar totals per JST day or hour of slot start, aggregated in the database."""
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start/end must have timezone")
+    try:
+        buckets = await slot_usecase.availability_heatmap(
+            SqlAlchemySlotRepository(session),
+            shop_id=shop_id,
+            start=to_utc_naive(start),
+            end=to_utc_naive(end),
+            bucket=bucket,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return AvailabilityHeatmap(
+        bucket=bucket,
         items=[
-            SlotAvailability(
-                slot_id=entry["slot"].id,
-                shop_id=entry["slot"].shop_id,
-                seat_id=entry["slot"].seat_id,
-                starts_at=utc_naive_to_jst(entry["slot"].starts_at),
-                ends_at=utc_naive_to_jst(entry["slot"].ends_at),
-                capacity=entry["slot"].capacity,
-                status=entry["slot"].status,
-                remaining=entry["remaining"],
+            AvailabilityBucketRead(
+                starts_at=utc_naive_to_jst(item.starts_at),
+                capacity=item.capacity,
+                reserved=item.reserved,
+                bookable_slots=item.bookable_slots,
             )
-            for entry in rows
-        ]
+            for item in buckets
+        ],
+    )
+
+
+@router.get("/{shop_id}/slots/next-available", response_model=SlotAvailabilityList)
+async def next_available(
+    shop_id: int,
+    party_size: int = Query(..., ge=1),
+    after: Optional[datetime] = Query(default=None, description="JST datetime (ISO 8601); defaults to now"),
+    seat_id: Optional[int] = Query(default=None),
+    limit: int = Query(default=1, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+) -> SlotAvailabilityList:
+    """Earliest slots with room for the party; cost grows with the distance to the answer."""
+    if after is not None and after.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="after must have timezone")
+    utc_after = to_utc_naive(after) if after is not None else datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = await slot_usecase.next_available(
+        SqlAlchemySlotRepository(session),
+        shop_id=shop_id,
+        after=utc_after,
+        party_size=party_size,
+        seat_id=seat_id,
+        limit=limit,
+    )
+    return _availability_list(rows)
+
+
+@router.get("/{shop_id}/slots/search", response_model=DwellSearchResult)
+async def search_dwell(
+    shop_id: int,
+    desired_start: datetime = Query(..., description="JST start of the stay (ISO 8601)"),
+    party_size: int = Query(..., ge=1),
+    dwell_minutes: Optional[int] = Query(default=None, ge=1, le=24 * 60, description="Defaults to the shop's"),
+    session: AsyncSession = Depends(get_session),
+) -> DwellSearchResult:
+    """Seats bookable for the whole stay, within one slot or across back-to-back slots."""
+    if desired_start.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="desired_start must have timezone")
+    try:
+        dwell, options = await slot_usecase.search_dwell(
+            SqlAlchemySlotRepository(session),
+            SqlAlchemyShopPolicyRepository(session),
+            shop_id=shop_id,
+            desired_start=to_utc_naive(desired_start),
+            dwell_minutes=dwell_minutes,
+            party_size=party_size,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return DwellSearchResult(
+        dwell_minutes=dwell,
+        items=[
+            DwellOptionRead(
+                seat_id=option.seat_id,
+                slot_ids=list(option.slot_ids),
+                starts_at=utc_naive_to_jst(option.starts_at),
+                ends_at=utc_naive_to_jst(option.ends_at),
+                remaining=option.remaining,
+            )
+            for option in options
+        ],
+    )
+
+
+@router.get("/{shop_id}/slots/availability/stream")
+async def stream_availability(
+    shop_id: int,
+    start: datetime = Query(..., description="JST start datetime (ISO 8601)"),
+    end: datetime = Query(..., description="JST end datetime (ISO 8601)"),
+    session: AsyncSession = Depends(get_session),
+) -> StreamingResponse:
+    """Server-Sent Events: a `snapshot` of the range, then an `availability` event per changed slot.
+
+    Event ids are change-feed seqs; a client keeps, per slot, the event with the highest seq.
+    """
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start/end must have timezone")
+    utc_start = to_utc_naive(start)
+    utc_end = to_utc_naive(end)
+    if utc_start >= utc_end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be earlier than end")
+    hub = get_availability_hub()
+    if hub is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="streaming unavailable")
+    # Subscribe before reading the snapshot so no commit falls between the two.
+    subscription = hub.subscribe(shop_id, start=utc_start, end=utc_end)
+    try:
+        async with session.begin():
+            # One consistent read: the seq matches the snapshot it is sent with.
+            seq = await SqlAlchemyChangeLogRepository(session).last_seq(shop_id)
+            rows = await slot_usecase.list_availability(
+                SqlAlchemySlotRepository(session),
+                shop_id=shop_id,
+                start=utc_start,
+                end=utc_end,
+                seat_id=None,
+            )
+    except BaseException:
+        hub.unsubscribe(subscription)
+        raise
+    snapshot = encode_frame("snapshot", _availability_list(rows).model_dump_json(), seq=seq)
+    return StreamingResponse(
+        hub.stream(subscription, first=snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -79,17 +287,97 @@ async def create_slot(
                 capacity=payload.capacity,
                 status=payload.status,
             )
+            seqs = await SqlAlchemyChangeLogRepository(session).append(
+                [change_usecase.slot_changed(slot, action="created")]
+            )
         except ValueError as exc:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
         except IntegrityError as exc:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="slot already exists") from exc
 
+    if availability_subscribed(shop_id):
+        publish_availability([slot_usecase.availability_delta(slot, reserved=0)], seq=seqs.get(shop_id, 0))
+    publish_invalidations(shops=[shop_id], slots=[slot.id])
     return SlotRead.from_db(slot=slot)
 
 
+@router.post("/{shop_id}/slots/bulk-status", response_model=SlotBulkStatusResult)
+async def bulk_update_slot_status(
+    shop_id: int,
+    payload: SlotBulkStatusUpdate,
+    session: AsyncSession = Depends(get_session),
+) -> SlotBulkStatusResult:
+    if payload.start.tzinfo is None or payload.end.tzinfo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start/end must have timezone")
+    utc_start = to_utc_naive(payload.start)
+    utc_end = to_utc_naive(payload.end)
+
+    slot_repo = SqlAlchemySlotRepository(session)
+    res_repo = SqlAlchemyReservationRepository(session)
+    async with session.begin():
+        try:
+            updated, stranded = await slot_usecase.bulk_update_status(
+                slot_repo,
+                res_repo,
+                shop_id=shop_id,
+                start=utc_start,
+                end=utc_end,
+                seat_id=payload.seat_id,
+                status=payload.status,
+                include_stranded=payload.include_stranded,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        await SqlAlchemyChangeLogRepository(session).append(
+            change_usecase.slots_changed(updated, shop_id=shop_id, action="status_changed", status=str(payload.status))
+        )
+
+    publish_invalidations(shops=[shop_id], slots=updated)
+    return SlotBulkStatusResult(
+        updated=len(updated),
+        stranded=[ReservationRead.from_db(reservation=res, slot=slot, shop_id=slot.shop_id) for res, slot in stranded],
+    )
+
+
 def _is_jst(dt: datetime) -> bool:
     """Return True when tz offset is exactly +09:00."""
     if dt.tzinfo is None:
         return False
     offset = dt.tzinfo.utcoffset(dt)
     return offset == timedelta(hours=9)
+
+
+def _snapshot_list(deltas: list[AvailabilityDelta]) -> SlotAvailabilityList:
+    return SlotAvailabilityList(
+        items=[
+            SlotAvailability(
+                slot_id=delta.slot_id,
+                shop_id=delta.shop_id,
+                seat_id=delta.seat_id,
+                starts_at=utc_naive_to_jst(delta.starts_at),
+                ends_at=utc_naive_to_jst(delta.ends_at),
+                capacity=delta.capacity,
+                status=delta.status,
+                remaining=delta.remaining,
+            )
+            for delta in deltas
+        ]
+    )
+
+
+def _availability_list(rows: list[dict[str, Any]]) -> SlotAvailabilityList:
+    return SlotAvailabilityList(
+        items=[
+            SlotAvailability(
+                slot_id=entry["slot"].id,
+                shop_id=entry["slot"].shop_id,
+                seat_id=entry["slot"].seat_id,
+                starts_at=utc_naive_to_jst(entry["slot"].starts_at),
+                ends_at=utc_naive_to_jst(entry["slot"].ends_at),
+                capacity=entry["slot"].capacity,
+                status=entry["slot"].status,
+                remaining=entry["remaining"],
+            )
+            for entry in rows
+        ]
+    )
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..deps import get_current_user_id, get_session
+from ..domain.errors import CapacityError, DuplicateReservationError, SlotNotOpenError, WaitlistNotAllowedError
+from ..infrastructure.repositories import (
+    SqlAlchemyReservationRepository,
+    SqlAlchemyShopPolicyRepository,
+    SqlAlchemySlotRepository,
+    SqlAlchemyWaitlistRepository,
+)
+from ..schemas import WaitlistEntryRead, WaitlistJoin
+from ..usecases import waitlist as waitlist_usecase
+
+router = APIRouter(prefix="", tags=["waitlist"])
+
+
+@router.post("/waitlist", response_model=WaitlistEntryRead, status_code=status.HTTP_201_CREATED)
+async def join_waitlist(
+    payload: WaitlistJoin,
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(get_current_user_id),
+) -> WaitlistEntryRead:
+    slot_repo = SqlAlchemySlotRepository(session)
+    res_repo = SqlAlchemyReservationRepository(session)
+    waitlist_repo = SqlAlchemyWaitlistRepository(session)
+    async with session.begin():
+        try:
+            entry = await waitlist_usecase.join_waitlist(
+                slot_repo,
+                res_repo,
+                waitlist_repo,
+                slot_id=payload.slot_id,
+                user_id=user_id,
+                party_size=payload.party_size,
+                policy_repo=SqlAlchemyShopPolicyRepository(session),
+            )
+        except SlotNotOpenError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="slot not available")
+        except DuplicateReservationError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="already reserved")
+        except IntegrityError as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="already on waitlist") from exc
+        except CapacityError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        except WaitlistNotAllowedError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="slot has capacity; book directly")
+
+    return WaitlistEntryRead.from_db(entry=entry)
+
+
+@router.delete("/me/waitlist/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_waitlist(
+    entry_id: int = Path(..., ge=1),
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(get_current_user_id),
+) -> Response:
+    waitlist_repo = SqlAlchemyWaitlistRepository(session)
+    async with session.begin():
+        removed = await waitlist_usecase.leave_waitlist(waitlist_repo, entry_id=entry_id, user_id=user_id)
+    if not removed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="waitlist entry not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
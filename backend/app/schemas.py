@@ -1,9 +1,20 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, field_serializer
 
-from .models import Reservation, ReservationStatus, Slot, SlotStatus
+from .domain.services import ShopReservationRow
+from .models import (
+    CapacityMode,
+    ChangeLog,
+    Reservation,
+    ReservationStatus,
+    SeatHold,
+    ShopPolicy,
+    Slot,
+    SlotStatus,
+    WaitlistEntry,
+)
 from .utils.time import JST, utc_naive_to_jst
 
 
@@ -26,6 +37,48 @@ class SlotAvailabilityList(BaseModel):
     items: list[SlotAvailability]
 
 
+class AvailabilityBucketRead(BaseModel):
+    starts_at: datetime
+    capacity: int
+    reserved: int
+    bookable_slots: int
+
+    @field_serializer("starts_at")
+    def _ser_datetime(self, dt: datetime) -> str:
+        return dt.astimezone(JST).isoformat()
+
+
+class AvailabilityHeatmap(BaseModel):
+    bucket: Literal["day", "hour"]
+    items: list[AvailabilityBucketRead]
+
+
+class DwellOptionRead(BaseModel):
+    seat_id: Optional[int]
+    slot_ids: list[int]
+    starts_at: datetime
+    ends_at: datetime
+    remaining: int
+
+    @field_serializer("starts_at", "ends_at")
+    def _ser_datetime(self, dt: datetime) -> str:
+        return dt.astimezone(JST).isoformat()
+
+
+class DwellSearchResult(BaseModel):
+    dwell_minutes: int
+    items: list[DwellOptionRead]
+
+
+class ShopAvailability(BaseModel):
+    shop_id: int
+    items: list[SlotAvailability]
+
+
+class MultiShopAvailability(BaseModel):
+    shops: list[ShopAvailability]
+
+
 class SlotCreate(BaseModel):
     seat_id: Optional[int] = None
     starts_at: datetime
@@ -34,6 +87,14 @@ class SlotCreate(BaseModel):
     status: SlotStatus = SlotStatus.OPEN
 
 
+class SlotBulkStatusUpdate(BaseModel):
+    start: datetime
+    end: datetime
+    seat_id: Optional[int] = None
+    status: SlotStatus
+    include_stranded: bool = False
+
+
 class SlotRead(BaseModel):
     slot_id: int
     shop_id: int
@@ -61,8 +122,64 @@ class SlotRead(BaseModel):
 
 
 class ReservationCreate(BaseModel):
+    """Book `slot_id`, or the best-fit seat of `shop_id` starting at `starts_at` when it is omitted."""
+
+    slot_id: Optional[int] = None
+    party_size: int = Field(ge=1)
+    hold_id: Optional[int] = Field(default=None, ge=1)
+    shop_id: Optional[int] = Field(default=None, ge=1)
+    starts_at: Optional[datetime] = Field(default=None, description="JST start datetime (ISO 8601)")
+
+
+class HoldCreate(BaseModel):
     slot_id: int
     party_size: int = Field(ge=1)
+    ttl_minutes: Optional[int] = Field(default=None, ge=1)
+
+
+class HoldRead(BaseModel):
+    hold_id: int
+    slot_id: int
+    party_size: int
+    expires_at: datetime
+
+    @field_serializer("expires_at")
+    def _ser_datetime(self, dt: datetime) -> str:
+        return dt.astimezone(JST).isoformat()
+
+    @classmethod
+    def from_db(cls, *, hold: SeatHold) -> "HoldRead":
+        return cls(
+            hold_id=hold.id,
+            slot_id=hold.slot_id,
+            party_size=hold.party_size,
+            expires_at=utc_naive_to_jst(hold.expires_at),
+        )
+
+
+class WaitlistJoin(BaseModel):
+    slot_id: int
+    party_size: int = Field(ge=1)
+
+
+class WaitlistEntryRead(BaseModel):
+    entry_id: int
+    slot_id: int
+    party_size: int
+    created_at: datetime
+
+    @field_serializer("created_at")
+    def _ser_datetime(self, dt: datetime) -> str:
+        return dt.astimezone(JST).isoformat()
+
+    @classmethod
+    def from_db(cls, *, entry: WaitlistEntry) -> "WaitlistEntryRead":
+        return cls(
+            entry_id=entry.id,
+            slot_id=entry.slot_id,
+            party_size=entry.party_size,
+            created_at=utc_naive_to_jst(entry.created_at),
+        )
 
 
 class ReservationCancel(BaseModel):
@@ -74,6 +191,65 @@ class ReservationReschedule(BaseModel):
     version: Optional[int] = Field(default=None, ge=1)
 
 
+class ReservationResize(BaseModel):
+    party_size: int = Field(ge=1)
+    version: Optional[int] = Field(default=None, ge=1)
+
+
+class ShopReservationCancel(BaseModel):
+    slot_id: Optional[int] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    seat_id: Optional[int] = None
+    message: Optional[str] = Field(default=None, max_length=255)
+
+
+class ShopCancelledReservation(BaseModel):
+    reservation_id: int
+    slot_id: int
+    user_id: int
+    party_size: int
+    status_from: ReservationStatus
+    status_to: ReservationStatus
+    version: int
+
+
+class ShopReservationItem(BaseModel):
+    reservation_id: int
+    slot_id: int
+    seat_id: Optional[int]
+    starts_at: datetime
+    ends_at: datetime
+    user_id: int
+    party_size: int
+    status: ReservationStatus
+    version: int
+
+    @field_serializer("starts_at", "ends_at")
+    def _ser_datetime(self, dt: datetime) -> str:
+        return dt.astimezone(JST).isoformat()
+
+    @classmethod
+    def from_row(cls, *, row: ShopReservationRow) -> "ShopReservationItem":
+        return cls(
+            reservation_id=row.reservation_id,
+            slot_id=row.slot_id,
+            seat_id=row.seat_id,
+            starts_at=utc_naive_to_jst(row.starts_at),
+            ends_at=utc_naive_to_jst(row.ends_at),
+            user_id=row.user_id,
+            party_size=row.party_size,
+            status=row.status,
+            version=row.version,
+        )
+
+
+class ShopReservationPage(BaseModel):
+    reservations: list[ShopReservationItem]
+    next_cursor: Optional[str]
+    has_more: bool
+
+
 class ReservationRead(BaseModel):
     reservation_id: int
     slot_id: int
@@ -110,3 +286,88 @@ class ReservationRead(BaseModel):
             seat_id=slot.seat_id,
             shop_id=shop_id,
         )
+
+
+class OccupancyDashboard(BaseModel):
+    bucket_minutes: int
+    seats: list[Optional[int]]
+    bucket_starts: list[datetime]
+    occupancy: list[list[Optional[float]]]
+    seat_utilization: list[Optional[float]]
+    hour_utilization: list[Optional[float]]
+
+    @field_serializer("bucket_starts")
+    def _ser_datetimes(self, values: list[datetime]) -> list[str]:
+        return [dt.astimezone(JST).isoformat() for dt in values]
+
+
+class SlotBulkStatusResult(BaseModel):
+    updated: int
+    stranded: list[ReservationRead] = Field(default_factory=list)
+
+
+class ChangeRead(BaseModel):
+    seq: int
+    entity: str
+    entity_id: int
+    slot_id: int
+    action: str
+    status: str
+    version: Optional[int]
+    changed_at: datetime
+
+    @field_serializer("changed_at")
+    def _ser_datetime(self, dt: datetime) -> str:
+        return dt.astimezone(JST).isoformat()
+
+    @classmethod
+    def from_db(cls, *, change: ChangeLog) -> "ChangeRead":
+        return cls(
+            seq=change.seq,
+            entity=change.entity,
+            entity_id=change.entity_id,
+            slot_id=change.slot_id,
+            action=change.action,
+            status=change.status,
+            version=change.version,
+            changed_at=utc_naive_to_jst(change.created_at),
+        )
+
+
+class ChangeFeed(BaseModel):
+    changes: list[ChangeRead]
+    next_cursor: int
+    has_more: bool
+
+
+class ShopPolicyUpdate(BaseModel):
+    """Full replacement of a shop's policy; omitted fields take the defaults."""
+
+    cutoff_days: int = Field(default=2, ge=0)
+    default_dwell_minutes: int = Field(default=60, ge=1)
+    max_party_size: Optional[int] = Field(default=None, ge=1)
+    reject_user_overlap: bool = False
+    capacity_mode: CapacityMode = CapacityMode.SLOT
+    window_capacity: Optional[int] = Field(default=None, ge=1)
+
+
+class ShopPolicyRead(BaseModel):
+    shop_id: int
+    cutoff_days: int
+    default_dwell_minutes: int
+    max_party_size: Optional[int]
+    reject_user_overlap: bool
+    capacity_mode: CapacityMode
+    window_capacity: Optional[int]
+
+    @classmethod
+    def from_db(cls, *, policy: ShopPolicy) -> "ShopPolicyRead":
+        return cls(
+            shop_id=policy.shop_id,
+            cutoff_days=policy.cutoff_days,
+            default_dwell_minutes=policy.default_dwell_minutes,
+            max_party_size=policy.max_party_size,
+            reject_user_overlap=policy.reject_user_overlap,
+            capacity_mode=policy.capacity_mode,
+            window_capacity=policy.window_capacity,
+        )
@@ -0,0 +1,72 @@
+from typing import Iterable, Sequence
+
+from ..domain.repositories import ChangeLogRepository
+from ..domain.services import ChangeEvent, ReservationStatusChange
+from ..models import ChangeLog, Reservation, Slot
+
+MAX_CHANGES_LIMIT = 1000
+
+
+def reservation_changed(reservation: Reservation, *, shop_id: int, action: str) -> ChangeEvent:
+    return ChangeEvent(
+        shop_id=shop_id,
+        entity="reservation",
+        entity_id=reservation.id,
+        slot_id=reservation.slot_id,
+        action=action,
+        status=str(reservation.status),
+        version=reservation.version,
+    )
+
+
+def reservations_changed(changes: Iterable[ReservationStatusChange], *, action: str) -> list[ChangeEvent]:
+    return [
+        ChangeEvent(
+            shop_id=change.shop_id,
+            entity="reservation",
+            entity_id=change.reservation_id,
+            slot_id=change.slot_id,
+            action=action,
+            status=str(change.status_to),
+            version=change.version,
+        )
+        for change in changes
+    ]
+
+
+def slots_changed(slot_ids: Iterable[int], *, shop_id: int, action: str, status: str) -> list[ChangeEvent]:
+    """Events for slots updated set-wise, e.g. the ids returned by a bulk status update."""
+    return [
+        ChangeEvent(shop_id=shop_id, entity="slot", entity_id=slot_id, slot_id=slot_id, action=action, status=status)
+        for slot_id in slot_ids
+    ]
+
+
+def slot_changed(slot: Slot, *, action: str) -> ChangeEvent:
+    return ChangeEvent(
+        shop_id=slot.shop_id,
+        entity="slot",
+        entity_id=slot.id,
+        slot_id=slot.id,
+        action=action,
+        status=str(slot.status),
+    )
+
+
+async def list_changes(
+    change_repo: ChangeLogRepository,
+    *,
+    shop_id: int,
+    since: int,
+    limit: int,
+) -> tuple[Sequence[ChangeLog], int, bool]:
+    """Changes after cursor `since`, oldest first. Returns (changes, next cursor, has_more)."""
+    if since < 0:
+        raise ValueError("since must be >= 0")
+    if not 1 <= limit <= MAX_CHANGES_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_CHANGES_LIMIT}")
+    rows = await change_repo.list_since(shop_id, since, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1].seq if rows else since
+    return rows, next_cursor, has_more
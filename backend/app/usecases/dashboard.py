@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from ..domain.repositories import DashboardRepository
+from ..utils.occupancy import OccupancyGrid, occupancy_grid
+from .slots import MAX_SLOT_LENGTH
+
+MAX_DASHBOARD_RANGE = timedelta(days=92)
+MIN_BUCKET_MINUTES = 15
+
+
+def _epoch(value: datetime) -> int:
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+
+async def occupancy(
+    repo: DashboardRepository,
+    *,
+    shop_id: int,
+    start: datetime,
+    end: datetime,
+    bucket_minutes: int,
+) -> OccupancyGrid:
+    """Seat x time-bucket utilization of a shop, plus per-seat and per-JST-hour totals."""
+    if start >= end:
+        raise ValueError("start must be earlier than end")
+    if end - start > MAX_DASHBOARD_RANGE:
+        raise ValueError("range must be at most 92 days")
+    if bucket_minutes < MIN_BUCKET_MINUTES or (24 * 60) % bucket_minutes:
+        raise ValueError("bucket_minutes must divide a day and be at least 15")
+    columns = await repo.occupancy_columns(shop_id, start=start, end=end, starts_from=start - MAX_SLOT_LENGTH)
+    # numpy releases the GIL for the sorts and sums; keep large shops off the event loop.
+    return await asyncio.to_thread(
+        occupancy_grid, columns, start=_epoch(start), end=_epoch(end), bucket_seconds=bucket_minutes * 60
+    )
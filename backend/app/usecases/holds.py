@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from ..domain.errors import SlotNotOpenError
+from ..domain.repositories import HoldRepository, ReservationRepository, SlotRepository
+from ..domain.services import SlotSnapshot, validate_reservation
+from ..models import SeatHold, Slot
+
+
+async def create_hold(
+    slot_repo: SlotRepository,
+    res_repo: ReservationRepository,
+    hold_repo: HoldRepository,
+    *,
+    slot_id: int,
+    user_id: int,
+    party_size: int,
+    ttl: timedelta,
+    now: datetime,
+) -> tuple[SeatHold, Slot]:
+    """Claim capacity on a slot until `now + ttl` in one short transaction."""
+    slot = await slot_repo.get_for_update(slot_id)
+    if slot is None:
+        raise SlotNotOpenError("slot not found")
+
+    held = await hold_repo.reclaim_expired(slot, now)
+    user_has_active = await res_repo.user_has_active(slot_id, user_id)
+    reserved = await res_repo.sum_reserved(slot_id)
+    snapshot = SlotSnapshot(
+        status=slot.status,
+        capacity=slot.capacity,
+        reserved=reserved,
+        user_has_active_reservation=user_has_active,
+        held=held,
+    )
+    validate_reservation(snapshot, party_size=party_size)
+
+    hold = await hold_repo.create(slot=slot, user_id=user_id, party_size=party_size, expires_at=now + ttl)
+    return hold, slot
+
+
+async def reclaim_expired_holds(
+    slot_repo: SlotRepository,
+    hold_repo: HoldRepository,
+    *,
+    now: datetime,
+    batch_size: int,
+) -> int:
+    """Batch sweep: reclaim expired holds for up to `batch_size` slots.
+
+    Slots are locked before holds (same order as the booking path) and slots
+    currently locked by user traffic are skipped until the next run.
+    """
+    slot_ids = await hold_repo.slots_with_expired(now, batch_size)
+    slots = await slot_repo.lock_many_skip_locked(slot_ids)
+    for slot in slots:
+        await hold_repo.reclaim_expired(slot, now)
+    return len(slots)
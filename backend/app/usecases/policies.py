@@ -0,0 +1,16 @@
+from ..domain.repositories import ShopPolicyRepository
+from ..domain.services import BookingPolicy
+from ..models import CapacityMode, ShopPolicy
+
+
+async def update_shop_policy(
+    policy_repo: ShopPolicyRepository,
+    *,
+    shop_id: int,
+    policy: BookingPolicy,
+    window_capacity: int | None,
+) -> ShopPolicy:
+    """Replace the shop's policy; publish a "policy" invalidation after commit so caches drop it."""
+    if policy.capacity_mode == CapacityMode.WINDOW and window_capacity is None:
+        raise ValueError("window_capacity is required when capacity_mode is window")
+    return await policy_repo.save(shop_id, policy, window_capacity=window_capacity)
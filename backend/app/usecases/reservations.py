@@ -1,36 +1,216 @@
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
+from typing import Sequence
 
 from ..domain.errors import (
+    ActiveReservationConflictError,
     CancelNotAllowedError,
+    CapacityError,
+    DuplicateReservationError,
+    HoldNotFoundError,
+    OverlappingReservationError,
     RescheduleNotAllowedError,
     SlotNotOpenError,
     VersionConflictError,
 )
-from ..domain.repositories import ReservationRepository, SlotRepository
-from ..domain.services import SlotSnapshot, validate_reservation
-from ..models import Reservation, ReservationStatus, Slot, SlotStatus
+from ..domain.repositories import HoldRepository, ReservationRepository, ShopPolicyRepository, SlotRepository
+from ..domain.services import (
+    BookingPolicy,
+    ReservationRef,
+    ReservationStatusChange,
+    ShopReservationCursor,
+    ShopReservationRow,
+    SlotSnapshot,
+    live_held,
+    peak_concurrent,
+    validate_reservation,
+)
+from ..models import CapacityMode, Reservation, ReservationStatus, Slot, SlotStatus
+from .slots import MAX_SLOT_LENGTH
+
+# Seat slots tried by create_reservation_any_seat before giving up.
+ANY_SEAT_CANDIDATES = 5
+MAX_SHOP_RESERVATIONS_LIMIT = 500
+CURSOR_TIME_FORMAT = "%Y%m%d%H%M%S"
+
+
+@dataclass(frozen=True)
+class _PolicyChecks:
+    window_capacity: int | None = None
+    window_peak: int = 0
+    user_overlaps: bool = False
+
+
+async def _booking_policy(policy_repo: ShopPolicyRepository | None, shop_id: int) -> BookingPolicy:
+    if policy_repo is None:
+        return BookingPolicy()
+    return await policy_repo.get_booking_policy(shop_id)
+
+
+async def _policy_checks(
+    policy_repo: ShopPolicyRepository | None,
+    res_repo: ReservationRepository,
+    slot: Slot,
+    *,
+    policy: BookingPolicy,
+    user_id: int,
+    exclude_reservation_id: int | None = None,
+) -> _PolicyChecks:
+    """Inputs for the shop-policy rules of validate_reservation; the defaults when none apply."""
+    if policy_repo is None:
+        return _PolicyChecks()
+    starts_from = slot.starts_at - MAX_SLOT_LENGTH
+    user_overlaps = False
+    if policy.reject_user_overlap:
+        # The slot lock does not cover the user's other slots: serialize the check-then-insert per user.
+        await res_repo.lock_user(user_id)
+        user_overlaps = await res_repo.user_has_overlapping(
+            slot.shop_id,
+            user_id,
+            start=slot.starts_at,
+            end=slot.ends_at,
+            starts_from=starts_from,
+            exclude_reservation_id=exclude_reservation_id,
+        )
+    if policy.capacity_mode != CapacityMode.WINDOW:
+        return _PolicyChecks(user_overlaps=user_overlaps)
+    # Overlapping slots of other seats are not covered by our slot lock:
+    # serialize window-mode bookings of the shop on its policy row.
+    locked = await policy_repo.get_for_update(slot.shop_id)
+    if locked is None or locked.capacity_mode != CapacityMode.WINDOW or locked.window_capacity is None:
+        return _PolicyChecks(user_overlaps=user_overlaps)
+    intervals = await res_repo.list_overlapping_party(
+        slot.shop_id,
+        start=slot.starts_at,
+        end=slot.ends_at,
+        starts_from=starts_from,
+        exclude_reservation_id=exclude_reservation_id,
+    )
+    return _PolicyChecks(
+        window_capacity=locked.window_capacity,
+        window_peak=peak_concurrent(intervals, start=slot.starts_at, end=slot.ends_at),
+        user_overlaps=user_overlaps,
+    )
 
 
 async def create_reservation(
     slot_repo: SlotRepository,
     res_repo: ReservationRepository,
     *,
+    hold_repo: HoldRepository,
     slot_id: int,
     user_id: int,
     party_size: int,
+    hold_id: int | None = None,
+    policy_repo: ShopPolicyRepository | None = None,
 ) -> tuple[Reservation, Slot]:
     slot = await slot_repo.get_for_update(slot_id)
     if slot is None:
         raise SlotNotOpenError("slot not found")
+    reservation = await _book_locked_slot(
+        res_repo,
+        hold_repo=hold_repo,
+        policy_repo=policy_repo,
+        policy=await _booking_policy(policy_repo, slot.shop_id),
+        slot=slot,
+        user_id=user_id,
+        party_size=party_size,
+        hold_id=hold_id,
+    )
+    return reservation, slot
 
-    user_has_active = await res_repo.user_has_active(slot_id, user_id)
-    reserved = await res_repo.sum_reserved(slot_id)
+
+async def create_reservation_any_seat(
+    slot_repo: SlotRepository,
+    res_repo: ReservationRepository,
+    *,
+    hold_repo: HoldRepository,
+    shop_id: int,
+    starts_at: datetime,
+    user_id: int,
+    party_size: int,
+    policy_repo: ShopPolicyRepository | None = None,
+) -> tuple[Reservation, Slot]:
+    """Book the best-fit seat slot of the shop starting at `starts_at`.
+
+    Candidates come tightest fit first from one ordered query. Only one candidate
+    is locked at a time, with SKIP LOCKED: a row locked by a concurrent booking, or
+    one that filled up since the query, is skipped in favour of the next candidate.
+    """
+    if party_size <= 0:
+        raise CapacityError("party_size must be positive")
+    policy = await _booking_policy(policy_repo, shop_id)
+    if policy.max_party_size is not None and party_size > policy.max_party_size:
+        raise CapacityError("party size exceeds the shop limit")
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    candidates = await slot_repo.best_fit_seat_slots(
+        shop_id, starts_at=starts_at, party_size=party_size, limit=ANY_SEAT_CANDIDATES, now=now
+    )
+    for slot_id in candidates:
+        locked = await slot_repo.lock_many_skip_locked([slot_id])
+        if not locked:
+            continue
+        slot = locked[0]
+        try:
+            reservation = await _book_locked_slot(
+                res_repo,
+                hold_repo=hold_repo,
+                policy_repo=policy_repo,
+                policy=policy,
+                slot=slot,
+                user_id=user_id,
+                party_size=party_size,
+                hold_id=None,
+            )
+        except OverlappingReservationError:
+            # Holds for every seat at this time: trying other candidates cannot help.
+            raise
+        except ActiveReservationConflictError:
+            # Raised by a failed flush: the session needs a rollback before any further query.
+            raise
+        except (CapacityError, DuplicateReservationError, SlotNotOpenError):
+            continue
+        return reservation, slot
+    raise CapacityError("no seat available")
+
+
+async def _book_locked_slot(
+    res_repo: ReservationRepository,
+    *,
+    hold_repo: HoldRepository,
+    policy_repo: ShopPolicyRepository | None,
+    policy: BookingPolicy,
+    slot: Slot,
+    user_id: int,
+    party_size: int,
+    hold_id: int | None,
+) -> Reservation:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    held = await hold_repo.reclaim_expired(slot, now)
+    hold = None
+    if hold_id is not None:
+        hold = await hold_repo.get_for_update(hold_id, user_id)
+        if hold is None or hold.slot_id != slot.id:
+            raise HoldNotFoundError("hold not found or expired")
+        if party_size > hold.party_size:
+            raise CapacityError("party_size exceeds hold")
+        # The consumed hold's seats are ours: do not count them as taken.
+        held -= hold.party_size
+
+    user_has_active = await res_repo.user_has_active(slot.id, user_id)
+    reserved = await res_repo.sum_reserved(slot.id)
+    checks = await _policy_checks(policy_repo, res_repo, slot, policy=policy, user_id=user_id)
 
     snapshot = SlotSnapshot(
         status=slot.status,
         capacity=slot.capacity,
         reserved=reserved,
         user_has_active_reservation=user_has_active,
+        held=held,
+        window_capacity=checks.window_capacity,
+        window_peak=checks.window_peak,
+        user_has_overlapping_reservation=checks.user_overlaps,
+        max_party_size=policy.max_party_size,
     )
     validate_reservation(snapshot, party_size=party_size)
 
@@ -40,7 +220,9 @@ async def create_reservation(
         party_size=party_size,
         status=ReservationStatus.BOOKED,
     )
-    return reservation, slot
+    if hold is not None:
+        await hold_repo.consume(slot, hold)
+    return reservation
 
 
 async def cancel_reservation(
@@ -49,6 +231,7 @@ async def cancel_reservation(
     reservation_id: int,
     user_id: int,
     version: int,
+    policy_repo: ShopPolicyRepository | None = None,
 ) -> tuple[Reservation, Slot, ReservationStatus]:
     row = await res_repo.get_for_user_for_update(reservation_id, user_id)
     if row is None:
@@ -61,8 +244,9 @@ async def cancel_reservation(
     # Version check after idempotent guard
     if reservation.version != version:
         raise VersionConflictError("version mismatch")
-    # Cancellation cutoff: within 2 days before start is not cancellable by user
-    if _is_within_cutoff(slot.starts_at, days=2):
+    # Cancellation cutoff: within the shop's cutoff days before start is not cancellable by user
+    policy = await _booking_policy(policy_repo, slot.shop_id)
+    if _is_within_cutoff(slot.starts_at, days=policy.cutoff_days):
         raise CancelNotAllowedError("cancellation window closed")
 
     reservation.status = ReservationStatus.CANCELLED
@@ -80,6 +264,7 @@ async def reschedule_reservation(
     user_id: int,
     new_slot_id: int,
     version: int,
+    policy_repo: ShopPolicyRepository | None = None,
 ) -> tuple[Reservation, Slot, int]:
     row = await res_repo.get_for_user_for_update(reservation_id, user_id)
     if row is None:
@@ -89,7 +274,8 @@ async def reschedule_reservation(
         raise RescheduleNotAllowedError("reservation is not reschedulable")
     if reservation.version != version:
         raise VersionConflictError("version mismatch")
-    if _is_within_cutoff(current_slot.starts_at, days=2):
+    policy = await _booking_policy(policy_repo, current_slot.shop_id)
+    if _is_within_cutoff(current_slot.starts_at, days=policy.cutoff_days):
         raise RescheduleNotAllowedError("reschedule window closed")
     if reservation.slot_id == new_slot_id:
         # Idempotent: already on the requested slot
@@ -103,11 +289,29 @@ async def reschedule_reservation(
 
     user_has_active = await res_repo.user_has_active(new_slot_id, user_id)
     reserved = await res_repo.sum_reserved(new_slot_id)
+    # The moved reservation leaves its old slot, so it must not count against the new one.
+    checks = await _policy_checks(
+        policy_repo,
+        res_repo,
+        target_slot,
+        policy=policy,
+        user_id=user_id,
+        exclude_reservation_id=reservation.id,
+    )
     snapshot = SlotSnapshot(
         status=target_slot.status,
         capacity=target_slot.capacity,
         reserved=reserved,
         user_has_active_reservation=user_has_active,
+        held=live_held(
+            target_slot.held,
+            target_slot.held_until,
+            now=datetime.now(timezone.utc).replace(tzinfo=None),
+        ),
+        window_capacity=checks.window_capacity,
+        window_peak=checks.window_peak,
+        user_has_overlapping_reservation=checks.user_overlaps,
+        max_party_size=policy.max_party_size,
     )
     validate_reservation(snapshot, party_size=reservation.party_size)
 
@@ -120,6 +324,64 @@ async def reschedule_reservation(
     return updated, target_slot, previous_slot_id
 
 
+async def resize_reservation(
+    res_repo: ReservationRepository,
+    *,
+    reservation_id: int,
+    user_id: int,
+    party_size: int,
+    version: int,
+    policy_repo: ShopPolicyRepository | None = None,
+) -> tuple[Reservation, Slot, int]:
+    """Change party_size in place; only the growth is checked against what the slot has left."""
+    row = await res_repo.get_for_user_for_update(reservation_id, user_id)
+    if row is None:
+        raise SlotNotOpenError("reservation not found")
+    reservation, slot = row
+    if reservation.status == ReservationStatus.CANCELLED:
+        raise SlotNotOpenError("reservation not found")
+    if reservation.version != version:
+        raise VersionConflictError("version mismatch")
+    previous_party_size = reservation.party_size
+    if party_size == previous_party_size:
+        # Idempotent: already at the requested size
+        return reservation, slot, previous_party_size
+    policy = await _booking_policy(policy_repo, slot.shop_id)
+    # Shrinking releases seats like a partial cancellation, so the same cutoff applies.
+    if party_size < previous_party_size and _is_within_cutoff(slot.starts_at, days=policy.cutoff_days):
+        raise CancelNotAllowedError("cancellation window closed")
+
+    if party_size > previous_party_size:
+        if slot.status != SlotStatus.OPEN:
+            raise CapacityError("slot is not open")
+        # get_for_user_for_update locked the slot row too. The reservation's own seats are
+        # already counted in `reserved` and the window peak, so only the growth is validated;
+        # staying on the same slot cannot create a new overlap or duplicate, so that query is skipped.
+        checks = await _policy_checks(
+            policy_repo, res_repo, slot, policy=replace(policy, reject_user_overlap=False), user_id=user_id
+        )
+        snapshot = SlotSnapshot(
+            status=slot.status,
+            capacity=slot.capacity,
+            reserved=await res_repo.sum_reserved(slot.id),
+            user_has_active_reservation=False,
+            held=live_held(slot.held, slot.held_until, now=datetime.now(timezone.utc).replace(tzinfo=None)),
+            window_capacity=checks.window_capacity,
+            window_peak=checks.window_peak,
+            # Growth allowance, so that previous + growth stays within the shop's limit.
+            max_party_size=(
+                policy.max_party_size - previous_party_size if policy.max_party_size is not None else None
+            ),
+        )
+        validate_reservation(snapshot, party_size=party_size - previous_party_size)
+
+    reservation.party_size = party_size
+    reservation.version += 1
+    reservation.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    updated = await res_repo.resize(reservation)
+    return updated, slot, previous_party_size
+
+
 async def list_user_reservations(
     res_repo: ReservationRepository,
     *,
@@ -138,6 +400,110 @@ async def get_user_reservation(
     return await res_repo.get_for_user(reservation_id, user_id)
 
 
+BULK_CANCEL_CHUNK_SIZE = 1000
+
+
+async def list_shop_reservations(
+    res_repo: ReservationRepository,
+    *,
+    shop_id: int,
+    start: datetime,
+    end: datetime,
+    statuses: Sequence[ReservationStatus],
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[ShopReservationRow], str | None, bool]:
+    """One page of the shop's reservations by slot start. Returns (rows, next cursor, has_more).
+
+    A page reads at most `limit` slots, so it may hold fewer than `limit` rows (none
+    at all across empty slots) while more remain: continue while has_more.
+    """
+    if start >= end:
+        raise ValueError("to must be after from")
+    if not 1 <= limit <= MAX_SHOP_RESERVATIONS_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SHOP_RESERVATIONS_LIMIT}")
+    after = decode_shop_cursor(cursor) if cursor else None
+    rows, window_end = await res_repo.list_shop_page(
+        shop_id, start=start, end=end, statuses=statuses, after=after, slot_limit=limit
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        window_end = ShopReservationCursor(last.starts_at, last.slot_id, last.reservation_id)
+    next_cursor = encode_shop_cursor(window_end) if window_end is not None else None
+    return rows, next_cursor, window_end is not None
+
+
+def encode_shop_cursor(position: ShopReservationCursor) -> str:
+    return f"{position.starts_at.strftime(CURSOR_TIME_FORMAT)}-{position.slot_id}-{position.reservation_id}"
+
+
+def decode_shop_cursor(cursor: str) -> ShopReservationCursor:
+    try:
+        starts_at, slot_id, reservation_id = cursor.split("-")
+        return ShopReservationCursor(
+            datetime.strptime(starts_at, CURSOR_TIME_FORMAT), int(slot_id), int(reservation_id)
+        )
+    except ValueError as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+async def cancel_shop_reservations(
+    res_repo: ReservationRepository,
+    *,
+    shop_id: int,
+    slot_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    seat_id: int | None = None,
+    chunk_size: int = BULK_CANCEL_CHUNK_SIZE,
+) -> list[ReservationStatusChange]:
+    """Shop-initiated cancellation of every active reservation in a slot or time range.
+
+    Rows are locked once, then cancelled with set-based UPDATEs (`version = version + 1`)
+    in chunks of `chunk_size` ids. The cancellation cutoff does not apply to the shop.
+    """
+    if slot_id is None and (start is None or end is None):
+        raise ValueError("slot_id or start/end is required")
+    if start is not None and end is not None and start >= end:
+        raise ValueError("start must be earlier than end")
+
+    locked = await res_repo.lock_active_for_shop(shop_id, slot_id=slot_id, start=start, end=end, seat_id=seat_id)
+    for offset in range(0, len(locked), chunk_size):
+        await res_repo.bulk_cancel([ref.reservation_id for ref in locked[offset : offset + chunk_size]])
+    return _as_cancelled(locked)
+
+
+async def autocancel_expired_pending(
+    res_repo: ReservationRepository,
+    *,
+    now: datetime,
+    expiry: timedelta,
+    batch_size: int,
+) -> list[ReservationStatusChange]:
+    """Cancel up to `batch_size` request_pending reservations created before `now - expiry`."""
+    locked = await res_repo.lock_expired_pending(now - expiry, batch_size)
+    await res_repo.bulk_cancel([ref.reservation_id for ref in locked])
+    return _as_cancelled(locked)
+
+
+def _as_cancelled(refs: list[ReservationRef]) -> list[ReservationStatusChange]:
+    """Describe locked rows as they are after a `bulk_cancel` (status cancelled, version + 1)."""
+    return [
+        ReservationStatusChange(
+            reservation_id=ref.reservation_id,
+            slot_id=ref.slot_id,
+            shop_id=ref.shop_id,
+            user_id=ref.user_id,
+            party_size=ref.party_size,
+            status_from=ref.status,
+            status_to=ReservationStatus.CANCELLED,
+            version=ref.version + 1,
+        )
+        for ref in refs
+    ]
+
+
 def _is_within_cutoff(starts_at: datetime, *, days: int) -> bool:
     """Return True if now UTC is within `days` before the slot starts."""
     now_utc = datetime.now(timezone.utc)
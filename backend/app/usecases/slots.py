@@ -1,8 +1,25 @@
-from datetime import datetime
-from typing import Any, Dict, List
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence
 
-from ..domain.repositories import SlotRepository
-from ..models import Slot, SlotStatus
+from ..domain.repositories import ReservationRepository, ShopPolicyRepository, SlotRepository
+from ..domain.services import (
+    AvailabilityBucket,
+    AvailabilityDelta,
+    BookingPolicy,
+    DwellOption,
+    live_held,
+    merge_dwell_options,
+)
+from ..models import Reservation, Slot, SlotStatus
+
+BULK_STATUSES = (SlotStatus.CLOSED, SlotStatus.BLOCKED)
+DEFAULT_DWELL_MINUTES = BookingPolicy.default_dwell_minutes
+# Longest slot create_slot accepts. Overlap lookups (dwell search, time-window peak,
+# user overlap) scan slots starting up to this much before the range they check.
+MAX_SLOT_LENGTH = timedelta(days=1)
+MAX_BATCH_SHOPS = 100
+HEATMAP_BUCKETS = ("day", "hour")
+MAX_HEATMAP_RANGE = timedelta(days=366)
 
 
 async def list_availability(
@@ -14,15 +31,157 @@ async def list_availability(
     seat_id: int | None,
 ) -> List[Dict[str, Any]]:
     rows = await slot_repo.list_with_reserved(shop_id=shop_id, start=start, end=end, seat_id=seat_id)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
     items: List[Dict[str, Any]] = []
     for slot, reserved in rows:
         if slot.status != SlotStatus.OPEN:
             continue
-        remaining = max(slot.capacity - int(reserved), 0)
-        items.append({"slot": slot, "remaining": remaining})
+        items.append({"slot": slot, "remaining": _remaining(slot, int(reserved), now=now)})
     return items
 
 
+async def availability_heatmap(
+    slot_repo: SlotRepository,
+    *,
+    shop_id: int,
+    start: datetime,
+    end: datetime,
+    bucket: str,
+) -> list[AvailabilityBucket]:
+    """Open capacity, reserved seats and bookable slot count per JST day or hour; empty buckets are omitted."""
+    if bucket not in HEATMAP_BUCKETS:
+        raise ValueError("bucket must be day or hour")
+    if start >= end:
+        raise ValueError("start must be earlier than end")
+    if end - start > MAX_HEATMAP_RANGE:
+        raise ValueError("range must be at most 366 days")
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return await slot_repo.availability_buckets(shop_id, start=start, end=end, bucket=bucket, now=now)
+
+
+async def next_available(
+    slot_repo: SlotRepository,
+    *,
+    shop_id: int,
+    after: datetime,
+    party_size: int,
+    seat_id: int | None,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """Earliest open slots starting at or after `after` that fit the party, in start order."""
+    if party_size < 1:
+        raise ValueError("party_size must be >= 1")
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = await slot_repo.next_available(
+        shop_id,
+        after=after,
+        party_size=party_size,
+        seat_id=seat_id,
+        limit=limit,
+        now=now,
+    )
+    return [{"slot": slot, "remaining": _remaining(slot, int(reserved), now=now)} for slot, reserved in rows]
+
+
+async def list_availability_for_shops(
+    slot_repo: SlotRepository,
+    *,
+    shop_ids: Sequence[int],
+    start: datetime,
+    end: datetime,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """`list_availability` for many shops with one `shop_id IN (...)` query, keyed in request order."""
+    unique = list(dict.fromkeys(shop_ids))
+    if len(unique) > MAX_BATCH_SHOPS:
+        raise ValueError(f"at most {MAX_BATCH_SHOPS} shops per request")
+    if start >= end:
+        raise ValueError("start must be earlier than end")
+    grouped: Dict[int, List[Dict[str, Any]]] = {shop_id: [] for shop_id in unique}
+    if not unique:
+        return grouped
+    rows = await slot_repo.list_with_reserved_for_shops(unique, start, end)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for slot, reserved in rows:
+        if slot.status != SlotStatus.OPEN:
+            continue
+        grouped[slot.shop_id].append({"slot": slot, "remaining": _remaining(slot, int(reserved), now=now)})
+    return grouped
+
+
+def _remaining(slot: Slot, reserved: int, *, now: datetime) -> int:
+    # Holds come from denormalized slot columns, so no extra join per request.
+    held = live_held(slot.held, slot.held_until, now=now)
+    return max(slot.capacity - reserved - held, 0)
+
+
+def availability_delta(slot: Slot, *, reserved: int) -> AvailabilityDelta:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return AvailabilityDelta(
+        slot_id=slot.id,
+        shop_id=slot.shop_id,
+        seat_id=slot.seat_id,
+        starts_at=slot.starts_at,
+        ends_at=slot.ends_at,
+        capacity=slot.capacity,
+        remaining=_remaining(slot, reserved, now=now) if slot.status == SlotStatus.OPEN else 0,
+        status=slot.status,
+    )
+
+
+async def availability_window(
+    slot_repo: SlotRepository,
+    *,
+    shop_id: int,
+    start: datetime,
+    end: datetime,
+) -> list[AvailabilityDelta]:
+    """Availability of every slot of the shop in the range, whatever its status (for caches)."""
+    rows = await slot_repo.list_with_reserved(shop_id=shop_id, start=start, end=end, seat_id=None)
+    return [availability_delta(slot, reserved=int(reserved)) for slot, reserved in rows]
+
+
+async def search_dwell(
+    slot_repo: SlotRepository,
+    policy_repo: ShopPolicyRepository,
+    *,
+    shop_id: int,
+    desired_start: datetime,
+    dwell_minutes: int | None,
+    party_size: int,
+) -> tuple[int, list[DwellOption]]:
+    """Seats that can host the party from `desired_start` for the stay, merging adjacent slots.
+
+    Without `dwell_minutes` the shop's default dwell applies. Returns (dwell_minutes, options).
+    """
+    if party_size < 1:
+        raise ValueError("party_size must be >= 1")
+    if dwell_minutes is None:
+        dwell_minutes = (await policy_repo.get_booking_policy(shop_id)).default_dwell_minutes
+    if dwell_minutes < 1:
+        raise ValueError("dwell_minutes must be >= 1")
+    ends_at = desired_start + timedelta(minutes=dwell_minutes)
+    rows = await slot_repo.list_overlapping_with_reserved(
+        shop_id,
+        start=desired_start,
+        end=ends_at,
+        starts_from=desired_start - MAX_SLOT_LENGTH,
+    )
+    options = merge_dwell_options(
+        (availability_delta(slot, reserved=int(reserved)) for slot, reserved in rows),
+        starts_at=desired_start,
+        ends_at=ends_at,
+        party_size=party_size,
+    )
+    return dwell_minutes, options
+
+
+async def slot_availability(res_repo: ReservationRepository, slot: Slot) -> AvailabilityDelta:
+    """Current availability of a slot; call inside the transaction that holds its lock."""
+    return availability_delta(slot, reserved=await res_repo.sum_reserved(slot.id))
+
+
 async def create_slot(
     slot_repo: SlotRepository,
     *,
@@ -35,6 +194,8 @@ async def create_slot(
 ) -> Slot:
     if starts_at >= ends_at:
         raise ValueError("starts_at must be earlier than ends_at")
+    if ends_at - starts_at > MAX_SLOT_LENGTH:
+        raise ValueError("slot must not be longer than 1 day")
     if capacity < 1:
         raise ValueError("capacity must be >= 1")
     slot = await slot_repo.create(
@@ -46,3 +207,36 @@ async def create_slot(
         status=status,
     )
     return slot
+
+
+async def bulk_update_status(
+    slot_repo: SlotRepository,
+    res_repo: ReservationRepository,
+    *,
+    shop_id: int,
+    start: datetime,
+    end: datetime,
+    seat_id: int | None,
+    status: SlotStatus,
+    include_stranded: bool = False,
+) -> tuple[list[int], list[tuple[Reservation, Slot]]]:
+    """Close/block every slot in the range with a single UPDATE.
+
+    Returns the ids of the slots whose status changed and, when requested, the
+    active reservations left on slots in the range.
+    """
+    if start >= end:
+        raise ValueError("start must be earlier than end")
+    if status not in BULK_STATUSES:
+        raise ValueError("status must be closed or blocked")
+    updated = await slot_repo.bulk_update_status(
+        shop_id=shop_id,
+        start=start,
+        end=end,
+        seat_id=seat_id,
+        status=status,
+    )
+    stranded: list[tuple[Reservation, Slot]] = []
+    if include_stranded:
+        stranded = await res_repo.list_active_in_range(shop_id, start, end, seat_id)
+    return updated, stranded
@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+
+from ..domain.errors import CapacityError, DuplicateReservationError, SlotNotOpenError, WaitlistNotAllowedError
+from ..domain.repositories import ReservationRepository, ShopPolicyRepository, SlotRepository, WaitlistRepository
+from ..domain.services import SlotSnapshot, live_held, validate_reservation
+from ..models import Reservation, ReservationStatus, Slot, SlotStatus, WaitlistEntry
+from .reservations import _booking_policy, _policy_checks
+
+
+async def join_waitlist(
+    slot_repo: SlotRepository,
+    res_repo: ReservationRepository,
+    waitlist_repo: WaitlistRepository,
+    *,
+    slot_id: int,
+    user_id: int,
+    party_size: int,
+    policy_repo: ShopPolicyRepository | None = None,
+) -> WaitlistEntry:
+    """Queue for a full slot. Raises WaitlistNotAllowedError when the slot can be booked directly.
+
+    "Full" is decided with the same policy inputs as a direct booking, so a slot whose
+    time window is at capacity can be waited on even though it has seats left.
+    """
+    slot = await slot_repo.get_for_update(slot_id)
+    if slot is None:
+        raise SlotNotOpenError("slot not found")
+    if party_size > slot.capacity:
+        raise CapacityError("party_size exceeds slot capacity")
+
+    user_has_active = await res_repo.user_has_active(slot_id, user_id)
+    reserved = await res_repo.sum_reserved(slot_id)
+    policy = await _booking_policy(policy_repo, slot.shop_id)
+    if policy.max_party_size is not None and party_size > policy.max_party_size:
+        raise CapacityError("party size exceeds the shop limit")
+    checks = await _policy_checks(policy_repo, res_repo, slot, policy=policy, user_id=user_id)
+    if checks.window_capacity is not None and party_size > checks.window_capacity:
+        raise CapacityError("party_size exceeds slot capacity")
+    snapshot = SlotSnapshot(
+        status=slot.status,
+        capacity=slot.capacity,
+        reserved=reserved,
+        user_has_active_reservation=user_has_active,
+        held=live_held(slot.held, slot.held_until, now=datetime.now(timezone.utc).replace(tzinfo=None)),
+        window_capacity=checks.window_capacity,
+        window_peak=checks.window_peak,
+        user_has_overlapping_reservation=checks.user_overlaps,
+    )
+    try:
+        validate_reservation(snapshot, party_size=party_size)
+    except CapacityError:
+        return await waitlist_repo.add(slot_id=slot_id, user_id=user_id, party_size=party_size)
+    raise WaitlistNotAllowedError("slot has capacity; book directly")
+
+
+async def promote_waitlist(
+    res_repo: ReservationRepository,
+    waitlist_repo: WaitlistRepository,
+    *,
+    slot: Slot,
+    policy_repo: ShopPolicyRepository | None = None,
+) -> list[Reservation]:
+    """Book the earliest waiting entries that fit the slot's free capacity and the shop policy.
+
+    Runs in the caller's transaction with the slot row already locked (e.g. right
+    after `cancel_reservation`). Each step is an index seek for the earliest entry
+    whose party_size fits, so the waitlist is never scanned. Every candidate goes
+    through validate_reservation like a direct booking, so in time-window mode the
+    promotions stop at the window capacity (the policy row is locked once and kept).
+    """
+    if slot.status != SlotStatus.OPEN:
+        return []
+    policy = await _booking_policy(policy_repo, slot.shop_id)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    held = live_held(slot.held, slot.held_until, now=now)
+    # Entries queued before the shop lowered its party limit stay waiting.
+    limit = slot.capacity if policy.max_party_size is None else min(slot.capacity, policy.max_party_size)
+    promoted: list[Reservation] = []
+    while True:
+        reserved = await res_repo.sum_reserved(slot.id)
+        free = min(limit, slot.capacity - reserved - held)
+        if free <= 0:
+            break
+        entry = await waitlist_repo.earliest_fitting(slot.id, free)
+        if entry is None:
+            break
+        checks = await _policy_checks(policy_repo, res_repo, slot, policy=policy, user_id=entry.user_id)
+        snapshot = SlotSnapshot(
+            status=slot.status,
+            capacity=slot.capacity,
+            reserved=reserved,
+            user_has_active_reservation=await res_repo.user_has_active(slot.id, entry.user_id),
+            held=held,
+            window_capacity=checks.window_capacity,
+            window_peak=checks.window_peak,
+            user_has_overlapping_reservation=checks.user_overlaps,
+            max_party_size=policy.max_party_size,
+        )
+        try:
+            validate_reservation(snapshot, party_size=entry.party_size)
+        except DuplicateReservationError:
+            # Already booked here, or (when the shop rejects it) an overlapping booking: drop the entry.
+            await waitlist_repo.remove(entry)
+            continue
+        except CapacityError:
+            if checks.window_capacity is None:
+                raise
+            # Over the time-window capacity: only smaller parties can still be promoted.
+            limit = checks.window_capacity - checks.window_peak
+            continue
+        await waitlist_repo.remove(entry)
+        reservation = await res_repo.create(
+            slot_id=slot.id,
+            user_id=entry.user_id,
+            party_size=entry.party_size,
+            status=ReservationStatus.BOOKED,
+        )
+        promoted.append(reservation)
+    return promoted
+
+
+async def leave_waitlist(
+    waitlist_repo: WaitlistRepository,
+    *,
+    entry_id: int,
+    user_id: int,
+) -> bool:
+    return await waitlist_repo.remove_for_user(entry_id, user_id)
@@ -2,15 +2,23 @@ from __future__ import annotations
 
 import json
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Literal, Optional
+from enum import Enum
+from json.encoder import encode_basestring_ascii
+from typing import TYPE_CHECKING, Any, Iterable, Literal, Optional
 
+from .audit_sink import AuditSink
 from .request_id import get_request_id
 
+if TYPE_CHECKING:
+    from ..domain.repositories import AuditOutboxRepository
+
 AuditAction = Literal[
     "reservation.created",
     "reservation.cancelled",
     "reservation.rescheduled",
+    "reservation.resized",
     "reservation.autocancelled",
     "reservation.shop_cancelled",
 ]
@@ -24,6 +32,19 @@ if not _audit_logger.handlers:
     _audit_logger.addHandler(handler)
 _audit_logger.propagate = False
 
+_sink: Optional[AuditSink] = None
+
+
+def set_audit_sink(sink: Optional[AuditSink]) -> None:
+    """Route audit writes through `sink` (installed by the app lifespan); None writes inline."""
+    global _sink
+    _sink = sink
+
+
+def write_to_logger(payload: str) -> None:
+    """Default sink writer: the `audit` logger (one JSON line per record)."""
+    _audit_logger.info(payload)
+
 
 def _enum_to_str(value: Any) -> Optional[str]:
     if value is None:
@@ -36,7 +57,145 @@ def _enum_to_str(value: Any) -> Optional[str]:
     return str(value)
 
 
-def emit_audit_log(
+@dataclass(frozen=True)
+class AuditRecord:
+    action: AuditAction
+    initiator: AuditInitiator
+    reservation_id: int
+    slot_id: Optional[int]
+    shop_id: Optional[int]
+    user_id: Optional[int]
+    party_size: Optional[int]
+    status_from: Optional[str]
+    status_to: Optional[str]
+    version: Optional[int]
+    message: Optional[str] = None
+    extra: Optional[dict[str, Any]] = None
+
+
+def _encode_generic(record: AuditRecord, *, timestamp: str, request_id: Optional[str]) -> str:
+    payload: dict[str, Any] = {
+        "timestamp": timestamp,
+        "level": "info",
+        "action": record.action,
+        "initiator": record.initiator,
+        "request_id": request_id,
+        "reservation_id": record.reservation_id,
+        "slot_id": record.slot_id,
+        "shop_id": record.shop_id,
+        "user_id": record.user_id,
+        "party_size": record.party_size,
+        "status_from": _enum_to_str(record.status_from),
+        "status_to": _enum_to_str(record.status_to),
+        "version": record.version,
+    }
+    if record.message is not None:
+        payload["message"] = record.message
+    if record.extra:
+        payload.update(record.extra)
+
+    # Drop None values to keep the log compact.
+    compact_payload = {k: v for k, v in payload.items() if v is not None}
+    return json.dumps(compact_payload, ensure_ascii=True)
+
+
+# Fixed schema, in payload order; extra keys colliding with these take the generic path.
+_FIXED_KEYS = frozenset(
+    (
+        "timestamp",
+        "level",
+        "action",
+        "initiator",
+        "request_id",
+        "reservation_id",
+        "slot_id",
+        "shop_id",
+        "user_id",
+        "party_size",
+        "status_from",
+        "status_to",
+        "version",
+        "message",
+    )
+)
+# Encoded action/initiator/status strings. The value sets are small and fixed, so the cache is capped
+# only as a guard against arbitrary status strings.
+_TOKEN_CACHE: dict[str, str] = {}
+_TOKEN_CACHE_MAX = 256
+
+
+def _value(value: Any) -> str:
+    if type(value) is int:
+        return int.__repr__(value)
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    return json.dumps(value, ensure_ascii=True)
+
+
+def _token(value: Any) -> str:
+    """Encode action/initiator/status like `_encode_generic` (enums via their value)."""
+    encoded = _TOKEN_CACHE.get(value)
+    if encoded is None:
+        text = value if type(value) is str else (value.value if isinstance(value, Enum) else _enum_to_str(value))
+        encoded = encode_basestring_ascii(str(text))
+        # Only str keys, so a hit can only come from an equal str; a StrEnum member encodes as its value.
+        if len(_TOKEN_CACHE) < _TOKEN_CACHE_MAX and isinstance(value, str):
+            _TOKEN_CACHE[value] = encoded
+    return encoded
+
+
+def _encode(record: AuditRecord, *, timestamp: str, request_id: Optional[str]) -> str:
+    """Byte-identical to `_encode_generic` for the fixed schema, without the intermediate dicts.
+
+    Key fragments are literals, ints are formatted directly and action/initiator/status
+    encodings are cached. Falls back to the generic path when `extra` overrides a fixed
+    key (json.dumps would keep that key in its original position) or has non-str keys.
+    """
+    extra = record.extra
+    if extra and (not _FIXED_KEYS.isdisjoint(extra) or not all(type(key) is str for key in extra)):
+        return _encode_generic(record, timestamp=timestamp, request_id=request_id)
+    parts = [
+        '{"timestamp": ',
+        encode_basestring_ascii(timestamp),
+        ', "level": "info", "action": ',
+        _token(record.action),
+    ]
+    parts += (', "initiator": ', _token(record.initiator))
+    if request_id is not None:
+        parts += (', "request_id": ', encode_basestring_ascii(request_id))
+    value: Any = record.reservation_id
+    if value is not None:
+        parts += (', "reservation_id": ', int.__repr__(value) if type(value) is int else _value(value))
+    value = record.slot_id
+    if value is not None:
+        parts += (', "slot_id": ', int.__repr__(value) if type(value) is int else _value(value))
+    value = record.shop_id
+    if value is not None:
+        parts += (', "shop_id": ', int.__repr__(value) if type(value) is int else _value(value))
+    value = record.user_id
+    if value is not None:
+        parts += (', "user_id": ', int.__repr__(value) if type(value) is int else _value(value))
+    value = record.party_size
+    if value is not None:
+        parts += (', "party_size": ', int.__repr__(value) if type(value) is int else _value(value))
+    if record.status_from is not None:
+        parts += (', "status_from": ', _token(record.status_from))
+    if record.status_to is not None:
+        parts += (', "status_to": ', _token(record.status_to))
+    value = record.version
+    if value is not None:
+        parts += (', "version": ', int.__repr__(value) if type(value) is int else _value(value))
+    if record.message is not None:
+        parts += (', "message": ', _value(record.message))
+    if extra:
+        for key, value in extra.items():
+            if value is not None:
+                parts += (", ", encode_basestring_ascii(key), ": ", _value(value))
+    parts.append("}")
+    return "".join(parts)
+
+
+async def emit_audit_log(
     *,
     action: AuditAction,
     initiator: AuditInitiator,
@@ -50,33 +209,57 @@ def emit_audit_log(
     version: Optional[int],
     message: Optional[str] = None,
     extra: Optional[dict[str, Any]] = None,
+    outbox: Optional[AuditOutboxRepository] = None,
 ) -> None:
     """Emit structured JSON audit log. Raises RuntimeError if logging fails."""
-    status_from_val = _enum_to_str(status_from)
-    status_to_val = _enum_to_str(status_to)
-    payload: dict[str, Any] = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "level": "info",
-        "action": action,
-        "initiator": initiator,
-        "request_id": get_request_id(),
-        "reservation_id": reservation_id,
-        "slot_id": slot_id,
-        "shop_id": shop_id,
-        "user_id": user_id,
-        "party_size": party_size,
-        "status_from": status_from_val,
-        "status_to": status_to_val,
-        "version": version,
-    }
-    if message is not None:
-        payload["message"] = message
-    if extra:
-        payload.update(extra)
+    await emit_audit_logs(
+        [
+            AuditRecord(
+                action=action,
+                initiator=initiator,
+                reservation_id=reservation_id,
+                slot_id=slot_id,
+                shop_id=shop_id,
+                user_id=user_id,
+                party_size=party_size,
+                status_from=status_from,
+                status_to=status_to,
+                version=version,
+                message=message,
+                extra=extra,
+            )
+        ],
+        outbox=outbox,
+    )
 
-    # Drop None values to keep the log compact.
-    compact_payload = {k: v for k, v in payload.items() if v is not None}
+
+async def emit_audit_logs(
+    records: Iterable[AuditRecord],
+    *,
+    outbox: Optional[AuditOutboxRepository] = None,
+) -> None:
+    """Emit many audit records with a single write (one JSON line each).
+
+    With `outbox`, the lines are inserted into `audit_outbox` in the caller's transaction
+    and shipped by the AuditRelay after commit. Otherwise they are written through the
+    installed AuditSink, or inline when there is none. All-or-nothing like
+    `emit_audit_log`: raises RuntimeError if the write fails.
+    """
+    timestamp = datetime.now(timezone.utc).isoformat()
+    request_id = get_request_id()
+    lines = [_encode(record, timestamp=timestamp, request_id=request_id) for record in records]
+    if not lines:
+        return
+    if outbox is not None:
+        try:
+            await outbox.add_many(lines)
+        except Exception as exc:
+            raise RuntimeError("failed to emit audit log") from exc
+        return
+    if _sink is not None:
+        await _sink.submit(lines)
+        return
     try:
-        _audit_logger.info(json.dumps(compact_payload, ensure_ascii=True))
+        write_to_logger("\n".join(lines))
     except Exception as exc:  # pragma: no cover - defensive
         raise RuntimeError("failed to emit audit log") from exc
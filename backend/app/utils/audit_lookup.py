@@ -0,0 +1,45 @@
+"""Print the audit history of a reservation, user or shop from segmented audit files.
+
+uv run python -m app.utils.audit_lookup --reservation-id 123 [--dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Sequence
+
+from .audit_segments import lookup
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--dir", default=os.getenv("AUDIT_SEGMENT_DIR"), help="segment directory (AUDIT_SEGMENT_DIR)")
+    key = parser.add_mutually_exclusive_group(required=True)
+    key.add_argument("--reservation-id", type=int)
+    key.add_argument("--user-id", type=int)
+    key.add_argument("--shop-id", type=int)
+    args = parser.parse_args(argv)
+    if not args.dir:
+        parser.error("--dir or AUDIT_SEGMENT_DIR is required")
+
+    if args.reservation_id is not None:
+        kind, value = "reservation_id", args.reservation_id
+    elif args.user_id is not None:
+        kind, value = "user_id", args.user_id
+    else:
+        kind, value = "shop_id", args.shop_id
+
+    started = time.perf_counter()
+    lines = lookup(args.dir, kind=kind, key=value)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for line in lines:
+        print(line)
+    print(f"{len(lines)} records in {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0 if lines else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Size/time-rotated audit log segments with a sidecar index for per-key lookups.
+
+Layout of the segment directory:
+
+- `audit-<UTC start>-<pid>-<seq>.jsonl[.gz|.zst]`: one frame per written batch. A frame is a
+  gzip member, a zstd frame or raw bytes, so `zcat`/`zstdcat` still read a whole segment.
+- `<segment>.idx`: sealed index of fixed-size entries (kind, key, frame offset, frame
+  length) sorted by (kind, key), searched by bisection over an mmap.
+- `<segment>.pending`: unsorted entries of the active segment, sealed into `.idx` on
+  rotation (or on the next start after a crash).
+
+Several workers may share the directory. Each writer holds an exclusive flock on its
+active segment, so a starting worker seals only segments whose writer is gone.
+"""
+
+from __future__ import annotations
+
+import bisect
+import fcntl
+import gzip
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment, unused-ignore]
+
+INDEX_KEYS = ("reservation_id", "user_id", "shop_id")
+INDEX_ENTRY = struct.Struct("<BQQI")
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+SEGMENT_GLOB = "audit-*.jsonl*"
+
+
+def _compressor(compression: str) -> Callable[[bytes], bytes]:
+    if compression == "gzip":
+        return lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=3).compress  # type: ignore[no-any-return]
+    if compression == "none":
+        return lambda data: data
+    raise ValueError(f"unknown compression: {compression}")
+
+
+def _decompressor(segment: Path) -> Callable[[bytes], bytes]:
+    if segment.suffix == ".gz":
+        return gzip.decompress
+    if segment.suffix == ".zst":
+        if zstandard is None:
+            raise ValueError("reading .zst segments requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress  # type: ignore[no-any-return]
+    return lambda data: data
+
+
+def _index_keys(payload: str) -> set[tuple[int, int]]:
+    keys: set[tuple[int, int]] = set()
+    for line in payload.splitlines():
+        record = json.loads(line)
+        for kind, name in enumerate(INDEX_KEYS):
+            value = record.get(name)
+            if isinstance(value, int) and value >= 0:
+                keys.add((kind, value))
+    return keys
+
+
+def _index_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + ".idx")
+
+
+def _pending_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + ".pending")
+
+
+def seal_segment(segment: Path) -> None:
+    """Sort the pending entries of `segment` into its `.idx`; drop the segment if it is empty."""
+    pending = _pending_path(segment)
+    if segment.exists() and segment.stat().st_size == 0:
+        segment.unlink()
+        pending.unlink(missing_ok=True)
+        return
+    raw = pending.read_bytes() if pending.exists() else b""
+    entries = sorted(set(INDEX_ENTRY.iter_unpack(raw[: len(raw) - len(raw) % INDEX_ENTRY.size])))
+    tmp = segment.with_name(segment.name + ".idx.tmp")
+    tmp.write_bytes(b"".join(INDEX_ENTRY.pack(*entry) for entry in entries))
+    os.replace(tmp, _index_path(segment))
+    pending.unlink(missing_ok=True)
+
+
+def _try_lock(handle: BinaryIO, path: Path) -> bool:
+    """Take the writer lock of `path` on `handle`; False if another writer holds it or the file was replaced."""
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    try:
+        return os.stat(path).st_ino == os.fstat(handle.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def seal_orphaned(directory: str) -> None:
+    """Seal the segments left active by writers that are gone; live writers' segments are skipped."""
+    for leftover in iter_segments(directory):
+        if not _pending_path(leftover).exists() and _index_path(leftover).exists():
+            continue
+        try:
+            handle = open(leftover, "rb")
+        except FileNotFoundError:
+            continue
+        with handle:
+            # Sealed by another starting worker while we waited for the lock: nothing left to do.
+            if _try_lock(handle, leftover) and (
+                _pending_path(leftover).exists() or not _index_path(leftover).exists()
+            ):
+                seal_segment(leftover)
+
+
+class SegmentedAuditWriter:
+    """AuditSink writer: one frame per batch, rotated by size or age, indexed by key."""
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age_seconds: float = 3600.0,
+        compression: str = "gzip",
+        fsync: bool = False,
+        clock: Callable[[], float] = time.time,
+        pid: int | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.pid = os.getpid() if pid is None else pid
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.fsync = fsync
+        self.clock = clock
+        self._compress = _compressor(compression)
+        self._suffix = COMPRESSION_SUFFIXES[compression]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        seal_orphaned(directory)
+        self._open()
+
+    @property
+    def segment(self) -> Path:
+        return self._segment
+
+    def _open(self) -> None:
+        self._opened_at = self.clock()
+        stamp = datetime.fromtimestamp(self._opened_at, timezone.utc).strftime("%Y%m%dT%H%M%S")
+        seq = 0
+        while True:
+            candidate = self.directory / f"audit-{stamp}-{self.pid}-{seq:04d}.jsonl{self._suffix}"
+            seq += 1
+            try:
+                handle = open(candidate, "xb")
+            except FileExistsError:
+                continue
+            # A starting worker may seal (and, being empty, remove) the file before we lock it.
+            if _try_lock(handle, candidate):
+                break
+            handle.close()
+        self._segment = candidate
+        self._file: BinaryIO = handle
+        self._pending: BinaryIO = open(_pending_path(candidate), "ab")
+        self._size = 0
+
+    def _sync(self, handle: BinaryIO) -> None:
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+
+    def __call__(self, payload: str) -> None:
+        if self._size >= self.max_bytes or (self._size and self.clock() - self._opened_at >= self.max_age_seconds):
+            self.rotate()
+        frame = self._compress((payload + "\n").encode("utf-8"))
+        offset = self._size
+        self._file.write(frame)
+        self._sync(self._file)
+        self._size += len(frame)
+        # Index after the frame is durable: a crash in between leaves lines unindexed, never dangling offsets.
+        entries = b"".join(INDEX_ENTRY.pack(kind, key, offset, len(frame)) for kind, key in _index_keys(payload))
+        if entries:
+            self._pending.write(entries)
+            self._sync(self._pending)
+
+    def rotate(self) -> None:
+        self.close()
+        self._open()
+
+    def close(self) -> None:
+        self._pending.close()
+        # Sealed while the lock is held, so no starting worker seals it concurrently.
+        seal_segment(self._segment)
+        self._file.close()
+
+
+class _IndexKeys:
+    """Sequence view of (kind, key) over an mmapped index, for bisect."""
+
+    def __init__(self, buffer: mmap.mmap) -> None:
+        self.buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self.buffer) // INDEX_ENTRY.size
+
+    def __getitem__(self, i: int) -> tuple[int, int]:
+        kind, key, _, _ = INDEX_ENTRY.unpack_from(self.buffer, i * INDEX_ENTRY.size)
+        return kind, key
+
+
+def _frames(segment: Path, kind: int, key: int) -> list[tuple[int, int]]:
+    index = _index_path(segment)
+    if index.exists():
+        if index.stat().st_size == 0:
+            return []
+        with open(index, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            keys = _IndexKeys(buffer)
+            i = bisect.bisect_left(keys, (kind, key))
+            frames = []
+            while i < len(keys) and keys[i] == (kind, key):
+                _, _, offset, length = INDEX_ENTRY.unpack_from(buffer, i * INDEX_ENTRY.size)
+                frames.append((offset, length))
+                i += 1
+            return frames
+    pending = _pending_path(segment)
+    if pending.exists():
+        raw = pending.read_bytes()
+        raw = raw[: len(raw) - len(raw) % INDEX_ENTRY.size]
+        return sorted({(o, n) for k, v, o, n in INDEX_ENTRY.iter_unpack(raw) if (k, v) == (kind, key)})
+    return []
+
+
+def iter_segments(directory: str) -> Iterator[Path]:
+    for path in sorted(Path(directory).glob(SEGMENT_GLOB)):
+        if not path.name.endswith((".idx", ".pending", ".tmp")):
+            yield path
+
+
+def lookup(directory: str, *, kind: str, key: int) -> list[str]:
+    """Return the raw audit lines whose `kind` (e.g. reservation_id) equals `key`, oldest first.
+
+    Only segments whose index has the key are opened, and only their matching frames
+    are read (via mmap) and decompressed.
+    """
+    kind_id = INDEX_KEYS.index(kind)
+    lines: list[str] = []
+    for segment in iter_segments(directory):
+        frames = _frames(segment, kind_id, key)
+        if not frames:
+            continue
+        decompress = _decompressor(segment)
+        with open(segment, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for offset, length in frames:
+                for raw in decompress(buffer[offset : offset + length]).splitlines():
+                    record: dict[str, Any] = json.loads(raw)
+                    if record.get(kind) == key:
+                        lines.append(raw.decode("utf-8"))
+    return lines
@@ -0,0 +1,113 @@
+"""Asyncio audit sink: callers await an acknowledgment, a background writer batches the I/O.
+
+While one batch is being written (in a worker thread, so the event loop keeps serving
+other requests), new submissions queue up and go out together in the next write. A
+submission is acknowledged only after its batch has been written (and fsynced when the
+writer is configured to), so the fail-closed rule of ADR 0008 still holds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+from typing import Callable, Optional, Sequence
+
+AuditWrite = Callable[[str], None]
+
+
+class FileAuditWriter:
+    """Append newline-terminated batches to a file, optionally fsyncing each batch."""
+
+    def __init__(self, path: str, *, fsync: bool = False) -> None:
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, payload: str) -> None:
+        self._file.write(payload + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class AuditSink:
+    def __init__(
+        self,
+        write: AuditWrite,
+        *,
+        max_batch: int = 512,
+        max_pending: int = 10_000,
+        ack_timeout: float = 5.0,
+    ) -> None:
+        self.write = write
+        self.max_batch = max_batch
+        self.ack_timeout = ack_timeout
+        self._queue: asyncio.Queue[tuple[Sequence[str], asyncio.Future[None]]] = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task[None]] = None
+        self.batches = 0
+        self.records = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Flush everything already submitted, then stop the writer."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def submit(self, lines: Sequence[str]) -> None:
+        """Wait until `lines` are written. Raises RuntimeError on write failure or timeout."""
+        if not lines:
+            return
+        if not self.running:
+            raise RuntimeError("audit sink is not running")
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._enqueue(lines, future), self.ack_timeout)
+        except asyncio.TimeoutError as exc:
+            raise RuntimeError("audit log write timed out") from exc
+
+    async def _enqueue(self, lines: Sequence[str], future: asyncio.Future[None]) -> None:
+        await self._queue.put((lines, future))
+        await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            while count < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                batch.append(item)
+                count += len(item[0])
+            payload = "\n".join(line for lines, _ in batch for line in lines)
+            error: Optional[RuntimeError] = None
+            try:
+                await asyncio.to_thread(self.write, payload)
+            except Exception as exc:
+                error = RuntimeError("failed to emit audit log")
+                error.__cause__ = exc
+            else:
+                self.batches += 1
+                self.records += count
+            for _, future in batch:
+                # A submitter that timed out has already been failed; nothing to resolve.
+                if not future.done():
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+                self._queue.task_done()
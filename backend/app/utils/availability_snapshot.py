@@ -0,0 +1,403 @@
+"""Per-host shared-memory availability snapshot of hot shops, readable by every worker.
+
+One mmapped file holds a header, a directory entry per configured shop and, per shop,
+a fixed-size region of column arrays (id, shop, seat, starts/ends epoch seconds,
+capacity, remaining, status, change seq) sorted by (starts_at, id). Readers bisect
+`starts` and copy the range without locks; a per-shop seqlock tells them to retry
+when a writer changed the region meanwhile. Writers (in-place deltas after commit,
+periodic reloads from MySQL) are serialized across processes by `flock`.
+
+A region answers only ranges inside its covered window and only while it is fresher
+than `max_age_seconds`; otherwise callers fall back to MySQL.
+
+The file is `<path>.<layout digest>`, so workers configured differently never share
+one. A mapped file is never truncated or resized: a damaged one is rebuilt aside and
+swapped in with `os.replace`, leaving workers that still map the old inode unharmed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Literal, Optional, Sequence
+
+from ..domain.services import AvailabilityDelta
+from ..models import SlotStatus
+
+MAGIC = b"AVSNAP01"
+HEADER = struct.Struct("<8s32sQQ")  # magic, layout digest, shop count, slots per shop
+HEADER_SIZE = 64
+# Directory entry fields, as int64 indexes into the directory view.
+SEQLOCK, COUNT, COVERED_FROM, COVERED_TO, REFRESHED_AT, CHANGE_SEQ = range(6)
+DIRECTORY_FIELDS = 8
+COLUMNS: tuple[tuple[str, Literal["q", "i", "B"]], ...] = (
+    ("id", "q"),
+    ("shop", "q"),
+    ("seat", "q"),
+    ("starts", "q"),
+    ("ends", "q"),
+    ("seq", "q"),
+    ("capacity", "i"),
+    ("remaining", "i"),
+    ("status", "B"),
+)
+STATUSES = list(SlotStatus)
+NO_SEAT = -1
+READ_RETRIES = 64
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(value: datetime) -> int:
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+
+def from_epoch(value: int) -> datetime:
+    return EPOCH + timedelta(seconds=value)
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _decode(columns: dict[str, list[int]], *, end_epoch: int, seat_id: int | None) -> list[AvailabilityDelta]:
+    open_status = STATUSES.index(SlotStatus.OPEN)
+    rows = []
+    for slot_id, shop_id, seat, starts, ends, capacity, remaining, status in zip(
+        columns["id"],
+        columns["shop"],
+        columns["seat"],
+        columns["starts"],
+        columns["ends"],
+        columns["capacity"],
+        columns["remaining"],
+        columns["status"],
+    ):
+        if ends > end_epoch or status != open_status or (seat_id is not None and seat != seat_id):
+            continue
+        rows.append(
+            AvailabilityDelta(
+                slot_id=slot_id,
+                shop_id=shop_id,
+                seat_id=None if seat == NO_SEAT else seat,
+                starts_at=from_epoch(starts),
+                ends_at=from_epoch(ends),
+                capacity=capacity,
+                remaining=remaining,
+                status=SlotStatus.OPEN,
+            )
+        )
+    return rows
+
+
+class _Region:
+    """Column views of one shop's region."""
+
+    def __init__(self, buffer: memoryview, slots: int) -> None:
+        offset = 0
+        self.columns: dict[str, memoryview] = {}
+        for name, fmt in COLUMNS:
+            size = slots * struct.calcsize(fmt)
+            self.columns[name] = buffer[offset : offset + size].cast(fmt)
+            offset += _align(size)
+
+    @staticmethod
+    def size(slots: int) -> int:
+        return sum(_align(slots * struct.calcsize(fmt)) for _, fmt in COLUMNS)
+
+    def read(self, i: int) -> AvailabilityDelta:
+        c = self.columns
+        return AvailabilityDelta(
+            slot_id=c["id"][i],
+            shop_id=c["shop"][i],
+            seat_id=None if c["seat"][i] == NO_SEAT else c["seat"][i],
+            starts_at=from_epoch(c["starts"][i]),
+            ends_at=from_epoch(c["ends"][i]),
+            capacity=c["capacity"][i],
+            remaining=c["remaining"][i],
+            status=STATUSES[c["status"][i]],
+        )
+
+    def write(self, i: int, delta: AvailabilityDelta, *, seq: int) -> None:
+        c = self.columns
+        c["id"][i] = delta.slot_id
+        c["shop"][i] = delta.shop_id
+        c["seat"][i] = NO_SEAT if delta.seat_id is None else delta.seat_id
+        c["starts"][i] = to_epoch(delta.starts_at)
+        c["ends"][i] = to_epoch(delta.ends_at)
+        c["seq"][i] = seq
+        c["capacity"][i] = delta.capacity
+        c["remaining"][i] = delta.remaining
+        c["status"][i] = STATUSES.index(delta.status)
+
+    def shift_right(self, start: int, count: int) -> None:
+        """Move rows [start, count) one position right to make room at `start`."""
+        for name, fmt in COLUMNS:
+            view = self.columns[name]
+            moved = view[start:count].tobytes()
+            view[start + 1 : count + 1] = memoryview(moved).cast(fmt)
+
+    def find(self, count: int, slot_id: int, starts: int) -> tuple[int, bool]:
+        """(index, found) of a slot; when not found, the index keeps the region sorted."""
+        ids = self.columns["id"]
+        all_starts = self.columns["starts"][:count]
+        i = bisect.bisect_left(all_starts, starts)
+        while i < count and all_starts[i] == starts:
+            if ids[i] == slot_id:
+                return i, True
+            if ids[i] > slot_id:
+                break
+            i += 1
+        return i, False
+
+    def release(self) -> None:
+        for view in self.columns.values():
+            view.release()
+
+
+class AvailabilitySnapshot:
+    def __init__(
+        self,
+        path: str,
+        shop_ids: Sequence[int],
+        *,
+        slots_per_shop: int = 4096,
+        max_age_seconds: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.shop_ids = tuple(shop_ids)
+        self.slots_per_shop = slots_per_shop
+        self.max_age_seconds = max_age_seconds
+        self.clock = clock
+        self._index = {shop_id: i for i, shop_id in enumerate(self.shop_ids)}
+        digest, self._size = self._layout()
+        self._header = HEADER.pack(MAGIC, digest, len(self.shop_ids), self.slots_per_shop)
+        self.file_path = f"{path}.{digest.hex()[:16]}"
+        self._file: Optional[int] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._directory: Optional[memoryview] = None
+        self._regions: list[_Region] = []
+
+    def _layout(self) -> tuple[bytes, int]:
+        digest = hashlib.sha256(repr((COLUMNS, self.shop_ids, self.slots_per_shop)).encode()).digest()
+        size = HEADER_SIZE + len(self.shop_ids) * DIRECTORY_FIELDS * 8
+        size += len(self.shop_ids) * _Region.size(self.slots_per_shop)
+        return digest, size
+
+    def _open_valid(self) -> Optional[int]:
+        """Descriptor of the layout's file if it exists with the expected header and size."""
+        try:
+            fd = os.open(self.file_path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        if os.pread(fd, HEADER.size, 0) == self._header and os.fstat(fd).st_size == self._size:
+            return fd
+        os.close(fd)
+        return None
+
+    def _create(self) -> int:
+        """Build the file aside, then publish it; another worker's file wins unless it is damaged."""
+        tmp = f"{self.file_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            # Zeroed regions read as empty and never refreshed, i.e. not usable until loaded.
+            os.ftruncate(fd, self._size)
+            os.pwrite(fd, self._header, 0)
+            try:
+                os.link(tmp, self.file_path)
+            except FileExistsError:
+                existing = self._open_valid()
+                if existing is not None:
+                    os.close(fd)
+                    return existing
+                os.replace(tmp, self.file_path)
+            return fd
+        except BaseException:
+            os.close(fd)
+            raise
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp)
+
+    def open(self) -> None:
+        """Map the file of this layout, creating it when missing or damaged."""
+        fd = self._open_valid()
+        if fd is None:
+            fd = self._create()
+        self._file = fd
+        self._mmap = mmap.mmap(fd, self._size)
+        self._view = memoryview(self._mmap)
+        directory_size = len(self.shop_ids) * DIRECTORY_FIELDS * 8
+        self._directory = self._view[HEADER_SIZE : HEADER_SIZE + directory_size].cast("q")
+        region_size = _Region.size(self.slots_per_shop)
+        base = HEADER_SIZE + directory_size
+        self._regions = [
+            _Region(self._view[base + i * region_size : base + (i + 1) * region_size], self.slots_per_shop)
+            for i in range(len(self.shop_ids))
+        ]
+
+    def close(self) -> None:
+        for region in self._regions:
+            region.release()
+        self._regions = []
+        if self._directory is not None:
+            self._directory.release()
+            self._directory = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            os.close(self._file)
+            self._file = None
+
+    def covers(self, shop_id: int) -> bool:
+        return shop_id in self._index
+
+    def _field(self, idx: int, field: int) -> int:
+        assert self._directory is not None
+        return int(self._directory[idx * DIRECTORY_FIELDS + field])
+
+    def _set_field(self, idx: int, field: int, value: int) -> None:
+        assert self._directory is not None
+        self._directory[idx * DIRECTORY_FIELDS + field] = value
+
+    def age(self, shop_id: int) -> float:
+        """Seconds since the shop's region was last loaded (inf if never)."""
+        refreshed_at = self._field(self._index[shop_id], REFRESHED_AT)
+        return self.clock() - refreshed_at if refreshed_at else float("inf")
+
+    @contextlib.contextmanager
+    def _writing(self, idx: int) -> Iterator[_Region]:
+        assert self._file is not None
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            seq = self._field(idx, SEQLOCK)
+            # Odd means a writer died mid-update; it is still "being written" until we finish.
+            self._set_field(idx, SEQLOCK, seq if seq & 1 else seq + 1)
+            try:
+                yield self._regions[idx]
+            finally:
+                self._set_field(idx, SEQLOCK, self._field(idx, SEQLOCK) + 1)
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def query(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+    ) -> Optional[list[AvailabilityDelta]]:
+        """Open slots with start <= starts_at and ends_at <= end, like `list_with_reserved`.
+
+        Returns None when the snapshot cannot answer (shop not hot, range not covered,
+        region stale, or a writer kept it busy), so the caller goes to MySQL.
+        """
+        idx = self._index.get(shop_id)
+        if idx is None or self._view is None or self._directory is None:
+            return None
+        if self._view[: HEADER.size] != self._header:
+            # Not the layout we mapped (damaged on disk): its columns cannot be trusted.
+            return None
+        start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+        region = self._regions[idx]
+        for _ in range(READ_RETRIES):
+            before = self._field(idx, SEQLOCK)
+            if before & 1:
+                continue
+            count = self._field(idx, COUNT)
+            refreshed_at = self._field(idx, REFRESHED_AT)
+            if not refreshed_at or self.clock() - refreshed_at > self.max_age_seconds:
+                return None
+            if start_epoch < self._field(idx, COVERED_FROM) or end_epoch > self._field(idx, COVERED_TO):
+                return None
+            starts = region.columns["starts"][:count]
+            lo = bisect.bisect_left(starts, start_epoch)
+            hi = bisect.bisect_left(starts, end_epoch, lo)
+            # Copy the range out first; decoding happens once the seqlock confirms the copy.
+            copied = {name: region.columns[name][lo:hi].tolist() for name, _ in COLUMNS}
+            if self._field(idx, SEQLOCK) == before:
+                return _decode(copied, end_epoch=end_epoch, seat_id=seat_id)
+        return None
+
+    def apply(self, deltas: Sequence[AvailabilityDelta], *, seq: int) -> None:
+        """Write committed deltas in place; older deltas (lower seq) never overwrite newer ones."""
+        for delta in deltas:
+            idx = self._index.get(delta.shop_id)
+            if idx is None or self._directory is None:
+                continue
+            starts = to_epoch(delta.starts_at)
+            ends = to_epoch(delta.ends_at)
+            with self._writing(idx) as region:
+                count = self._field(idx, COUNT)
+                i, found = region.find(count, delta.slot_id, starts)
+                if found:
+                    if region.columns["seq"][i] <= seq:
+                        region.write(i, delta, seq=seq)
+                    continue
+                if starts < self._field(idx, COVERED_FROM) or ends > self._field(idx, COVERED_TO):
+                    continue
+                if count >= self.slots_per_shop:
+                    # No room for a new slot: stop answering until the next reload.
+                    self._set_field(idx, REFRESHED_AT, 0)
+                    continue
+                region.shift_right(i, count)
+                region.write(i, delta, seq=seq)
+                self._set_field(idx, COUNT, count + 1)
+
+    def load(
+        self,
+        shop_id: int,
+        deltas: Sequence[AvailabilityDelta],
+        *,
+        seq: int,
+        covered_from: datetime,
+        covered_to: datetime,
+    ) -> None:
+        """Replace a shop's region with a fresh read taken at change seq `seq`.
+
+        Rows already updated by a newer delta (seq greater than `seq`) are kept.
+        """
+        idx = self._index[shop_id]
+        with self._writing(idx) as region:
+            merged = {delta.slot_id: (delta, seq) for delta in deltas}
+            # Keep what in-place deltas committed after the read, including slots it missed.
+            for i in range(self._field(idx, COUNT)):
+                if region.columns["seq"][i] > seq:
+                    merged[region.columns["id"][i]] = (region.read(i), region.columns["seq"][i])
+            rows = sorted(merged.values(), key=lambda row: (to_epoch(row[0].starts_at), row[0].slot_id))
+            covered_to_epoch = to_epoch(covered_to)
+            if len(rows) > self.slots_per_shop:
+                covered_to_epoch = to_epoch(rows[self.slots_per_shop][0].starts_at)
+                rows = rows[: self.slots_per_shop]
+            for i, (delta, row_seq) in enumerate(rows):
+                region.write(i, delta, seq=row_seq)
+            self._set_field(idx, COUNT, len(rows))
+            self._set_field(idx, COVERED_FROM, to_epoch(covered_from))
+            self._set_field(idx, COVERED_TO, covered_to_epoch)
+            self._set_field(idx, CHANGE_SEQ, seq)
+            self._set_field(idx, REFRESHED_AT, int(self.clock()))
+
+
+_snapshot: Optional[AvailabilitySnapshot] = None
+
+
+def set_availability_snapshot(snapshot: Optional[AvailabilitySnapshot]) -> None:
+    global _snapshot
+    _snapshot = snapshot
+
+
+def get_availability_snapshot() -> Optional[AvailabilitySnapshot]:
+    return _snapshot
@@ -0,0 +1,196 @@
+"""In-process fan-out of slot availability deltas to Server-Sent Events subscribers.
+
+Writers publish after commit. Each delta is encoded into one SSE frame that every
+matching subscriber shares. A subscriber holds a bounded deque of frames and an
+Event, with no task or timer of its own (one hub-wide heartbeat keeps idle
+connections alive), so thousands of idle streams cost little. A subscriber whose
+deque is full is dropped: its stream ends and the client reconnects and resyncs
+from a fresh snapshot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Protocol, Sequence
+
+from ..domain.services import AvailabilityDelta
+from .time import utc_naive_to_jst
+
+# Tells EventSource clients how long to wait before reconnecting after a drop.
+RETRY_FRAME = b"retry: 3000\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+def encode_frame(event: str, data: str, *, seq: int) -> bytes:
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def encode_delta(delta: AvailabilityDelta, *, seq: int) -> bytes:
+    data = json.dumps(
+        {
+            "seq": seq,
+            "slot_id": delta.slot_id,
+            "shop_id": delta.shop_id,
+            "seat_id": delta.seat_id,
+            "starts_at": utc_naive_to_jst(delta.starts_at).isoformat(),
+            "ends_at": utc_naive_to_jst(delta.ends_at).isoformat(),
+            "capacity": delta.capacity,
+            "remaining": delta.remaining,
+            "status": str(delta.status),
+        },
+        separators=(",", ":"),
+    )
+    return encode_frame("availability", data, seq=seq)
+
+
+class AvailabilityListener(Protocol):
+    """Non-stream consumer of committed deltas (e.g. the shared-memory snapshot)."""
+
+    def covers(self, shop_id: int) -> bool: ...
+
+    def apply(self, deltas: Sequence[AvailabilityDelta], *, seq: int) -> None: ...
+
+
+class Subscription:
+    __slots__ = ("shop_id", "start", "end", "closed", "_frames", "_max_pending", "_wakeup")
+
+    def __init__(self, shop_id: int, *, start: datetime, end: datetime, max_pending: int) -> None:
+        self.shop_id = shop_id
+        self.start = start
+        self.end = end
+        self.closed = False
+        self._frames: collections.deque[bytes] = collections.deque()
+        self._max_pending = max_pending
+        self._wakeup = asyncio.Event()
+
+    def push(self, frame: bytes) -> bool:
+        """Queue a frame; returns False (and closes) when the client is too far behind."""
+        if self.closed:
+            return False
+        if len(self._frames) >= self._max_pending:
+            self.close()
+            return False
+        self._frames.append(frame)
+        self._wakeup.set()
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+        self._frames.clear()
+        self._wakeup.set()
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        """Yield queued frames, joined per wakeup, until the subscription is closed."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.closed:
+                return
+            chunk = b"".join(self._frames)
+            self._frames.clear()
+            yield chunk
+
+
+class AvailabilityHub:
+    def __init__(self, *, max_pending: int = 64) -> None:
+        self.max_pending = max_pending
+        self._by_shop: dict[int, set[Subscription]] = {}
+        self._listeners: list[AvailabilityListener] = []
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subs) for subs in self._by_shop.values())
+
+    def add_listener(self, listener: AvailabilityListener) -> None:
+        self._listeners.append(listener)
+
+    def has_subscribers(self, shop_id: int) -> bool:
+        return shop_id in self._by_shop or any(listener.covers(shop_id) for listener in self._listeners)
+
+    def subscribe(self, shop_id: int, *, start: datetime, end: datetime) -> Subscription:
+        subscription = Subscription(shop_id, start=start, end=end, max_pending=self.max_pending)
+        self._by_shop.setdefault(shop_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subs = self._by_shop.get(subscription.shop_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self._by_shop[subscription.shop_id]
+
+    def publish(self, deltas: Iterable[AvailabilityDelta], *, seq: int) -> None:
+        """Push committed deltas to listeners and to subscribers whose shop and range match. Never blocks."""
+        deltas = list(deltas)
+        for listener in self._listeners:
+            listener.apply(deltas, seq=seq)
+        for delta in deltas:
+            subs = self._by_shop.get(delta.shop_id)
+            if not subs:
+                continue
+            frame: Optional[bytes] = None
+            for subscription in list(subs):
+                if not subscription.start <= delta.starts_at < subscription.end:
+                    continue
+                if frame is None:
+                    frame = encode_delta(delta, seq=seq)
+                    self.published += 1
+                if not subscription.push(frame):
+                    self.dropped += 1
+                    self.unsubscribe(subscription)
+
+    def heartbeat(self) -> None:
+        for subs in list(self._by_shop.values()):
+            for subscription in list(subs):
+                if not subscription.push(KEEPALIVE_FRAME):
+                    self.dropped += 1
+                    self.unsubscribe(subscription)
+
+    def close(self) -> None:
+        """End every open stream, e.g. on shutdown."""
+        for subs in list(self._by_shop.values()):
+            for subscription in list(subs):
+                self.unsubscribe(subscription)
+
+    async def run_heartbeat(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            self.heartbeat()
+
+    async def stream(self, subscription: Subscription, *, first: bytes) -> AsyncIterator[bytes]:
+        """Response body for one subscriber: `first` (e.g. a snapshot), then live frames."""
+        try:
+            yield RETRY_FRAME + first
+            async for chunk in subscription.frames():
+                yield chunk
+        finally:
+            self.unsubscribe(subscription)
+
+
+_hub: Optional[AvailabilityHub] = None
+
+
+def set_availability_hub(hub: Optional[AvailabilityHub]) -> None:
+    global _hub
+    _hub = hub
+
+
+def get_availability_hub() -> Optional[AvailabilityHub]:
+    return _hub
+
+
+def availability_subscribed(shop_id: int) -> bool:
+    """Whether any stream or listener of this worker watches the shop; writers skip building deltas otherwise."""
+    return _hub is not None and _hub.has_subscribers(shop_id)
+
+
+def publish_availability(deltas: Iterable[AvailabilityDelta], *, seq: int) -> None:
+    """Publish committed deltas to the installed hub; a no-op when streaming is not set up."""
+    if _hub is not None:
+        _hub.publish(deltas, seq=seq)
@@ -0,0 +1,249 @@
+"""Host-local invalidation bus between uvicorn workers over Unix datagram sockets.
+
+Every worker binds `<directory>/<pid>.sock`. A publish runs the local handlers
+right away, then sends one datagram (a batch of (kind, key) entries) to every
+other socket in the directory. Delivery is best effort: a peer whose receive
+buffer is full misses the message, and a dead peer's socket file is removed on
+the first refused send. Caches fed by the bus therefore also expire entries
+after a TTL (`InvalidatingCache`), which bounds staleness when a message is lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Generic, Hashable, Iterable, Optional, TypeVar, cast
+
+logger = logging.getLogger("utils.invalidation_bus")
+
+# Append only: the index is the wire format. "policy" is separate from "shop" because
+# every booking publishes its shop, while policies change rarely.
+KINDS = ("shop", "slot", "user", "policy")
+HEADER = struct.Struct("<I")  # sender pid
+ENTRY = struct.Struct("<BQ")  # kind index, key
+MAX_ENTRIES_PER_DATAGRAM = 1024
+PEER_REFRESH_SECONDS = 1.0
+
+InvalidationHandler = Callable[[str, int], None]
+
+
+def encode_invalidations(pid: int, entries: list[tuple[str, int]]) -> bytes:
+    return HEADER.pack(pid) + b"".join(ENTRY.pack(KINDS.index(kind), key) for kind, key in entries)
+
+
+def decode_invalidations(datagram: bytes) -> tuple[int, list[tuple[str, int]]]:
+    (pid,) = HEADER.unpack_from(datagram)
+    body = memoryview(datagram)[HEADER.size :]
+    body = body[: len(body) - len(body) % ENTRY.size]
+    return pid, [(KINDS[kind], key) for kind, key in ENTRY.iter_unpack(body)]
+
+
+class InvalidationBus:
+    """Broadcast shop/slot/user/policy invalidations to the handlers of every worker on the host.
+
+    Without a directory the bus is local only: handlers of this process still run.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        *,
+        pid: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.directory = Path(directory) if directory else None
+        self.clock = clock
+        self.pid = os.getpid() if pid is None else pid
+        self._handlers: list[InvalidationHandler] = []
+        self._sock: Optional[socket.socket] = None
+        self._path: Optional[Path] = None
+        self._peers: list[str] = []
+        self._peers_at = float("-inf")
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+
+    def subscribe(self, handler: InvalidationHandler) -> None:
+        self._handlers.append(handler)
+
+    def start(self) -> None:
+        if self.directory is None or self._sock is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path = self.directory / f"{self.pid}.sock"
+        self._path.unlink(missing_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(self._path))
+        sock.setblocking(False)
+        self._sock = sock
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        if self._path is not None:
+            self._path.unlink(missing_ok=True)
+
+    def publish(self, entries: Iterable[tuple[str, int]]) -> None:
+        """Invalidate locally now and notify the other workers; never blocks."""
+        unique = list(dict.fromkeys(entries))
+        if not unique:
+            return
+        self._dispatch(unique)
+        if self._sock is None:
+            return
+        for offset in range(0, len(unique), MAX_ENTRIES_PER_DATAGRAM):
+            datagram = encode_invalidations(self.pid, unique[offset : offset + MAX_ENTRIES_PER_DATAGRAM])
+            for peer in self._peer_paths():
+                self._send(datagram, peer)
+
+    def _send(self, datagram: bytes, peer: str) -> None:
+        assert self._sock is not None
+        try:
+            self._sock.sendto(datagram, peer)
+            self.sent += 1
+        except BlockingIOError:
+            # The peer is not draining its socket; its TTL covers the lost message.
+            self.dropped += 1
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Nobody is bound any more: the worker exited without cleaning up.
+            Path(peer).unlink(missing_ok=True)
+            self._peers_at = float("-inf")
+
+    def _peer_paths(self) -> list[str]:
+        now = self.clock()
+        if now - self._peers_at >= PEER_REFRESH_SECONDS:
+            assert self.directory is not None and self._path is not None
+            own = self._path.name
+            self._peers = [str(path) for path in self.directory.glob("*.sock") if path.name != own]
+            self._peers_at = now
+        return self._peers
+
+    def _on_readable(self) -> None:
+        assert self._sock is not None
+        while True:
+            try:
+                datagram = self._sock.recv(65536)
+            except BlockingIOError:
+                return
+            try:
+                pid, entries = decode_invalidations(datagram)
+            except (struct.error, IndexError):
+                logger.warning("dropping malformed invalidation datagram (%d bytes)", len(datagram))
+                continue
+            if pid != self.pid:
+                self.received += 1
+                self._dispatch(entries)
+
+    def _dispatch(self, entries: list[tuple[str, int]]) -> None:
+        for handler in self._handlers:
+            for kind, key in entries:
+                try:
+                    handler(kind, key)
+                except Exception:
+                    logger.exception("invalidation handler failed for %s %s", kind, key)
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class InvalidatingCache(Generic[K, V]):
+    """Per-worker cache whose entries go on a bus invalidation of `kind` or after `ttl_seconds`.
+
+    Subscribe `handle` to an InvalidationBus. Keys are bus keys unless `key_of` maps a
+    cache key to one, so entries keyed by e.g. (shop_id, date) drop on a shop message.
+
+    A read-through fill takes `generation(key)` before its database read and passes it
+    to `put`: if an invalidation of the key arrived in between, the value it read may
+    predate the change and is not stored.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        *,
+        ttl_seconds: float,
+        key_of: Optional[Callable[[K], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.kind = kind
+        self.ttl_seconds = ttl_seconds
+        self.key_of = key_of
+        self.clock = clock
+        self._entries: dict[K, tuple[float, V]] = {}
+        # Invalidation count per bus key, plus one for every clear(); only ever grows.
+        self._generations: dict[int, int] = {}
+        self._clears = 0
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def generation(self, key: K) -> int:
+        bus_key = cast(int, key) if self.key_of is None else self.key_of(key)
+        return self._clears + self._generations.get(bus_key, 0)
+
+    def put(self, key: K, value: V, *, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation(key):
+            return
+        self._entries[key] = (self.clock() + self.ttl_seconds, value)
+
+    def handle(self, kind: str, key: int) -> None:
+        if kind != self.kind:
+            return
+        self._generations[key] = self._generations.get(key, 0) + 1
+        if self.key_of is None:
+            self._entries.pop(cast(K, key), None)
+            return
+        key_of = self.key_of
+        for cached in [cached for cached in self._entries if key_of(cached) == key]:
+            del self._entries[cached]
+
+    def clear(self) -> None:
+        self._clears += 1
+        self._entries.clear()
+
+
+_bus: Optional[InvalidationBus] = None
+
+
+def set_invalidation_bus(bus: Optional[InvalidationBus]) -> None:
+    global _bus
+    _bus = bus
+
+
+def get_invalidation_bus() -> Optional[InvalidationBus]:
+    return _bus
+
+
+def publish_invalidations(
+    *,
+    shops: Iterable[int] = (),
+    slots: Iterable[int] = (),
+    users: Iterable[int] = (),
+    policies: Iterable[int] = (),
+) -> None:
+    """Broadcast after commit; a no-op when no bus is installed."""
+    if _bus is None:
+        return
+    _bus.publish(
+        [("shop", key) for key in shops]
+        + [("slot", key) for key in slots]
+        + [("user", key) for key in users]
+        + [("policy", key) for key in policies]
+    )
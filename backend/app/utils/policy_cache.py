@@ -0,0 +1,30 @@
+"""Per-worker cache of shop booking policies.
+
+Entries are keyed by shop id and dropped on a "policy" message of the invalidation
+bus (published after a policy update commits) or after the TTL, which bounds
+staleness when a message is lost. A miss costs one primary-key read.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from ..domain.services import BookingPolicy
+from .invalidation_bus import InvalidatingCache
+
+PolicyCache = InvalidatingCache[int, BookingPolicy]
+
+_cache: Optional[PolicyCache] = None
+
+
+def new_policy_cache(ttl_seconds: float) -> PolicyCache:
+    return InvalidatingCache("policy", ttl_seconds=ttl_seconds)
+
+
+def set_policy_cache(cache: Optional[PolicyCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def get_policy_cache() -> Optional[PolicyCache]:
+    return _cache
@@ -0,0 +1 @@
+# Background workers (started from app.main lifespan)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..infrastructure.repositories import SqlAlchemyAuditOutboxRepository
+
+logger = logging.getLogger("workers.audit_relay")
+
+ShipLines = Callable[[Sequence[str]], Awaitable[None]]
+
+
+def with_outbox_id(payload: str, outbox_id: int) -> str:
+    """Append the outbox row id to an encoded audit line so consumers can drop re-shipped lines."""
+    return f'{payload[:-1]}, "outbox_id": {outbox_id}}}'
+
+
+class AuditRelay:
+    """Ships committed `audit_outbox` rows to the audit sink and marks them shipped.
+
+    Rows are locked, written (and acknowledged by the sink) and marked in one
+    transaction, so a row is marked only after its line is durable. A crash between
+    the write and the commit re-ships the batch; `outbox_id` makes that detectable.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        ship: ShipLines,
+        *,
+        batch_size: int,
+        interval_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.ship = ship
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+
+    async def run_once(self) -> int:
+        async with self.session_factory() as session, session.begin():
+            outbox = SqlAlchemyAuditOutboxRepository(session)
+            rows = await outbox.lock_unshipped(self.batch_size)
+            if not rows:
+                return 0
+            # RuntimeError propagates and rolls back; the rows stay unshipped for the next run.
+            await self.ship([with_outbox_id(row.payload, row.id) for row in rows])
+            await outbox.mark_shipped([row.id for row in rows], datetime.now(timezone.utc).replace(tzinfo=None))
+        return len(rows)
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                shipped = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("audit relay batch failed")
+                shipped = 0
+            # Keep draining while there is a backlog.
+            await asyncio.sleep(0 if shipped >= self.batch_size else self.interval_seconds)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..infrastructure.repositories import SqlAlchemyHoldRepository, SqlAlchemySlotRepository
+from ..usecases import holds as hold_usecase
+
+logger = logging.getLogger("workers.hold_sweeper")
+
+
+class HoldSweeper:
+    """Reclaims expired seat holds in batches so slot.held does not drift.
+
+    Reads already ignore fully expired holds via slot.held_until and booking
+    paths reclaim lazily under the slot lock; this sweep covers slots nobody
+    touches.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        batch_size: int,
+        interval_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+
+    async def run_once(self) -> int:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with self.session_factory() as session, session.begin():
+            reclaimed = await hold_usecase.reclaim_expired_holds(
+                SqlAlchemySlotRepository(session),
+                SqlAlchemyHoldRepository(session),
+                now=now,
+                batch_size=self.batch_size,
+            )
+        if reclaimed:
+            logger.info("reclaimed expired holds on %d slots", reclaimed)
+        return reclaimed
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                reclaimed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("hold sweeper batch failed")
+                reclaimed = 0
+            # Keep draining while there is a backlog.
+            await asyncio.sleep(0 if reclaimed >= self.batch_size else self.interval_seconds)
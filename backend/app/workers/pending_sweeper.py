@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..infrastructure.repositories import (
+    SqlAlchemyAuditOutboxRepository,
+    SqlAlchemyChangeLogRepository,
+    SqlAlchemyReservationRepository,
+)
+from ..usecases import changes as change_usecase
+from ..usecases import reservations as reservation_usecase
+from ..utils.audit_log import AuditRecord, emit_audit_logs
+
+logger = logging.getLogger("workers.pending_sweeper")
+
+
+@dataclass
+class SweeperStats:
+    batches: int = 0
+    cancelled_total: int = 0
+    busy_seconds: float = 0.0
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+
+    @property
+    def throughput_per_second(self) -> float:
+        """Reservations cancelled per second of sweeper work time."""
+        return self.cancelled_total / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+
+class PendingSweeper:
+    """Auto-cancels stale request_pending reservations in bounded batches.
+
+    Each batch is one short transaction: `SELECT ... FOR UPDATE SKIP LOCKED` over
+    idx_res_status_created, a set-based cancel and one batched audit write
+    (`reservation.autocancelled`, initiator `system`). Between full batches the
+    sweeper sleeps so that it never exceeds `rate_per_second`.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        expiry: timedelta,
+        batch_size: int,
+        rate_per_second: float,
+        interval_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.expiry = expiry
+        self.batch_size = batch_size
+        self.rate_per_second = rate_per_second
+        self.interval_seconds = interval_seconds
+        self.stats = SweeperStats()
+
+    async def run_once(self) -> int:
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with self.session_factory() as session, session.begin():
+            res_repo = SqlAlchemyReservationRepository(session)
+            cancelled = await reservation_usecase.autocancel_expired_pending(
+                res_repo,
+                now=now,
+                expiry=self.expiry,
+                batch_size=self.batch_size,
+            )
+            # RuntimeError propagates and rolls the batch back (fail-closed as in ADR 0008).
+            await emit_audit_logs(
+                [
+                    AuditRecord(
+                        action="reservation.autocancelled",
+                        initiator="system",
+                        reservation_id=change.reservation_id,
+                        slot_id=change.slot_id,
+                        shop_id=change.shop_id,
+                        user_id=change.user_id,
+                        party_size=change.party_size,
+                        status_from=change.status_from,
+                        status_to=change.status_to,
+                        version=change.version,
+                        message="pending reservation expired",
+                    )
+                    for change in cancelled
+                ],
+                outbox=SqlAlchemyAuditOutboxRepository(session),
+            )
+            await SqlAlchemyChangeLogRepository(session).append(
+                change_usecase.reservations_changed(cancelled, action="autocancelled")
+            )
+        elapsed = time.perf_counter() - started
+        self.stats.batches += 1
+        self.stats.cancelled_total += len(cancelled)
+        self.stats.busy_seconds += elapsed
+        self.stats.last_batch_size = len(cancelled)
+        self.stats.last_batch_seconds = elapsed
+        if cancelled:
+            logger.info(
+                "autocancelled %d reservations in %.3fs (total=%d, throughput=%.1f/s)",
+                len(cancelled),
+                elapsed,
+                self.stats.cancelled_total,
+                self.stats.throughput_per_second,
+            )
+        return len(cancelled)
+
+    def next_delay(self, processed: int) -> float:
+        if processed >= self.batch_size:
+            # Backlog remains: pace batches to the configured rate.
+            return processed / self.rate_per_second
+        return self.interval_seconds
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("pending sweeper batch failed")
+                processed = 0
+            await asyncio.sleep(self.next_delay(processed))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..infrastructure.repositories import SqlAlchemyChangeLogRepository, SqlAlchemySlotRepository
+from ..usecases import slots as slot_usecase
+from ..utils.availability_snapshot import AvailabilitySnapshot
+
+logger = logging.getLogger("workers.snapshot_refresher")
+
+
+class SnapshotRefresher:
+    """Reloads the hot shops of the shared availability snapshot from MySQL.
+
+    In-place deltas after commit keep regions current between reloads; the reload
+    picks up what does not publish deltas (hold expiry, bulk status changes, the
+    pending sweeper) and moves the covered window forward. Every worker runs one,
+    but a region reloaded by another worker recently is skipped.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        snapshot: AvailabilitySnapshot,
+        *,
+        horizon_days: int,
+        interval_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.snapshot = snapshot
+        self.horizon_days = horizon_days
+        self.interval_seconds = interval_seconds
+
+    async def run_once(self) -> int:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        covered_from = now - timedelta(days=1)
+        covered_to = now + timedelta(days=self.horizon_days)
+        loaded = 0
+        for shop_id in self.snapshot.shop_ids:
+            if self.snapshot.age(shop_id) < self.interval_seconds / 2:
+                continue
+            async with self.session_factory() as session, session.begin():
+                # Same transaction: rows at least as new as the seq they are stamped with.
+                seq = await SqlAlchemyChangeLogRepository(session).last_seq(shop_id)
+                deltas = await slot_usecase.availability_window(
+                    SqlAlchemySlotRepository(session),
+                    shop_id=shop_id,
+                    start=covered_from,
+                    end=covered_to,
+                )
+            self.snapshot.load(shop_id, deltas, seq=seq, covered_from=covered_from, covered_to=covered_to)
+            loaded += 1
+        return loaded
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("availability snapshot refresh failed")
+            await asyncio.sleep(self.interval_seconds)
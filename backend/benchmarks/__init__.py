@@ -0,0 +1 @@
+# Standalone micro/macro benchmarks (run with: uv run python -m benchmarks.<name>)
@@ -0,0 +1,183 @@
+"""Seat auto-assignment: utilization and latency of best-fit vs. naive seat choice.
+
+Simulates one evening start time of a shop with 2-, 4- and 6-seat tables, repeated
+over `rounds` evenings. Parties (1-6 guests) arrive until demand is ~120% of the
+seats and book through `create_reservation_any_seat` in waves of `concurrency`
+concurrent transactions. The repositories are in memory: the candidate query and
+each statement sleep like a database round trip, and a locked row is skipped like
+FOR UPDATE SKIP LOCKED. Only the candidate order differs between strategies:
+
+- best-fit: tightest remaining capacity first (the SQL ORDER BY)
+- first: lowest slot id first (a user picking the first listed seat)
+- random: any seat with room (a user picking freely)
+
+    uv run python -m benchmarks.any_seat [rounds] [concurrency]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Sequence
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.domain.errors import CapacityError  # noqa: E402
+from app.models import Reservation, ReservationStatus, Slot, SlotStatus  # noqa: E402
+from app.usecases.reservations import create_reservation_any_seat  # noqa: E402
+
+START = datetime(2030, 1, 1, 10, 0)
+TABLES = [2] * 10 + [4] * 12 + [6] * 8
+PARTY_SIZES = [1, 2, 3, 4, 5, 6]
+PARTY_WEIGHTS = [8, 40, 14, 22, 8, 8]
+ROUND_TRIP = 0.0005  # seconds per simulated statement
+
+Order = Callable[[list[Slot], dict[int, int], random.Random], list[Slot]]
+
+
+def _best_fit(slots: list[Slot], reserved: dict[int, int], rng: random.Random) -> list[Slot]:
+    return sorted(slots, key=lambda slot: (slot.capacity - reserved[slot.id], slot.capacity, slot.id))
+
+
+def _first(slots: list[Slot], reserved: dict[int, int], rng: random.Random) -> list[Slot]:
+    return sorted(slots, key=lambda slot: slot.id)
+
+
+def _random(slots: list[Slot], reserved: dict[int, int], rng: random.Random) -> list[Slot]:
+    return rng.sample(slots, len(slots))
+
+
+class Shop:
+    def __init__(self, order: Order, rng: random.Random) -> None:
+        self.order = order
+        self.rng = rng
+        self.slots = {
+            i + 1: Slot(
+                id=i + 1,
+                shop_id=1,
+                seat_id=i + 1,
+                starts_at=START,
+                ends_at=START + timedelta(hours=2),
+                capacity=capacity,
+                status=SlotStatus.OPEN,
+            )
+            for i, capacity in enumerate(TABLES)
+        }
+        self.reserved = {slot_id: 0 for slot_id in self.slots}
+        self.locks = {slot_id: asyncio.Lock() for slot_id in self.slots}
+
+
+class Transaction:
+    """Per-booking repositories sharing the shop state; row locks are held until `commit`."""
+
+    def __init__(self, shop: Shop) -> None:
+        self.shop = shop
+        self.held: list[asyncio.Lock] = []
+
+    async def best_fit_seat_slots(
+        self, shop_id: int, *, starts_at: datetime, party_size: int, limit: int, now: datetime
+    ) -> list[int]:
+        await asyncio.sleep(ROUND_TRIP)
+        fits = [slot for slot in self.shop.slots.values() if slot.capacity - self.shop.reserved[slot.id] >= party_size]
+        return [slot.id for slot in self.shop.order(fits, self.shop.reserved, self.shop.rng)[:limit]]
+
+    async def lock_many_skip_locked(self, slot_ids: Sequence[int]) -> list[Slot]:
+        await asyncio.sleep(ROUND_TRIP)
+        locked = []
+        for slot_id in slot_ids:
+            lock = self.shop.locks[slot_id]
+            if not lock.locked():
+                await lock.acquire()
+                self.held.append(lock)
+                locked.append(self.shop.slots[slot_id])
+        return locked
+
+    async def reclaim_expired(self, slot: Slot, now: datetime) -> int:
+        return 0
+
+    async def user_has_active(self, slot_id: int, user_id: int) -> bool:
+        return False
+
+    async def sum_reserved(self, slot_id: int) -> int:
+        await asyncio.sleep(ROUND_TRIP)
+        return self.shop.reserved[slot_id]
+
+    async def create(self, slot_id: int, user_id: int, party_size: int, status: ReservationStatus) -> Reservation:
+        await asyncio.sleep(ROUND_TRIP)
+        self.shop.reserved[slot_id] += party_size
+        return Reservation(slot_id=slot_id, user_id=user_id, party_size=party_size, status=status)
+
+    async def commit(self) -> None:
+        await asyncio.sleep(ROUND_TRIP)
+        for lock in self.held:
+            lock.release()
+
+
+async def _book(shop: Shop, user_id: int, party_size: int, latencies: list[float]) -> int:
+    tx = Transaction(shop)
+    started = time.perf_counter()
+    try:
+        await create_reservation_any_seat(
+            tx,  # type: ignore[arg-type]
+            tx,  # type: ignore[arg-type]
+            hold_repo=tx,  # type: ignore[arg-type]
+            shop_id=1,
+            starts_at=START,
+            user_id=user_id,
+            party_size=party_size,
+        )
+        seated = party_size
+    except CapacityError:
+        seated = 0
+    await tx.commit()
+    latencies.append((time.perf_counter() - started) * 1000)
+    return seated
+
+
+def _p(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def _run(name: str, order: Order, rounds: int, concurrency: int) -> None:
+    rng = random.Random(7)
+    seats = sum(TABLES)
+    seated = demanded = rejected = 0
+    latencies: list[float] = []
+    for _ in range(rounds):
+        shop = Shop(order, rng)
+        parties: list[int] = []
+        while sum(parties) < seats * 1.2:
+            parties.append(rng.choices(PARTY_SIZES, PARTY_WEIGHTS)[0])
+        demanded += sum(parties)
+        for offset in range(0, len(parties), concurrency):
+            wave = parties[offset : offset + concurrency]
+            results = await asyncio.gather(*(_book(shop, offset + i, size, latencies) for i, size in enumerate(wave)))
+            seated += sum(results)
+            rejected += sum(1 for result in results if result == 0)
+    print(
+        f"{name:9s} utilization={seated / (seats * rounds) * 100:5.1f}%  "
+        f"guests seated={seated / demanded * 100:5.1f}%  rejected parties={rejected / rounds:5.1f}/evening  "
+        f"latency p50={_p(latencies, 50):5.1f} ms p99={_p(latencies, 99):5.1f} ms"
+    )
+
+
+async def main(rounds: int, concurrency: int) -> None:
+    print(
+        f"tables={TABLES.count(2)}x2 {TABLES.count(4)}x4 {TABLES.count(6)}x6 rounds={rounds} concurrency={concurrency}"
+    )
+    for name, order in (("best-fit", _best_fit), ("first", _first), ("random", _random)):
+        await _run(name, order, rounds, concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        )
+    )
@@ -0,0 +1,82 @@
+"""Compare per-record `emit_audit_log` with batched `emit_audit_logs` for a shop-wide cancellation.
+
+Target (ADR 0010): the audit part of cancelling 10k reservations stays under 100 ms so the
+whole request (lock + chunked UPDATEs + audit) fits in the 2 s budget.
+
+    uv run python -m benchmarks.audit_batch [count]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.models import ReservationStatus  # noqa: E402
+from app.utils import audit_log  # noqa: E402
+
+TARGET_MS = 100.0
+
+
+def _records(count: int) -> list[audit_log.AuditRecord]:
+    return [
+        audit_log.AuditRecord(
+            action="reservation.shop_cancelled",
+            initiator="shop",
+            reservation_id=i,
+            slot_id=i // 4,
+            shop_id=1,
+            user_id=10_000 + i,
+            party_size=2,
+            status_from=ReservationStatus.BOOKED,
+            status_to=ReservationStatus.CANCELLED,
+            version=2,
+        )
+        for i in range(count)
+    ]
+
+
+async def main(count: int) -> None:
+    sink = io.StringIO()
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("audit.benchmark")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    audit_log._audit_logger = logger
+
+    records = _records(count)
+
+    started = time.perf_counter()
+    for record in records:
+        await audit_log.emit_audit_log(
+            action=record.action,
+            initiator=record.initiator,
+            reservation_id=record.reservation_id,
+            slot_id=record.slot_id,
+            shop_id=record.shop_id,
+            user_id=record.user_id,
+            party_size=record.party_size,
+            status_from=record.status_from,
+            status_to=record.status_to,
+            version=record.version,
+        )
+    per_record_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    await audit_log.emit_audit_logs(records)
+    batched_ms = (time.perf_counter() - started) * 1000
+
+    print(f"records={count}")
+    print(f"per-record emit: {per_record_ms:8.1f} ms")
+    print(f"batched emit:    {batched_ms:8.1f} ms (target < {TARGET_MS:.0f} ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
@@ -0,0 +1,96 @@
+"""Per-record cost of the audit encoder: generic dict + json.dumps vs the fixed-schema encoder.
+
+orjson (when installed) is timed for reference only: it cannot reproduce json.dumps'
+separators and ensure_ascii escaping, so it is not used by `_encode`.
+
+    uv run python -m benchmarks.audit_encode [count]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Any, Callable
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.models import ReservationStatus  # noqa: E402
+from app.utils import audit_log  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment, unused-ignore]
+
+TIMESTAMP = "2024-01-01T00:00:00.000000+00:00"
+REQUEST_ID = "0123456789abcdef0123456789abcdef"
+
+
+def _records(count: int) -> list[audit_log.AuditRecord]:
+    return [
+        audit_log.AuditRecord(
+            action="reservation.rescheduled",
+            initiator="user",
+            reservation_id=i,
+            slot_id=i // 4,
+            shop_id=1,
+            user_id=10_000 + i,
+            party_size=2,
+            status_from=ReservationStatus.BOOKED,
+            status_to=ReservationStatus.BOOKED,
+            version=3,
+            extra={"slot_id_from": i // 4 - 1},
+        )
+        for i in range(count)
+    ]
+
+
+def _orjson_encode(record: audit_log.AuditRecord, *, timestamp: str, request_id: str) -> Any:
+    payload = {
+        "timestamp": timestamp,
+        "level": "info",
+        "action": record.action,
+        "initiator": record.initiator,
+        "request_id": request_id,
+        "reservation_id": record.reservation_id,
+        "slot_id": record.slot_id,
+        "shop_id": record.shop_id,
+        "user_id": record.user_id,
+        "party_size": record.party_size,
+        "status_from": record.status_from,
+        "status_to": record.status_to,
+        "version": record.version,
+        **(record.extra or {}),
+    }
+    return orjson.dumps({k: v for k, v in payload.items() if v is not None})
+
+
+def _time(encode: Callable[..., Any], records: list[audit_log.AuditRecord]) -> float:
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for record in records:
+            encode(record, timestamp=TIMESTAMP, request_id=REQUEST_ID)
+        best = min(best, time.perf_counter() - started)
+    return best / len(records) * 1e9
+
+
+def main(count: int) -> None:
+    records = _records(count)
+    mismatches = sum(
+        audit_log._encode(r, timestamp=TIMESTAMP, request_id=REQUEST_ID)
+        != audit_log._encode_generic(r, timestamp=TIMESTAMP, request_id=REQUEST_ID)
+        for r in records
+    )
+    generic = _time(audit_log._encode_generic, records)
+    fast = _time(audit_log._encode, records)
+    print(f"records={count} byte-identical={'yes' if mismatches == 0 else f'NO ({mismatches} mismatches)'}")
+    print(f"generic (dict + json.dumps): {generic:7.0f} ns/record")
+    print(f"fixed-schema encoder:        {fast:7.0f} ns/record ({generic / fast:.1f}x)")
+    if orjson is not None:
+        print(f"orjson (not identical, ref): {_time(_orjson_encode, records):7.0f} ns/record")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
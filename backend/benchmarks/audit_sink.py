@@ -0,0 +1,113 @@
+"""Inline audit writes vs the asyncio AuditSink under concurrent requests.
+
+Each simulated request awaits one audit record, like a booking inside its transaction.
+Reports throughput, per-emit p50/p99 latency and p99 event-loop lag (how long other
+requests are starved while a write blocks the loop), with and without fsync.
+
+    uv run python -m benchmarks.audit_sink [requests] [concurrency]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.models import ReservationStatus  # noqa: E402
+from app.utils import audit_log  # noqa: E402
+from app.utils.audit_sink import AuditSink, FileAuditWriter  # noqa: E402
+
+
+def _record(i: int) -> audit_log.AuditRecord:
+    return audit_log.AuditRecord(
+        action="reservation.created",
+        initiator="user",
+        reservation_id=i,
+        slot_id=i // 4,
+        shop_id=1,
+        user_id=10_000 + i,
+        party_size=2,
+        status_from=None,
+        status_to=ReservationStatus.BOOKED,
+        version=1,
+    )
+
+
+def _p(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def _loop_lag(samples: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        samples.append((time.perf_counter() - started - 0.001) * 1000)
+
+
+async def _run(requests: int, concurrency: int) -> tuple[float, list[float], list[float]]:
+    latencies: list[float] = []
+    lag: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+
+    async def one(i: int) -> None:
+        async with gate:
+            started = time.perf_counter()
+            await audit_log.emit_audit_logs([_record(i)])
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    ticker = asyncio.create_task(_loop_lag(lag, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    return requests / elapsed, latencies, lag or [0.0]
+
+
+async def _scenario(label: str, *, fsync: bool, use_sink: bool, requests: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = FileAuditWriter(os.path.join(tmp, "audit.log"), fsync=fsync)
+        original = audit_log.write_to_logger
+        sink = AuditSink(writer) if use_sink else None
+        if sink is not None:
+            sink.start()
+            audit_log.set_audit_sink(sink)
+        else:
+            # Old behaviour: the write runs on the event loop inside the request.
+            audit_log.write_to_logger = writer
+        try:
+            throughput, latencies, lag = await _run(requests, concurrency)
+        finally:
+            audit_log.set_audit_sink(None)
+            audit_log.write_to_logger = original
+            if sink is not None:
+                await sink.close()
+            writer.close()
+    batches = f" batches={sink.batches}" if sink is not None else ""
+    print(
+        f"{label:<16} {throughput:10.0f} rec/s  p50={_p(latencies, 50):7.2f} ms"
+        f"  p99={_p(latencies, 99):7.2f} ms  loop-lag p99={_p(lag, 99):7.2f} ms{batches}"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    print(f"requests={requests} concurrency={concurrency}")
+    for fsync in (False, True):
+        suffix = "+fsync" if fsync else ""
+        await _scenario(f"inline{suffix}", fsync=fsync, use_sink=False, requests=requests, concurrency=concurrency)
+        await _scenario(f"sink{suffix}", fsync=fsync, use_sink=True, requests=requests, concurrency=concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+        )
+    )
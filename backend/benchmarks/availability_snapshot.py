@@ -0,0 +1,81 @@
+"""Read and write cost of the shared-memory availability snapshot.
+
+Loads one shop region with N slots (15-minute slots over the following days) and
+reports the latency of a one-day availability query, of an in-place delta, and of
+a full reload, as a worker sees them.
+
+    uv run python -m benchmarks.availability_snapshot [slots] [queries]
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.domain.services import AvailabilityDelta  # noqa: E402
+from app.models import SlotStatus  # noqa: E402
+from app.utils.availability_snapshot import AvailabilitySnapshot  # noqa: E402
+
+START = datetime(2030, 1, 1)
+
+
+def _delta(i: int, *, remaining: int = 4) -> AvailabilityDelta:
+    starts_at = START + timedelta(minutes=15 * i)
+    return AvailabilityDelta(
+        slot_id=i + 1,
+        shop_id=1,
+        seat_id=None,
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(minutes=15),
+        capacity=4,
+        remaining=remaining,
+        status=SlotStatus.OPEN,
+    )
+
+
+def _p(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+def main(slots: int, queries: int) -> None:
+    deltas = [_delta(i) for i in range(slots)]
+    covered_to = START + timedelta(minutes=15 * slots)
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = AvailabilitySnapshot(os.path.join(directory, "snapshot"), [1], slots_per_shop=slots)
+        snapshot.open()
+        started = time.perf_counter()
+        snapshot.load(1, deltas, seq=1, covered_from=START, covered_to=covered_to)
+        load = time.perf_counter() - started
+
+        reads: list[float] = []
+        rows = 0
+        for i in range(queries):
+            day = START + timedelta(days=i % max(slots // 96 - 1, 1))
+            started = time.perf_counter()
+            result = snapshot.query(1, start=day, end=day + timedelta(days=1), seat_id=None)
+            reads.append((time.perf_counter() - started) * 1e6)
+            rows = len(result or [])
+
+        writes: list[float] = []
+        for i in range(queries):
+            delta = _delta(i % slots, remaining=i % 5)
+            started = time.perf_counter()
+            snapshot.apply([delta], seq=i + 2)
+            writes.append((time.perf_counter() - started) * 1e6)
+        snapshot.close()
+    print(f"slots={slots} load={load * 1000:.1f} ms  rows/query={rows}")
+    print(f"query  p50={_p(reads, 50):7.1f} us  p99={_p(reads, 99):7.1f} us")
+    print(f"delta  p50={_p(writes, 50):7.1f} us  p99={_p(writes, 99):7.1f} us")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 4_096,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5_000,
+    )
@@ -0,0 +1,84 @@
+"""Fan-out cost of the availability stream hub with many idle subscribers.
+
+Opens N subscriber streams on one shop (each parked on its wakeup, as an idle SSE
+connection is), then publishes deltas and reports memory per subscriber, publish
+time per event, and end-to-end time until every subscriber has received it.
+
+    uv run python -m benchmarks.availability_stream [subscribers] [events]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.domain.services import AvailabilityDelta  # noqa: E402
+from app.models import SlotStatus  # noqa: E402
+from app.utils.availability_stream import AvailabilityHub  # noqa: E402
+
+START = datetime(2030, 1, 1)
+
+
+def _delta(i: int) -> AvailabilityDelta:
+    return AvailabilityDelta(
+        slot_id=i,
+        shop_id=1,
+        seat_id=None,
+        starts_at=START + timedelta(minutes=i % 600),
+        ends_at=START + timedelta(minutes=i % 600 + 60),
+        capacity=4,
+        remaining=i % 5,
+        status=SlotStatus.OPEN,
+    )
+
+
+async def main(subscribers: int, events: int) -> None:
+    hub = AvailabilityHub(max_pending=events + 1)
+    received = 0
+    done = asyncio.Event()
+
+    async def client() -> None:
+        nonlocal received
+        subscription = hub.subscribe(1, start=START, end=START + timedelta(days=1))
+        async for chunk in hub.stream(subscription, first=b""):
+            received += chunk.count(b"event: availability")
+            if received == subscribers * events:
+                done.set()
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(client()) for _ in range(subscribers)]
+    await asyncio.sleep(0.1)
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - base) / subscribers
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for i in range(events):
+        hub.publish([_delta(i)], seq=i + 1)
+    published = time.perf_counter() - started
+    await asyncio.wait_for(done.wait(), timeout=60)
+    delivered = time.perf_counter() - started
+
+    hub.close()
+    await asyncio.gather(*tasks)
+    print(f"subscribers={subscribers} events={events} idle memory/subscriber={per_subscriber / 1024:.1f} KiB")
+    per_event = published / events
+    print(
+        f"publish {per_event * 1e6:8.1f} us/event ({per_event / subscribers * 1e9:.0f} ns/subscriber)"
+        f"  all delivered after {delivered * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+        )
+    )
@@ -0,0 +1,93 @@
+"""Delivery latency of the invalidation bus between worker processes.
+
+Starts N receiver processes, each running an InvalidationBus on its own event loop
+like a uvicorn worker, and publishes messages from this process. The key of every
+message is the send time (CLOCK_MONOTONIC is shared by all processes on the host),
+so each receiver measures publish-to-handler latency directly.
+
+    uv run python -m benchmarks.invalidation_bus [workers] [messages]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing.synchronize import Event as EventType
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.utils.invalidation_bus import InvalidationBus  # noqa: E402
+
+
+def _receiver(directory: str, messages: int, ready: EventType, results: "multiprocessing.Queue[list[float]]") -> None:
+    async def run() -> None:
+        latencies: list[float] = []
+        done = asyncio.Event()
+
+        def handle(kind: str, key: int) -> None:
+            latencies.append((time.monotonic_ns() - key) / 1000)
+            if len(latencies) == messages:
+                done.set()
+
+        bus = InvalidationBus(directory)
+        bus.subscribe(handle)
+        bus.start()
+        ready.set()
+        try:
+            await asyncio.wait_for(done.wait(), timeout=30)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            bus.close()
+        results.put(latencies)
+
+    asyncio.run(run())
+
+
+def _p(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def main(workers: int, messages: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        results: "multiprocessing.Queue[list[float]]" = multiprocessing.Queue()
+        readies = [multiprocessing.Event() for _ in range(workers)]
+        procs = [
+            multiprocessing.Process(target=_receiver, args=(directory, messages, ready, results)) for ready in readies
+        ]
+        for proc in procs:
+            proc.start()
+        for ready in readies:
+            ready.wait()
+        bus = InvalidationBus(directory)
+        bus.start()
+        started = time.perf_counter()
+        for _ in range(messages):
+            bus.publish([("slot", time.monotonic_ns())])
+            # Pace like real writes so receivers are measured idle, not backlogged.
+            await asyncio.sleep(0.0005)
+        elapsed = time.perf_counter() - started
+        latencies = [value for _ in procs for value in results.get()]
+        for proc in procs:
+            proc.join()
+        bus.close()
+    lost = workers * messages - len(latencies)
+    print(f"workers={workers} messages={messages} publish={elapsed / messages * 1e6:.1f} us/message (incl. pacing)")
+    print(
+        f"latency p50={_p(latencies, 50):7.1f} us  p99={_p(latencies, 99):7.1f} us"
+        f"  max={max(latencies):7.1f} us  lost={lost} (dropped={bus.dropped})"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 2_000,
+        )
+    )
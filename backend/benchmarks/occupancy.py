@@ -0,0 +1,82 @@
+"""Occupancy dashboard grid over synthetic columns, vectorized sweep vs. a per-row loop.
+
+Generates a shop with `seats` seats and back-to-back 1-hour slots over `days`
+days, plus `reservations` random reservations, then times `occupancy_grid` on
+the full columns. The loop baseline accumulates the same matrix row by row on a
+10% sample and is scaled up, since it is too slow to run on everything.
+
+    uv run python -m benchmarks.occupancy [reservations] [seats] [days]
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("AUTH_SECRET", "benchmark")
+
+from app.domain.services import OccupancyColumns  # noqa: E402
+from app.utils.occupancy import occupancy_grid  # noqa: E402
+
+HOUR = 3600
+START = 1_893_456_000
+BUCKET = HOUR
+
+
+def _columns(reservations: int, seats: int, days: int) -> OccupancyColumns:
+    rng = random.Random(7)
+    hours = days * 24
+    slot_seat = [seat for seat in range(seats) for _ in range(hours)]
+    slot_start = [START + hour * HOUR for _ in range(seats) for hour in range(hours)]
+    res_seat = [rng.randrange(seats) for _ in range(reservations)]
+    res_start = [START + rng.randrange(hours * 4) * 900 for _ in range(reservations)]
+    res_end = [start + rng.choice((1800, 3600, 5400)) for start in res_start]
+    return OccupancyColumns(
+        slot_seat=slot_seat,
+        slot_start=slot_start,
+        slot_end=[start + HOUR for start in slot_start],
+        slot_capacity=[8] * len(slot_seat),
+        res_seat=res_seat,
+        res_start=res_start,
+        res_end=res_end,
+        res_party=[rng.randint(1, 4) for _ in range(reservations)],
+    )
+
+
+def _loop(columns: OccupancyColumns, *, start: int, end: int, sample: int) -> None:
+    buckets = (end - start) // BUCKET
+    used: dict[int, list[float]] = {}
+    for i in range(sample):
+        row = used.setdefault(columns.res_seat[i], [0.0] * buckets)
+        lo, hi = max(columns.res_start[i], start), min(columns.res_end[i], end)
+        for bucket in range((lo - start) // BUCKET, min((hi - start - 1) // BUCKET + 1, buckets)):
+            edge = start + bucket * BUCKET
+            row[bucket] += columns.res_party[i] * (min(hi, edge + BUCKET) - max(lo, edge))
+
+
+def main(reservations: int, seats: int, days: int) -> None:
+    columns = _columns(reservations, seats, days)
+    end = START + days * 24 * HOUR
+
+    started = time.perf_counter()
+    grid = occupancy_grid(columns, start=START, end=end, bucket_seconds=BUCKET)
+    vectorized = time.perf_counter() - started
+
+    sample = max(1, reservations // 10)
+    started = time.perf_counter()
+    _loop(columns, start=START, end=end, sample=sample)
+    loop = (time.perf_counter() - started) * reservations / sample
+
+    print(f"reservations={reservations} seats={seats} buckets={len(grid.bucket_starts)}")
+    print(f"vectorized={vectorized * 1000:8.1f} ms  loop (used only, extrapolated)={loop * 1000:8.1f} ms")
+    print(f"mean seat utilization={sum(v or 0 for v in grid.seat_utilization) / seats:.1f}%")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 92,
+    )
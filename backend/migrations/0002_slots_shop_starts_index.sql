@@ -0,0 +1,8 @@
+-- Migration: composite index for range operations on a shop's slots
+-- Used by bulk slot status updates (UPDATE ... WHERE shop_id = ? AND starts_at >= ? ...)
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'slots' AND index_name = 'idx_slots_shop_starts'),
+    'CREATE INDEX idx_slots_shop_starts ON slots(shop_id, starts_at)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
@@ -0,0 +1,8 @@
+-- Migration: index for the request_pending auto-cancel sweeper
+-- WHERE status = 'request_pending' AND created_at < ? ORDER BY created_at LIMIT ? FOR UPDATE SKIP LOCKED
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'reservations' AND index_name = 'idx_res_status_created'),
+    'CREATE INDEX idx_res_status_created ON reservations(status, created_at)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
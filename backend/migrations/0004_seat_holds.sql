@@ -0,0 +1,23 @@
+-- Migration: temporary seat holds with TTL
+-- slots.held / slots.held_until are a denormalized summary of live holds so that
+-- availability reads do not need to join holds.
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'slots' AND column_name = 'held'),
+    'ALTER TABLE slots ADD COLUMN held INT NOT NULL DEFAULT 0 AFTER status, ADD COLUMN held_until DATETIME NULL AFTER held',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+CREATE TABLE IF NOT EXISTS holds (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  slot_id BIGINT NOT NULL,
+  user_id BIGINT NOT NULL,
+  party_size INT NOT NULL,
+  expires_at DATETIME NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT chk_holds_party_size CHECK (party_size >= 1),
+  CONSTRAINT fk_holds_slot FOREIGN KEY (slot_id) REFERENCES slots(id),
+  CONSTRAINT fk_holds_user FOREIGN KEY (user_id) REFERENCES users(id),
+  INDEX idx_holds_slot_expires (slot_id, expires_at),
+  INDEX idx_holds_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
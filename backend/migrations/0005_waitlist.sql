@@ -0,0 +1,17 @@
+-- Migration: per-slot waitlist
+-- idx_waitlist_slot_party_created lets promotion pick the earliest entry that fits
+-- the freed capacity with one seek per distinct party_size.
+
+CREATE TABLE IF NOT EXISTS waitlist_entries (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  slot_id BIGINT NOT NULL,
+  user_id BIGINT NOT NULL,
+  party_size INT NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT chk_waitlist_party_size CHECK (party_size >= 1),
+  CONSTRAINT uq_waitlist_slot_user UNIQUE (slot_id, user_id),
+  CONSTRAINT fk_waitlist_slot FOREIGN KEY (slot_id) REFERENCES slots(id),
+  CONSTRAINT fk_waitlist_user FOREIGN KEY (user_id) REFERENCES users(id),
+  INDEX idx_waitlist_slot_created (slot_id, created_at),
+  INDEX idx_waitlist_slot_party_created (slot_id, party_size, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
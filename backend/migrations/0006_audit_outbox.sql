@@ -0,0 +1,11 @@
+-- Migration: transactional outbox for audit events
+-- Rows are inserted in the same transaction as the reservation change and shipped
+-- to the audit sink by the relay, which sets shipped_at.
+
+CREATE TABLE IF NOT EXISTS audit_outbox (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  payload TEXT NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  shipped_at DATETIME NULL,
+  INDEX idx_outbox_shipped_id (shipped_at, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,21 @@
+-- Migration: per-shop change feed
+-- shop_change_seq.last_seq is bumped (and row-locked until commit) by every writer of a
+-- shop, so change_log.seq follows commit order within the shop.
+
+CREATE TABLE IF NOT EXISTS shop_change_seq (
+  shop_id BIGINT NOT NULL PRIMARY KEY,
+  last_seq BIGINT NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS change_log (
+  shop_id BIGINT NOT NULL,
+  seq BIGINT NOT NULL,
+  entity VARCHAR(16) NOT NULL,
+  entity_id BIGINT NOT NULL,
+  slot_id BIGINT NOT NULL,
+  action VARCHAR(32) NOT NULL,
+  status VARCHAR(32) NOT NULL,
+  version INT NULL,
+  created_at DATETIME NOT NULL,
+  PRIMARY KEY (shop_id, seq)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,10 @@
+-- Migration: per-shop booking policy
+-- One optional row per shop; shops without a row use the application defaults.
+
+CREATE TABLE IF NOT EXISTS shop_policies (
+  shop_id BIGINT NOT NULL PRIMARY KEY,
+  default_dwell_minutes INT NOT NULL DEFAULT 60,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  CONSTRAINT chk_policy_dwell CHECK (default_dwell_minutes >= 1),
+  CONSTRAINT fk_policy_shop FOREIGN KEY (shop_id) REFERENCES shops(id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
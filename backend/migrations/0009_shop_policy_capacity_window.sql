@@ -0,0 +1,21 @@
+-- Migration: time-window capacity mode per shop
+-- capacity_mode = 'window' additionally caps the guests present at any instant at window_capacity,
+-- summed over every reservation whose slot overlaps (slots may overlap across seats).
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND column_name = 'capacity_mode'),
+    'ALTER TABLE shop_policies ADD COLUMN capacity_mode VARCHAR(6) NOT NULL DEFAULT ''slot''',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND column_name = 'window_capacity'),
+    'ALTER TABLE shop_policies ADD COLUMN window_capacity INT NULL',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.table_constraints WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND constraint_name = 'chk_policy_window_capacity'),
+    'ALTER TABLE shop_policies ADD CONSTRAINT chk_policy_window_capacity CHECK (capacity_mode = ''slot'' OR window_capacity >= 1)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
@@ -0,0 +1,9 @@
+-- Migration: per-shop rejection of a user's overlapping reservations
+-- Checked on create/reschedule with one idx_slots_shop_starts range probed by (active_slot_id, user_id)
+-- on uq_res_active_user_slot (migration 0011; uq_res_user_slot before it).
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND column_name = 'reject_user_overlap'),
+    'ALTER TABLE shop_policies ADD COLUMN reject_user_overlap TINYINT(1) NOT NULL DEFAULT 0',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
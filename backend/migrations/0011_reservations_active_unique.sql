@@ -0,0 +1,29 @@
+-- Migration: one active reservation per (user, slot) instead of one reservation ever
+-- active_slot_id is slot_id while the reservation is active and NULL once cancelled; unique
+-- indexes ignore NULLs, so a user can book a slot again after cancelling.
+-- uq_res_active_user_slot also answers user_has_active from the index alone, and
+-- idx_res_active_slot_party does the same for sum_reserved (SUM(party_size) per slot).
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'reservations' AND column_name = 'active_slot_id'),
+    'ALTER TABLE reservations ADD COLUMN active_slot_id BIGINT GENERATED ALWAYS AS (IF(status = ''cancelled'', NULL, slot_id)) VIRTUAL',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'reservations' AND index_name = 'uq_res_active_user_slot'),
+    'CREATE UNIQUE INDEX uq_res_active_user_slot ON reservations(active_slot_id, user_id)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'reservations' AND index_name = 'idx_res_active_slot_party'),
+    'CREATE INDEX idx_res_active_slot_party ON reservations(active_slot_id, party_size)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    EXISTS(SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'reservations' AND index_name = 'uq_res_user_slot'),
+    'ALTER TABLE reservations DROP INDEX uq_res_user_slot',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
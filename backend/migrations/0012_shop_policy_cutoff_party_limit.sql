@@ -0,0 +1,26 @@
+-- Migration: per-shop cancellation/reschedule cutoff and party size limit
+-- cutoff_days replaces the fixed 2-day cutoff; NULL max_party_size means no limit beyond slot capacity.
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND column_name = 'cutoff_days'),
+    'ALTER TABLE shop_policies ADD COLUMN cutoff_days INT NOT NULL DEFAULT 2',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND column_name = 'max_party_size'),
+    'ALTER TABLE shop_policies ADD COLUMN max_party_size INT NULL',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.table_constraints WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND constraint_name = 'chk_policy_cutoff'),
+    'ALTER TABLE shop_policies ADD CONSTRAINT chk_policy_cutoff CHECK (cutoff_days >= 0)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.table_constraints WHERE table_schema = DATABASE() AND table_name = 'shop_policies' AND constraint_name = 'chk_policy_max_party'),
+    'ALTER TABLE shop_policies ADD CONSTRAINT chk_policy_max_party CHECK (max_party_size IS NULL OR max_party_size >= 1)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
@@ -0,0 +1,17 @@
+-- Migration: index path for the shop-side reservation listing
+-- slots(shop_id, starts_at) gives a page of the day's slots in order; reservations(slot_id, status)
+-- then reads only those slots' reservations of the requested statuses, so a page costs the same
+-- wherever it is in the day.
+-- idx_res_slot is a prefix of the new index (which also serves the slot_id foreign key), so it is dropped.
+
+SET @stmt = (SELECT IF(
+    NOT EXISTS(SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'reservations' AND index_name = 'idx_res_slot_status'),
+    'CREATE INDEX idx_res_slot_status ON reservations(slot_id, status)',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
+
+SET @stmt = (SELECT IF(
+    EXISTS(SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'reservations' AND index_name = 'idx_res_slot'),
+    'ALTER TABLE reservations DROP INDEX idx_res_slot',
+    'SELECT 1'));
+PREPARE s1 FROM @stmt; EXECUTE s1; DEALLOCATE PREPARE s1;
@@ -1,6 +1,16 @@
+from datetime import datetime, timedelta
+
 import pytest
-from app.domain.errors import CapacityError, DuplicateReservationError, SlotNotOpenError
-from app.domain.services import SlotSnapshot, validate_reservation
+from app.domain.errors import CapacityError, DuplicateReservationError, OverlappingReservationError, SlotNotOpenError
+from app.domain.services import (
+    AvailabilityDelta,
+    DwellOption,
+    SlotSnapshot,
+    live_held,
+    merge_dwell_options,
+    peak_concurrent,
+    validate_reservation,
+)
 from app.models import SlotStatus
 
 
@@ -26,6 +36,18 @@ def test_rejects_duplicate_reservation() -> None:
         validate_reservation(snap, party_size=2)
 
 
+def test_rejects_overlapping_reservation_of_the_user() -> None:
+    snap = SlotSnapshot(
+        status=SlotStatus.OPEN,
+        capacity=4,
+        reserved=0,
+        user_has_active_reservation=False,
+        user_has_overlapping_reservation=True,
+    )
+    with pytest.raises(OverlappingReservationError):
+        validate_reservation(snap, party_size=2)
+
+
 def test_rejects_when_party_exceeds_remaining() -> None:
     snap = SlotSnapshot(
         status=SlotStatus.OPEN,
@@ -52,3 +74,145 @@ def test_accepts_idempotent_cancel_path_is_handled_by_usecase_logic() -> None:
     # This test is a placeholder reminder: idempotent cancel is handled in usecase,
     # not in validate_reservation. Kept here to ensure we cover future additions.
     assert True
+
+
+def test_rejects_when_holds_take_remaining_capacity() -> None:
+    snap = SlotSnapshot(
+        status=SlotStatus.OPEN,
+        capacity=4,
+        reserved=1,
+        user_has_active_reservation=False,
+        held=2,
+    )
+    with pytest.raises(CapacityError):
+        validate_reservation(snap, party_size=2)
+
+
+def test_rejects_when_time_window_peak_leaves_no_room() -> None:
+    snap = SlotSnapshot(
+        status=SlotStatus.OPEN,
+        capacity=4,
+        reserved=0,
+        user_has_active_reservation=False,
+        window_capacity=10,
+        window_peak=9,
+    )
+    with pytest.raises(CapacityError):
+        validate_reservation(snap, party_size=2)
+    assert validate_reservation(snap, party_size=1) == 3
+
+
+def test_rejects_party_above_the_shop_limit() -> None:
+    snap = SlotSnapshot(
+        status=SlotStatus.OPEN,
+        capacity=10,
+        reserved=0,
+        user_has_active_reservation=False,
+        max_party_size=4,
+    )
+    with pytest.raises(CapacityError):
+        validate_reservation(snap, party_size=5)
+    assert validate_reservation(snap, party_size=4) == 6
+
+
+def test_peak_concurrent_sweeps_overlaps_within_the_window() -> None:
+    t0 = datetime(2030, 1, 1, 18, 0)
+    hour = timedelta(hours=1)
+    intervals = [
+        (t0, t0 + 2 * hour, 3),
+        (t0 + hour, t0 + 3 * hour, 4),
+        # Back-to-back with the first: never present at the same time.
+        (t0 + 2 * hour, t0 + 4 * hour, 2),
+        # Outside the window.
+        (t0 - 2 * hour, t0, 8),
+    ]
+    assert peak_concurrent(intervals, start=t0, end=t0 + 4 * hour) == 7
+    assert peak_concurrent(intervals, start=t0 + 2 * hour, end=t0 + 4 * hour) == 6
+    assert peak_concurrent([], start=t0, end=t0 + hour) == 0
+
+
+def test_live_held_ignores_fully_expired_holds() -> None:
+    now = datetime(2030, 1, 1, 12, 0)
+    assert live_held(3, now + timedelta(minutes=1), now=now) == 3
+    assert live_held(3, now, now=now) == 0
+    assert live_held(3, None, now=now) == 0
+    assert live_held(None, now + timedelta(minutes=1), now=now) == 0
+
+
+T0 = datetime(2030, 1, 1, 10, 0)
+
+
+def _slot(
+    slot_id: int,
+    seat_id: int | None,
+    start_min: int,
+    end_min: int,
+    *,
+    remaining: int = 4,
+    status: SlotStatus = SlotStatus.OPEN,
+) -> AvailabilityDelta:
+    return AvailabilityDelta(
+        slot_id=slot_id,
+        shop_id=1,
+        seat_id=seat_id,
+        starts_at=T0 + timedelta(minutes=start_min),
+        ends_at=T0 + timedelta(minutes=end_min),
+        capacity=4,
+        remaining=remaining,
+        status=status,
+    )
+
+
+def _merge(
+    slots: list[AvailabilityDelta], *, start_min: int = 30, minutes: int = 90, party_size: int = 2
+) -> list[DwellOption]:
+    return merge_dwell_options(
+        slots,
+        starts_at=T0 + timedelta(minutes=start_min),
+        ends_at=T0 + timedelta(minutes=start_min + minutes),
+        party_size=party_size,
+    )
+
+
+def test_dwell_merges_back_to_back_slots_per_seat() -> None:
+    options = _merge(
+        [
+            _slot(1, 1, 0, 60, remaining=3),
+            _slot(2, 1, 60, 120, remaining=2),
+            _slot(3, 2, 0, 180),
+            _slot(4, None, 0, 60),
+            _slot(5, None, 90, 150),
+        ]
+    )
+
+    assert [(o.seat_id, o.slot_ids, o.remaining) for o in options] == [(1, (1, 2), 2), (2, (3,), 4)]
+    assert options[0].starts_at == T0 + timedelta(minutes=30)
+    assert options[0].ends_at == T0 + timedelta(minutes=120)
+
+
+def test_dwell_breaks_runs_on_full_or_closed_slots() -> None:
+    options = _merge(
+        [
+            _slot(1, 1, 0, 60),
+            _slot(2, 1, 60, 120, remaining=1),
+            _slot(3, 2, 0, 60),
+            _slot(4, 2, 60, 120, status=SlotStatus.CLOSED),
+            _slot(5, 3, 0, 60),
+            _slot(6, 3, 60, 120),
+        ],
+        party_size=2,
+    )
+
+    assert [o.slot_ids for o in options] == [(5, 6)]
+
+
+def test_dwell_ignores_slots_before_the_stay_and_runs_starting_late() -> None:
+    options = _merge(
+        [
+            _slot(1, 1, -60, 0, remaining=0),
+            _slot(2, 1, 0, 120),
+            _slot(3, 2, 45, 180),
+        ]
+    )
+
+    assert [o.slot_ids for o in options] == [(2,)]
@@ -0,0 +1,44 @@
+from typing import cast
+
+import pytest
+from app.domain.errors import ActiveReservationConflictError
+from app.infrastructure.repositories import SqlAlchemyReservationRepository
+from app.models import Reservation, ReservationStatus
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class DriverError(Exception):
+    pass
+
+
+class FailingSession:
+    def __init__(self, *args: object) -> None:
+        self.error = IntegrityError("INSERT INTO reservations ...", {}, DriverError(*args))
+        self.added: list[object] = []
+
+    def add(self, instance: object) -> None:
+        self.added.append(instance)
+
+    async def flush(self) -> None:
+        raise self.error
+
+
+@pytest.mark.asyncio
+async def test_active_unique_collision_becomes_duplicate_reservation() -> None:
+    session = FailingSession(1062, "Duplicate entry '5-7' for key 'reservations.uq_res_active_user_slot'")
+    repo = SqlAlchemyReservationRepository(cast(AsyncSession, session))
+
+    with pytest.raises(ActiveReservationConflictError):
+        await repo.create(slot_id=5, user_id=7, party_size=2, status=ReservationStatus.BOOKED)
+    with pytest.raises(ActiveReservationConflictError):
+        await repo.reschedule(cast(Reservation, object()))
+
+
+@pytest.mark.asyncio
+async def test_other_integrity_errors_propagate() -> None:
+    session = FailingSession(1452, "Cannot add or update a child row: a foreign key constraint fails")
+    repo = SqlAlchemyReservationRepository(cast(AsyncSession, session))
+
+    with pytest.raises(IntegrityError):
+        await repo.create(slot_id=5, user_id=7, party_size=2, status=ReservationStatus.BOOKED)
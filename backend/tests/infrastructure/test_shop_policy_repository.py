@@ -0,0 +1,99 @@
+from collections import namedtuple
+from typing import Any, Callable, Iterator, cast
+
+import pytest
+from app.domain.services import BookingPolicy
+from app.infrastructure.repositories import SqlAlchemyShopPolicyRepository
+from app.models import CapacityMode
+from app.utils.invalidation_bus import InvalidationBus, publish_invalidations, set_invalidation_bus
+from app.utils.policy_cache import new_policy_cache, set_policy_cache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PolicyRow = namedtuple(
+    "PolicyRow", ["cutoff_days", "default_dwell_minutes", "max_party_size", "reject_user_overlap", "capacity_mode"]
+)
+
+
+class Rows:
+    def __init__(self, row: tuple[Any, ...] | None) -> None:
+        self.row = row
+
+    def first(self) -> tuple[Any, ...] | None:
+        return self.row
+
+
+class CountingSession:
+    def __init__(self, row: tuple[Any, ...] | None) -> None:
+        self.row = row
+        self.queries = 0
+        self.during_read: Callable[[], None] | None = None
+
+    async def execute(self, statement: object) -> Rows:
+        self.queries += 1
+        if self.during_read is not None:
+            self.during_read()
+        return Rows(self.row)
+
+
+@pytest.fixture
+def bus() -> Iterator[InvalidationBus]:
+    bus = InvalidationBus()
+    cache = new_policy_cache(ttl_seconds=60)
+    bus.subscribe(cache.handle)
+    bus.start()
+    set_invalidation_bus(bus)
+    set_policy_cache(cache)
+    yield bus
+    set_policy_cache(None)
+    set_invalidation_bus(None)
+
+
+@pytest.mark.asyncio
+async def test_booking_policy_is_served_from_cache_until_a_policy_invalidation(bus: InvalidationBus) -> None:
+    session = CountingSession(PolicyRow(1, 90, 6, True, CapacityMode.WINDOW))
+    repo = SqlAlchemyShopPolicyRepository(cast(AsyncSession, session))
+
+    first = await repo.get_booking_policy(1)
+    assert await repo.get_booking_policy(1) is first
+    assert first == BookingPolicy(
+        cutoff_days=1,
+        default_dwell_minutes=90,
+        max_party_size=6,
+        reject_user_overlap=True,
+        capacity_mode=CapacityMode.WINDOW,
+    )
+    assert session.queries == 1
+
+    # Bookings publish their shop; only a policy update drops the cached policy.
+    publish_invalidations(shops=[1])
+    await repo.get_booking_policy(1)
+    assert session.queries == 1
+
+    publish_invalidations(policies=[1])
+    await repo.get_booking_policy(1)
+    assert session.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_shop_without_policy_caches_the_defaults(bus: InvalidationBus) -> None:
+    session = CountingSession(None)
+    repo = SqlAlchemyShopPolicyRepository(cast(AsyncSession, session))
+
+    assert await repo.get_booking_policy(2) == BookingPolicy()
+    assert await repo.get_booking_policy(2) == BookingPolicy()
+    assert session.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_policy_read_racing_an_invalidation_is_not_cached(bus: InvalidationBus) -> None:
+    session = CountingSession(PolicyRow(2, 60, None, False, CapacityMode.SLOT))
+    repo = SqlAlchemyShopPolicyRepository(cast(AsyncSession, session))
+    # The update commits and its message arrives while this worker reads the old row.
+    session.during_read = lambda: publish_invalidations(policies=[1])
+
+    assert (await repo.get_booking_policy(1)).max_party_size is None
+
+    session.during_read = None
+    session.row = PolicyRow(2, 60, 4, False, CapacityMode.SLOT)
+    assert (await repo.get_booking_policy(1)).max_party_size == 4
+    assert session.queries == 2
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, cast
+
+import pytest
+from app.config import get_settings
+from app.domain.errors import CapacityError
+from app.models import SeatHold, Slot
+from app.routers import holds as router
+from app.schemas import HoldCreate
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class DummySession:
+    async def __aenter__(self) -> "DummySession":
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> bool:
+        return False
+
+    def begin(self) -> "DummySession":
+        return self
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AUTH_SECRET", "testsecret")
+    monkeypatch.setenv("HOLD_DEFAULT_TTL_MINUTES", "10")
+    monkeypatch.setenv("HOLD_MAX_TTL_MINUTES", "30")
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_create_hold_uses_default_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[dict[str, Any]] = []
+
+    async def fake_create_hold(*args: object, **kwargs: Any) -> tuple[SeatHold, Slot]:
+        calls.append(kwargs)
+        hold = SeatHold(
+            id=7,
+            slot_id=kwargs["slot_id"],
+            user_id=kwargs["user_id"],
+            party_size=kwargs["party_size"],
+            expires_at=kwargs["now"] + kwargs["ttl"],
+            created_at=kwargs["now"],
+        )
+        return hold, cast(Slot, None)
+
+    monkeypatch.setattr(router.hold_usecase, "create_hold", fake_create_hold)  # type: ignore[attr-defined]
+
+    result = await router.create_hold(
+        payload=HoldCreate(slot_id=1, party_size=2),
+        session=cast(AsyncSession, DummySession()),
+        user_id=5,
+    )
+    assert result.hold_id == 7
+    assert calls[0]["ttl"] == timedelta(minutes=10)
+    assert result.expires_at.utcoffset() == timedelta(hours=9)
+    assert result.expires_at > datetime.now(timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_create_hold_rejects_ttl_above_max() -> None:
+    with pytest.raises(HTTPException) as excinfo:
+        await router.create_hold(
+            payload=HoldCreate(slot_id=1, party_size=2, ttl_minutes=31),
+            session=cast(AsyncSession, DummySession()),
+            user_id=5,
+        )
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_create_hold_maps_capacity_error_to_409(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_create_hold(*args: object, **kwargs: object) -> tuple[SeatHold, Slot]:
+        raise CapacityError("capacity exceeded")
+
+    monkeypatch.setattr(router.hold_usecase, "create_hold", fake_create_hold)  # type: ignore[attr-defined]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await router.create_hold(
+            payload=HoldCreate(slot_id=1, party_size=2),
+            session=cast(AsyncSession, DummySession()),
+            user_id=5,
+        )
+    assert excinfo.value.status_code == 409
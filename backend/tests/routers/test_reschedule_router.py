@@ -37,6 +37,24 @@ class DummyReservationRepo:
         self.session = session
 
 
+class DummyChangeLogRepo:
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def append(self, events: object) -> dict[int, int]:
+        return {}
+
+
+class DummyOutboxRepo:
+    payloads: list[str] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def add_many(self, payloads: list[str]) -> None:
+        DummyOutboxRepo.payloads.extend(payloads)
+
+
 def _make_slot(slot_id: int) -> Slot:
     starts = _utc_now_naive() + timedelta(days=3)
     return Slot(
@@ -80,6 +98,7 @@ async def test_reschedule_router_returns_200_and_uses_if_match(monkeypatch: pyte
         user_id: int,
         new_slot_id: int,
         version: int,
+        policy_repo: object = None,
     ) -> Tuple[Reservation, Slot, int]:
         assert isinstance(slot_repo, DummySlotRepo)
         assert isinstance(res_repo, DummyReservationRepo)
@@ -94,6 +113,9 @@ async def test_reschedule_router_returns_200_and_uses_if_match(monkeypatch: pyte
     monkeypatch.setattr(router, "SqlAlchemySlotRepository", DummySlotRepo)
     monkeypatch.setattr(router, "SqlAlchemyReservationRepository", DummyReservationRepo)
     monkeypatch.setattr(cast(Any, router.reservation_usecase), "reschedule_reservation", fake_reschedule)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "SqlAlchemyAuditOutboxRepository", DummyOutboxRepo)
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyOutboxRepo.payloads = []
 
     payload = ReservationReschedule(slot_id=target_slot.id)
     result = await router.reschedule_reservation(
@@ -107,6 +129,8 @@ async def test_reschedule_router_returns_200_and_uses_if_match(monkeypatch: pyte
     assert result.slot_id == target_slot.id
     assert result.version == reservation.version
     assert result.reservation_id == reservation.id
+    assert len(DummyOutboxRepo.payloads) == 1
+    assert '"action": "reservation.rescheduled"' in DummyOutboxRepo.payloads[0]
 
 
 @pytest.mark.asyncio
@@ -1,10 +1,14 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, cast
+from typing import Any, Iterable, cast
 
 import pytest
+from app.domain.services import AvailabilityDelta, ChangeEvent
 from app.models import Reservation, ReservationStatus, Slot, SlotStatus
 from app.routers import reservations as router
 from app.schemas import ReservationCancel, ReservationCreate, ReservationRead, ReservationReschedule
+from app.usecases import slots as slot_usecase
+from app.utils.audit_log import AuditRecord
+from app.utils.availability_stream import AvailabilityHub, set_availability_hub
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,6 +24,17 @@ class DummySession:
         return self
 
 
+class DummyChangeLogRepo:
+    events: list[ChangeEvent] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def append(self, events: Iterable[ChangeEvent]) -> dict[int, int]:
+        DummyChangeLogRepo.events.extend(events)
+        return {event.shop_id: len(DummyChangeLogRepo.events) for event in DummyChangeLogRepo.events}
+
+
 def _slot(slot_id: int = 1) -> Slot:
     starts = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
     return Slot(
@@ -60,13 +75,15 @@ async def test_create_reservation_emits_audit(monkeypatch: pytest.MonkeyPatch) -
 
     calls: list[dict[str, Any]] = []
 
-    def fake_emit(**kwargs: Any) -> None:
+    async def fake_emit(**kwargs: Any) -> None:
         calls.append(kwargs)
 
     monkeypatch.setattr(router, "SqlAlchemySlotRepository", lambda s: s)
     monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
     monkeypatch.setattr(router.reservation_usecase, "create_reservation", fake_create_reservation)  # type: ignore[attr-defined]
     monkeypatch.setattr(router, "emit_audit_log", fake_emit)
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
 
     payload = ReservationCreate(slot_id=slot.id, party_size=2)
     result: ReservationRead = await router.create_reservation(
@@ -79,6 +96,9 @@ async def test_create_reservation_emits_audit(monkeypatch: pytest.MonkeyPatch) -
     assert len(calls) == 1
     assert calls[0]["action"] == "reservation.created"
     assert calls[0]["reservation_id"] == reservation.id
+    assert [(e.entity, e.entity_id, e.shop_id, e.action) for e in DummyChangeLogRepo.events] == [
+        ("reservation", reservation.id, slot.shop_id, "created")
+    ]
 
 
 @pytest.mark.asyncio
@@ -90,7 +110,7 @@ async def test_cancel_reservation_log_failure_returns_500(monkeypatch: pytest.Mo
     async def fake_cancel(*args: object, **kwargs: object) -> tuple[Reservation, Slot, ReservationStatus]:
         return reservation, slot, ReservationStatus.BOOKED
 
-    def fake_emit(**kwargs: Any) -> None:
+    async def fake_emit(**kwargs: Any) -> None:
         raise RuntimeError("fail log")
 
     monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
@@ -109,6 +129,53 @@ async def test_cancel_reservation_log_failure_returns_500(monkeypatch: pytest.Mo
     assert excinfo.value.status_code == 500
 
 
+@pytest.mark.asyncio
+async def test_cancel_reservation_promotes_waitlist_and_emits(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = DummySession()
+    slot = _slot()
+    reservation = _reservation(status=ReservationStatus.CANCELLED)
+    promoted = _reservation()
+    promoted.id = 101
+    promoted.user_id = 300
+
+    async def fake_cancel(*args: object, **kwargs: object) -> tuple[Reservation, Slot, ReservationStatus]:
+        return reservation, slot, ReservationStatus.BOOKED
+
+    async def fake_promote(*args: object, **kwargs: object) -> list[Reservation]:
+        assert kwargs["slot"] is slot
+        return [promoted]
+
+    single: list[dict[str, Any]] = []
+    batched: list[AuditRecord] = []
+
+    async def fake_emit(**kwargs: Any) -> None:
+        single.append(kwargs)
+
+    async def fake_emit_many(records: Iterable[AuditRecord], **kwargs: Any) -> None:
+        batched.extend(records)
+
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(router, "SqlAlchemyWaitlistRepository", lambda s: s)
+    monkeypatch.setattr(router.reservation_usecase, "cancel_reservation", fake_cancel)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router.waitlist_usecase, "promote_waitlist", fake_promote)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "emit_audit_log", fake_emit)
+    monkeypatch.setattr(router, "emit_audit_logs", fake_emit_many)
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
+
+    await router.cancel_reservation(
+        reservation_id=reservation.id,
+        payload=ReservationCancel(version=1),
+        if_match='"1"',
+        session=cast(AsyncSession, session),
+        user_id=reservation.user_id,
+    )
+
+    assert [c["action"] for c in single] == ["reservation.cancelled"]
+    assert [(r.action, r.initiator, r.user_id) for r in batched] == [("reservation.created", "system", 300)]
+    assert [(e.entity_id, e.action) for e in DummyChangeLogRepo.events] == [(100, "cancelled"), (101, "created")]
+
+
 @pytest.mark.asyncio
 async def test_reschedule_sets_previous_slot_and_emits(monkeypatch: pytest.MonkeyPatch) -> None:
     session = DummySession()
@@ -122,13 +189,15 @@ async def test_reschedule_sets_previous_slot_and_emits(monkeypatch: pytest.Monke
 
     calls: list[dict[str, Any]] = []
 
-    def fake_emit(**kwargs: Any) -> None:
+    async def fake_emit(**kwargs: Any) -> None:
         calls.append(kwargs)
 
     monkeypatch.setattr(router, "SqlAlchemySlotRepository", lambda s: s)
     monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
     monkeypatch.setattr(router.reservation_usecase, "reschedule_reservation", fake_reschedule)  # type: ignore[attr-defined]
     monkeypatch.setattr(router, "emit_audit_log", fake_emit)
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
 
     payload = ReservationReschedule(slot_id=to_slot.id, version=1)
     result = await router.reschedule_reservation(
@@ -143,3 +212,62 @@ async def test_reschedule_sets_previous_slot_and_emits(monkeypatch: pytest.Monke
     assert len(calls) == 1
     assert calls[0]["action"] == "reservation.rescheduled"
     assert calls[0]["extra"]["slot_id_from"] == from_slot.id
+    assert [(e.slot_id, e.action) for e in DummyChangeLogRepo.events] == [(to_slot.id, "rescheduled")]
+
+
+@pytest.mark.asyncio
+async def test_create_reservation_publishes_availability_after_commit(monkeypatch: pytest.MonkeyPatch) -> None:
+    slot = _slot()
+    reservation = _reservation()
+
+    async def fake_create_reservation(*args: object, **kwargs: object) -> tuple[Reservation, Slot]:
+        return reservation, slot
+
+    async def fake_emit(**kwargs: Any) -> None:
+        return None
+
+    async def fake_slot_availability(res_repo: object, changed: Slot) -> AvailabilityDelta:
+        return slot_usecase.availability_delta(changed, reserved=reservation.party_size)
+
+    hub = AvailabilityHub()
+    subscription = hub.subscribe(slot.shop_id, start=slot.starts_at, end=slot.ends_at)
+    monkeypatch.setattr(router, "SqlAlchemySlotRepository", lambda s: s)
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(router.reservation_usecase, "create_reservation", fake_create_reservation)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router.slot_usecase, "slot_availability", fake_slot_availability)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "emit_audit_log", fake_emit)
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
+    set_availability_hub(hub)
+    try:
+        await router.create_reservation(
+            payload=ReservationCreate(slot_id=slot.id, party_size=2),
+            session=cast(AsyncSession, DummySession()),
+            user_id=reservation.user_id,
+        )
+    finally:
+        set_availability_hub(None)
+
+    frames = list(subscription._frames)
+    assert len(frames) == 1
+    assert b"id: 1\n" in frames[0]
+    assert b'"remaining":2' in frames[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "payload",
+    [
+        ReservationCreate(party_size=2),
+        ReservationCreate(party_size=2, shop_id=10),
+        ReservationCreate(party_size=2, shop_id=10, starts_at=datetime(2030, 1, 1, 19, 0), hold_id=1),
+    ],
+)
+async def test_create_reservation_requires_slot_or_shop_and_time(payload: ReservationCreate) -> None:
+    with pytest.raises(HTTPException) as excinfo:
+        await router.create_reservation(
+            payload=payload,
+            session=cast(AsyncSession, DummySession()),
+            user_id=200,
+        )
+    assert excinfo.value.status_code == 400
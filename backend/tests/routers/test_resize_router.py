@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Tuple, cast
+
+import pytest
+from app.domain.errors import CapacityError
+from app.models import Reservation, ReservationStatus, Slot, SlotStatus
+from app.routers import reservations as router
+from app.schemas import ReservationResize
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _utc_now_naive() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DummySession:
+    """Minimal async session stub that supports `async with session.begin()`."""
+
+    async def __aenter__(self) -> "DummySession":
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> bool:
+        return False
+
+    def begin(self) -> "DummySession":
+        return self
+
+
+class DummyRepo:
+    def __init__(self, session: object) -> None:  # pragma: no cover - interface only
+        self.session = session
+
+
+class DummyChangeLogRepo:
+    actions: list[str] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def append(self, events: list[Any]) -> dict[int, int]:
+        DummyChangeLogRepo.actions.extend(event.action for event in events)
+        return {}
+
+
+class DummyOutboxRepo:
+    payloads: list[str] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def add_many(self, payloads: list[str]) -> None:
+        DummyOutboxRepo.payloads.extend(payloads)
+
+
+def _make_slot() -> Slot:
+    starts = _utc_now_naive() + timedelta(days=3)
+    return Slot(
+        id=1,
+        shop_id=1,
+        seat_id=None,
+        starts_at=starts,
+        ends_at=starts + timedelta(hours=1),
+        capacity=4,
+        status=SlotStatus.OPEN,
+        created_at=_utc_now_naive(),
+        updated_at=_utc_now_naive(),
+    )
+
+
+def _make_reservation(slot: Slot) -> Reservation:
+    return Reservation(
+        id=10,
+        slot_id=slot.id,
+        user_id=99,
+        party_size=2,
+        status=ReservationStatus.BOOKED,
+        version=1,
+        created_at=_utc_now_naive(),
+        updated_at=_utc_now_naive(),
+    )
+
+
+def _patch_repos(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", DummyRepo)
+    monkeypatch.setattr(router, "SqlAlchemyShopPolicyRepository", DummyRepo)
+    monkeypatch.setattr(router, "SqlAlchemyAuditOutboxRepository", DummyOutboxRepo)
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyOutboxRepo.payloads = []
+    DummyChangeLogRepo.actions = []
+
+
+@pytest.mark.asyncio
+async def test_resize_router_emits_resized_event_with_previous_size(monkeypatch: pytest.MonkeyPatch) -> None:
+    slot = _make_slot()
+    reservation = _make_reservation(slot)
+
+    async def fake_resize(
+        res_repo: DummyRepo,
+        *,
+        reservation_id: int,
+        user_id: int,
+        party_size: int,
+        version: int,
+        policy_repo: object = None,
+    ) -> Tuple[Reservation, Slot, int]:
+        assert (reservation_id, user_id, party_size, version) == (10, 99, 3, 5)
+        reservation.party_size = party_size
+        reservation.version = version + 1
+        return reservation, slot, 2
+
+    _patch_repos(monkeypatch)
+    monkeypatch.setattr(cast(Any, router.reservation_usecase), "resize_reservation", fake_resize)  # type: ignore[attr-defined]
+
+    result = await router.resize_reservation(
+        reservation_id=reservation.id,
+        payload=ReservationResize(party_size=3, version=1),
+        if_match='"5"',
+        session=cast(AsyncSession, DummySession()),
+        user_id=reservation.user_id,
+    )
+
+    assert (result.party_size, result.version) == (3, 6)
+    assert len(DummyOutboxRepo.payloads) == 1
+    assert '"action": "reservation.resized"' in DummyOutboxRepo.payloads[0]
+    assert '"party_size_from": 2' in DummyOutboxRepo.payloads[0]
+    assert DummyChangeLogRepo.actions == ["resized"]
+
+
+@pytest.mark.asyncio
+async def test_resize_router_maps_capacity_error_to_http_409(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_resize(*args: object, **kwargs: object) -> Tuple[Reservation, Slot, int]:
+        raise CapacityError("capacity exceeded")
+
+    _patch_repos(monkeypatch)
+    monkeypatch.setattr(cast(Any, router.reservation_usecase), "resize_reservation", fake_resize)  # type: ignore[attr-defined]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await router.resize_reservation(
+            reservation_id=10,
+            payload=ReservationResize(party_size=8),
+            if_match='"1"',
+            session=cast(AsyncSession, DummySession()),
+            user_id=99,
+        )
+
+    assert excinfo.value.status_code == 409
+    assert DummyOutboxRepo.payloads == []
@@ -0,0 +1,123 @@
+import json
+from typing import Any, Iterable, cast
+
+import pytest
+from app.domain.services import ChangeEvent, ReservationStatusChange
+from app.models import ReservationStatus
+from app.routers import shops as router
+from app.schemas import ShopReservationCancel
+from app.utils.audit_log import AuditRecord
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class DummySession:
+    async def __aenter__(self) -> "DummySession":
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> bool:
+        return False
+
+    def begin(self) -> "DummySession":
+        return self
+
+
+class DummyChangeLogRepo:
+    events: list[ChangeEvent] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def append(self, events: Iterable[ChangeEvent]) -> dict[int, int]:
+        DummyChangeLogRepo.events.extend(events)
+        return {event.shop_id: len(DummyChangeLogRepo.events) for event in DummyChangeLogRepo.events}
+
+
+def _change(reservation_id: int) -> ReservationStatusChange:
+    return ReservationStatusChange(
+        reservation_id=reservation_id,
+        slot_id=1,
+        shop_id=10,
+        user_id=200 + reservation_id,
+        party_size=2,
+        status_from=ReservationStatus.BOOKED,
+        status_to=ReservationStatus.CANCELLED,
+        version=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_shop_cancel_streams_rows_and_emits_one_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    changes = [_change(i) for i in range(1, 4)]
+
+    async def fake_cancel(*args: object, **kwargs: object) -> list[ReservationStatusChange]:
+        return changes
+
+    batches: list[list[AuditRecord]] = []
+
+    async def fake_emit(records: Any, **kwargs: Any) -> None:
+        batches.append(list(records))
+
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(router.reservation_usecase, "cancel_shop_reservations", fake_cancel)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "emit_audit_logs", fake_emit)
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    monkeypatch.setattr(router, "STREAM_CHUNK_SIZE", 2)
+    DummyChangeLogRepo.events = []
+
+    response = await router.cancel_shop_reservations(
+        shop_id=10,
+        payload=ShopReservationCancel(slot_id=1, message="holiday"),
+        session=cast(AsyncSession, DummySession()),
+    )
+
+    assert len(batches) == 1
+    assert [r.action for r in batches[0]] == ["reservation.shop_cancelled"] * 3
+    assert all(r.initiator == "shop" and r.message == "holiday" for r in batches[0])
+    assert response.headers["X-Cancelled-Count"] == "3"
+    assert [(e.entity_id, e.action) for e in DummyChangeLogRepo.events] == [(i, "shop_cancelled") for i in (1, 2, 3)]
+
+    chunks = [chunk async for chunk in response.body_iterator]
+    assert len(chunks) == 2
+    rows = [json.loads(line) for chunk in chunks for line in cast(bytes, chunk).splitlines()]
+    assert [row["reservation_id"] for row in rows] == [1, 2, 3]
+    assert rows[0]["status_to"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_shop_cancel_audit_failure_returns_500(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_cancel(*args: object, **kwargs: object) -> list[ReservationStatusChange]:
+        return [_change(1)]
+
+    async def fake_emit(records: Any, **kwargs: Any) -> None:
+        list(records)
+        raise RuntimeError("fail log")
+
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(router.reservation_usecase, "cancel_shop_reservations", fake_cancel)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "emit_audit_logs", fake_emit)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await router.cancel_shop_reservations(
+            shop_id=10,
+            payload=ShopReservationCancel(slot_id=1),
+            session=cast(AsyncSession, DummySession()),
+        )
+    assert excinfo.value.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_shop_cancel_maps_value_error_to_400(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_cancel(*args: object, **kwargs: object) -> list[ReservationStatusChange]:
+        raise ValueError("slot_id or start/end is required")
+
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(router.reservation_usecase, "cancel_shop_reservations", fake_cancel)  # type: ignore[attr-defined]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await router.cancel_shop_reservations(
+            shop_id=10,
+            payload=ShopReservationCancel(),
+            session=cast(AsyncSession, DummySession()),
+        )
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+import pytest
+from app.domain.services import ShopReservationRow
+from app.models import ReservationStatus
+from app.routers import shops as router
+from app.utils.time import JST
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class DummyRepo:
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+
+@pytest.mark.asyncio
+async def test_list_shop_reservations_converts_range_and_returns_compact_rows(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[dict[str, Any]] = []
+    row = ShopReservationRow(
+        reservation_id=7,
+        slot_id=3,
+        seat_id=None,
+        starts_at=datetime(2030, 1, 1, 1, 0),
+        ends_at=datetime(2030, 1, 1, 2, 0),
+        user_id=9,
+        party_size=2,
+        status=ReservationStatus.BOOKED,
+        version=1,
+    )
+
+    async def fake_list(res_repo: object, **kwargs: Any) -> tuple[list[ShopReservationRow], str | None, bool]:
+        calls.append(kwargs)
+        return [row], "20300101010000-3-7", True
+
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", DummyRepo)
+    monkeypatch.setattr(cast(Any, router.reservation_usecase), "list_shop_reservations", fake_list)  # type: ignore[attr-defined]
+
+    page = await router.list_shop_reservations(
+        shop_id=1,
+        start=datetime(2030, 1, 1, tzinfo=JST),
+        end=datetime(2030, 1, 2, tzinfo=JST),
+        status_filter=[ReservationStatus.BOOKED],
+        cursor=None,
+        limit=100,
+        session=cast(AsyncSession, object()),
+    )
+
+    assert calls[0]["start"] == datetime(2029, 12, 31, 15, 0)
+    assert calls[0]["end"] - calls[0]["start"] == timedelta(days=1)
+    assert page.model_dump(mode="json") == {
+        "reservations": [
+            {
+                "reservation_id": 7,
+                "slot_id": 3,
+                "seat_id": None,
+                "starts_at": "2030-01-01T10:00:00+09:00",
+                "ends_at": "2030-01-01T11:00:00+09:00",
+                "user_id": 9,
+                "party_size": 2,
+                "status": "booked",
+                "version": 1,
+            }
+        ],
+        "next_cursor": "20300101010000-3-7",
+        "has_more": True,
+    }
+
+
+@pytest.mark.asyncio
+async def test_list_shop_reservations_rejects_naive_range() -> None:
+    with pytest.raises(HTTPException) as excinfo:
+        await router.list_shop_reservations(
+            shop_id=1,
+            start=datetime(2030, 1, 1),
+            end=datetime(2030, 1, 2),
+            status_filter=[],
+            cursor=None,
+            limit=100,
+            session=cast(AsyncSession, object()),
+        )
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Sequence, cast
+
+import pytest
+from app.domain.services import AvailabilityDelta
+from app.models import Slot, SlotStatus
+from app.routers import slots as router
+from app.schemas import MultiShopAvailability
+from sqlalchemy.ext.asyncio import AsyncSession
+
+JST = timezone(timedelta(hours=9))
+START = datetime(2030, 1, 1, 9, 0)
+
+
+class DummySlotRepo:
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+
+class FakeSnapshot:
+    def query(self, shop_id: int, *, start: datetime, end: datetime, seat_id: int | None) -> Any:
+        if shop_id != 2:
+            return None
+        return [
+            AvailabilityDelta(
+                slot_id=20,
+                shop_id=2,
+                seat_id=None,
+                starts_at=START,
+                ends_at=START + timedelta(hours=1),
+                capacity=4,
+                remaining=1,
+                status=SlotStatus.OPEN,
+            )
+        ]
+
+
+def _slot(slot_id: int, shop_id: int) -> Slot:
+    return Slot(
+        id=slot_id,
+        shop_id=shop_id,
+        seat_id=None,
+        starts_at=START,
+        ends_at=START + timedelta(hours=1),
+        capacity=4,
+        status=SlotStatus.OPEN,
+        created_at=START,
+        updated_at=START,
+    )
+
+
+@pytest.fixture
+def batch(monkeypatch: pytest.MonkeyPatch) -> list[Sequence[int]]:
+    calls: list[Sequence[int]] = []
+
+    async def fake_list(*args: object, shop_ids: Sequence[int], **kwargs: Any) -> dict[int, list[dict[str, Any]]]:
+        calls.append(shop_ids)
+        return {sid: [{"slot": _slot(sid * 10, sid), "remaining": 3}] if sid == 1 else [] for sid in shop_ids}
+
+    monkeypatch.setattr(router, "SqlAlchemySlotRepository", DummySlotRepo)
+    monkeypatch.setattr(router.slot_usecase, "list_availability_for_shops", fake_list)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "get_availability_snapshot", lambda: FakeSnapshot())
+    return calls
+
+
+async def _call(shop_ids: list[int]) -> Any:
+    return await router.list_availability_for_shops(
+        shop_id=shop_ids,
+        start=datetime(2030, 1, 1, tzinfo=JST),
+        end=datetime(2030, 1, 2, tzinfo=JST),
+        session=cast(AsyncSession, object()),
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_groups_by_shop_in_request_order_and_queries_only_cold_shops(
+    batch: list[Sequence[int]],
+) -> None:
+    result = await _call([3, 2, 1, 3])
+
+    assert isinstance(result, MultiShopAvailability)
+    assert [(shop.shop_id, [item.slot_id for item in shop.items]) for shop in result.shops] == [
+        (3, []),
+        (2, [20]),
+        (1, [10]),
+    ]
+    assert batch == [[3, 1]]
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, cast
+
+import pytest
+from app.domain.services import ChangeEvent
+from app.models import Reservation, ReservationStatus, Slot, SlotStatus
+from app.routers import slots as router
+from app.schemas import SlotBulkStatusUpdate
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+JST = timezone(timedelta(hours=9))
+
+
+class DummySession:
+    """Minimal async session stub that supports `async with session.begin()`."""
+
+    async def __aenter__(self) -> "DummySession":
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> bool:
+        return False
+
+    def begin(self) -> "DummySession":
+        return self
+
+
+class DummyChangeLogRepo:
+    events: list[ChangeEvent] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def append(self, events: Iterable[ChangeEvent]) -> dict[int, int]:
+        DummyChangeLogRepo.events.extend(events)
+        return {event.shop_id: len(DummyChangeLogRepo.events) for event in DummyChangeLogRepo.events}
+
+
+def _slot() -> Slot:
+    start = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) + timedelta(days=1)
+    return Slot(
+        id=1,
+        shop_id=1,
+        seat_id=None,
+        starts_at=start,
+        ends_at=start + timedelta(hours=1),
+        capacity=4,
+        status=SlotStatus.CLOSED,
+        created_at=start,
+        updated_at=start,
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_returns_count_and_stranded(monkeypatch: pytest.MonkeyPatch) -> None:
+    slot = _slot()
+    reservation = Reservation(
+        id=5,
+        slot_id=slot.id,
+        user_id=7,
+        party_size=2,
+        status=ReservationStatus.BOOKED,
+        version=1,
+        created_at=slot.created_at,
+        updated_at=slot.updated_at,
+    )
+    calls: list[dict[str, Any]] = []
+
+    async def fake_bulk(*args: object, **kwargs: Any) -> tuple[list[int], list[tuple[Reservation, Slot]]]:
+        calls.append(kwargs)
+        return [1, 2, 3], [(reservation, slot)]
+
+    monkeypatch.setattr(router, "SqlAlchemySlotRepository", lambda s: s)
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(router.slot_usecase, "bulk_update_status", fake_bulk)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
+
+    start = datetime(2030, 1, 1, tzinfo=JST)
+    session = cast(AsyncSession, DummySession())
+    payload = SlotBulkStatusUpdate(
+        start=start,
+        end=start + timedelta(days=1),
+        status=SlotStatus.CLOSED,
+        include_stranded=True,
+    )
+    result = await router.bulk_update_slot_status(shop_id=1, payload=payload, session=session)
+
+    assert result.updated == 3
+    assert [r.reservation_id for r in result.stranded] == [reservation.id]
+    assert calls[0]["start"] == datetime(2029, 12, 31, 15, 0)
+    assert calls[0]["include_stranded"] is True
+    assert [(e.entity, e.entity_id, e.status) for e in DummyChangeLogRepo.events] == [
+        ("slot", i, SlotStatus.CLOSED.value) for i in (1, 2, 3)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_maps_value_error_to_400(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_bulk(*args: object, **kwargs: object) -> tuple[int, list[tuple[Reservation, Slot]]]:
+        raise ValueError("status must be closed or blocked")
+
+    monkeypatch.setattr(router, "SqlAlchemySlotRepository", lambda s: s)
+    monkeypatch.setattr(router, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(router.slot_usecase, "bulk_update_status", fake_bulk)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
+
+    start = datetime(2030, 1, 1, tzinfo=JST)
+    session = cast(AsyncSession, DummySession())
+    payload = SlotBulkStatusUpdate(start=start, end=start + timedelta(days=1), status=SlotStatus.OPEN)
+    with pytest.raises(HTTPException) as excinfo:
+        await router.bulk_update_slot_status(shop_id=1, payload=payload, session=session)
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_rejects_naive_range() -> None:
+    start = datetime(2030, 1, 1)
+    session = cast(AsyncSession, DummySession())
+    payload = SlotBulkStatusUpdate(start=start, end=start + timedelta(days=1), status=SlotStatus.BLOCKED)
+    with pytest.raises(HTTPException) as excinfo:
+        await router.bulk_update_slot_status(shop_id=1, payload=payload, session=session)
+    assert excinfo.value.status_code == 400
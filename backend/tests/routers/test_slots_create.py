@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta, timezone
-from typing import cast
+from typing import Iterable, cast
 
 import pytest
+from app.domain.services import ChangeEvent
 from app.models import Slot, SlotStatus
 from app.routers import slots as router
 from app.schemas import SlotCreate
@@ -32,6 +33,17 @@ class DummySlotRepo:
         self.session = session
 
 
+class DummyChangeLogRepo:
+    events: list[ChangeEvent] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def append(self, events: Iterable[ChangeEvent]) -> dict[int, int]:
+        DummyChangeLogRepo.events.extend(events)
+        return {event.shop_id: len(DummyChangeLogRepo.events) for event in DummyChangeLogRepo.events}
+
+
 def _slot() -> Slot:
     start = _utc_now_naive().replace(microsecond=0)
     return Slot(
@@ -72,6 +84,8 @@ async def test_create_slot_returns_created_slot(monkeypatch: pytest.MonkeyPatch)
 
     monkeypatch.setattr(router, "SqlAlchemySlotRepository", DummySlotRepo)
     monkeypatch.setattr(router.slot_usecase, "create_slot", fake_create_slot)  # type: ignore[attr-defined]
+    monkeypatch.setattr(router, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
 
     payload = SlotCreate(
         seat_id=None,
@@ -90,6 +104,7 @@ async def test_create_slot_returns_created_slot(monkeypatch: pytest.MonkeyPatch)
     assert result.slot_id == slot.id
     assert result.shop_id == slot.shop_id
     assert result.capacity == payload.capacity
+    assert [(e.entity, e.entity_id, e.action) for e in DummyChangeLogRepo.events] == [("slot", slot.id, "created")]
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from typing import Sequence
+
+import pytest
+from app.domain.services import ChangeEvent, ReservationStatusChange
+from app.models import ChangeLog, ReservationStatus
+from app.usecases import changes as uc
+
+
+def _row(seq: int) -> ChangeLog:
+    return ChangeLog(
+        shop_id=1,
+        seq=seq,
+        entity="reservation",
+        entity_id=seq,
+        slot_id=1,
+        action="created",
+        status="booked",
+        version=1,
+        created_at=datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+
+class FakeChangeRepo:
+    def __init__(self, seqs: list[int]) -> None:
+        self.rows = [_row(seq) for seq in seqs]
+        self.calls: list[tuple[int, int, int]] = []
+
+    async def append(self, events: Sequence[ChangeEvent]) -> dict[int, int]:  # pragma: no cover - not used
+        return {}
+
+    async def last_seq(self, shop_id: int) -> int:  # pragma: no cover - not used
+        return self.rows[-1].seq if self.rows else 0
+
+    async def list_since(self, shop_id: int, since: int, limit: int) -> list[ChangeLog]:
+        self.calls.append((shop_id, since, limit))
+        return [row for row in self.rows if row.seq > since][:limit]
+
+
+@pytest.mark.asyncio
+async def test_list_changes_pages_with_cursor() -> None:
+    repo = FakeChangeRepo([1, 2, 3, 4, 5])
+
+    rows, cursor, has_more = await uc.list_changes(repo, shop_id=1, since=0, limit=2)
+    assert [row.seq for row in rows] == [1, 2]
+    assert (cursor, has_more) == (2, True)
+    # One extra row is read to tell whether another page exists.
+    assert repo.calls[0] == (1, 0, 3)
+
+    rows, cursor, has_more = await uc.list_changes(repo, shop_id=1, since=4, limit=2)
+    assert [row.seq for row in rows] == [5]
+    assert (cursor, has_more) == (5, False)
+
+
+@pytest.mark.asyncio
+async def test_list_changes_keeps_cursor_when_caught_up() -> None:
+    rows, cursor, has_more = await uc.list_changes(FakeChangeRepo([1, 2]), shop_id=1, since=2, limit=10)
+    assert (rows, cursor, has_more) == ([], 2, False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("since", "limit"), [(-1, 10), (0, 0), (0, uc.MAX_CHANGES_LIMIT + 1)])
+async def test_list_changes_rejects_invalid_arguments(since: int, limit: int) -> None:
+    with pytest.raises(ValueError):
+        await uc.list_changes(FakeChangeRepo([]), shop_id=1, since=since, limit=limit)
+
+
+def test_reservations_changed_carries_target_status_and_version() -> None:
+    change = ReservationStatusChange(
+        reservation_id=7,
+        slot_id=3,
+        shop_id=2,
+        user_id=5,
+        party_size=2,
+        status_from=ReservationStatus.BOOKED,
+        status_to=ReservationStatus.CANCELLED,
+        version=4,
+    )
+    assert uc.reservations_changed([change], action="shop_cancelled") == [
+        ChangeEvent(
+            shop_id=2,
+            entity="reservation",
+            entity_id=7,
+            slot_id=3,
+            action="shop_cancelled",
+            status="cancelled",
+            version=4,
+        )
+    ]
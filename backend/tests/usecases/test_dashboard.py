@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.domain.services import OccupancyColumns
+from app.usecases import dashboard as uc
+
+START = datetime(2030, 1, 1)
+
+
+class FakeDashboardRepo:
+    def __init__(self) -> None:
+        self.calls: list[dict[str, datetime]] = []
+
+    async def occupancy_columns(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> OccupancyColumns:
+        self.calls.append({"start": start, "end": end, "starts_from": starts_from})
+        epoch = 1_893_456_000
+        return OccupancyColumns((1,), (epoch,), (epoch + 3600,), (4,), (1,), (epoch,), (epoch + 3600,), (3,))
+
+
+@pytest.mark.asyncio
+async def test_occupancy_loads_overlapping_rows_and_builds_grid() -> None:
+    repo = FakeDashboardRepo()
+
+    grid = await uc.occupancy(repo, shop_id=1, start=START, end=START + timedelta(hours=2), bucket_minutes=60)
+
+    assert grid.occupancy == [[75.0, None]]
+    assert repo.calls[0]["starts_from"] == START - timedelta(days=1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("days", "bucket_minutes"), [(0, 60), (93, 60), (7, 10), (7, 50)])
+async def test_occupancy_rejects_bad_range_or_bucket(days: int, bucket_minutes: int) -> None:
+    with pytest.raises(ValueError):
+        await uc.occupancy(
+            FakeDashboardRepo(),
+            shop_id=1,
+            start=START,
+            end=START + timedelta(days=days),
+            bucket_minutes=bucket_minutes,
+        )
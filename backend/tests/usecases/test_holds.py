@@ -0,0 +1,325 @@
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+import pytest
+from app.domain.errors import CapacityError, HoldNotFoundError
+from app.domain.services import AvailabilityBucket
+from app.models import Reservation, ReservationStatus, SeatHold, Slot, SlotStatus
+from app.usecases import holds as uc
+from app.usecases import reservations as reservation_uc
+from app.usecases import slots as slot_uc
+
+
+def _utc_now_naive() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _slot(capacity: int = 4, held: int = 0, held_until: datetime | None = None) -> Slot:
+    start = _utc_now_naive() + timedelta(days=3)
+    return Slot(
+        id=1,
+        shop_id=1,
+        seat_id=None,
+        starts_at=start,
+        ends_at=start + timedelta(hours=1),
+        capacity=capacity,
+        status=SlotStatus.OPEN,
+        held=held,
+        held_until=held_until,
+        created_at=start,
+        updated_at=start,
+    )
+
+
+class FakeSlotRepo:
+    def __init__(self, slot: Slot, reserved: int = 0) -> None:
+        self.slot = slot
+        self.reserved = reserved
+
+    async def get_for_update(self, slot_id: int) -> Slot | None:
+        return self.slot if slot_id == self.slot.id else None
+
+    async def lock_many_skip_locked(self, slot_ids: Sequence[int]) -> list[Slot]:
+        return [self.slot] if self.slot.id in slot_ids else []
+
+    async def list_with_reserved(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+    ) -> list[tuple[Slot, int]]:
+        return [(self.slot, self.reserved)]
+
+    async def list_with_reserved_for_shops(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def list_overlapping_with_reserved(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def next_available(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def best_fit_seat_slots(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> list[int]:
+        return []
+
+    async def availability_buckets(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> list[AvailabilityBucket]:
+        return []
+
+
+class FakeResRepo:
+    def __init__(self, reserved: int = 0) -> None:
+        self.reserved = reserved
+        self.created: list[Reservation] = []
+
+    async def user_has_active(self, slot_id: int, user_id: int) -> bool:
+        return False
+
+    async def sum_reserved(self, slot_id: int) -> int:
+        return self.reserved
+
+    async def create(self, slot_id: int, user_id: int, party_size: int, status: ReservationStatus) -> Reservation:
+        now = _utc_now_naive()
+        reservation = Reservation(
+            id=len(self.created) + 1,
+            slot_id=slot_id,
+            user_id=user_id,
+            party_size=party_size,
+            status=status,
+            version=1,
+            created_at=now,
+            updated_at=now,
+        )
+        self.created.append(reservation)
+        return reservation
+
+
+class FakeHoldRepo:
+    """In-memory holds that keep slot.held/held_until in sync like the SQL repository."""
+
+    def __init__(self, holds: list[SeatHold] | None = None) -> None:
+        self.holds = holds or []
+        self.reclaimed_slots: list[int] = []
+
+    async def create(self, *, slot: Slot, user_id: int, party_size: int, expires_at: datetime) -> SeatHold:
+        hold = SeatHold(
+            id=len(self.holds) + 1,
+            slot_id=slot.id,
+            user_id=user_id,
+            party_size=party_size,
+            expires_at=expires_at,
+            created_at=_utc_now_naive(),
+        )
+        self.holds.append(hold)
+        slot.held = (slot.held or 0) + party_size
+        slot.held_until = expires_at if slot.held_until is None else max(slot.held_until, expires_at)
+        return hold
+
+    async def get_for_update(self, hold_id: int, user_id: int) -> SeatHold | None:
+        return next((h for h in self.holds if h.id == hold_id and h.user_id == user_id), None)
+
+    async def consume(self, slot: Slot, hold: SeatHold) -> None:
+        self.holds.remove(hold)
+        slot.held = max((slot.held or 0) - hold.party_size, 0)
+
+    async def reclaim_expired(self, slot: Slot, now: datetime) -> int:
+        self.reclaimed_slots.append(slot.id)
+        self.holds = [h for h in self.holds if h.expires_at > now]
+        slot.held = sum(h.party_size for h in self.holds if h.slot_id == slot.id)
+        return slot.held
+
+    async def slots_with_expired(self, now: datetime, limit: int) -> list[int]:
+        return sorted({h.slot_id for h in self.holds if h.expires_at <= now})[:limit]
+
+
+def _hold(hold_id: int, party_size: int, expires_at: datetime, user_id: int = 1) -> SeatHold:
+    return SeatHold(
+        id=hold_id,
+        slot_id=1,
+        user_id=user_id,
+        party_size=party_size,
+        expires_at=expires_at,
+        created_at=_utc_now_naive(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_hold_counts_against_capacity() -> None:
+    now = _utc_now_naive()
+    slot = _slot(capacity=4)
+    hold_repo = FakeHoldRepo([_hold(1, 2, now + timedelta(minutes=5), user_id=9)])
+    slot.held = 2
+
+    hold, _ = await uc.create_hold(
+        FakeSlotRepo(slot),  # type: ignore[arg-type]
+        FakeResRepo(reserved=1),  # type: ignore[arg-type]
+        hold_repo,
+        slot_id=1,
+        user_id=1,
+        party_size=1,
+        ttl=timedelta(minutes=10),
+        now=now,
+    )
+    assert hold.expires_at == now + timedelta(minutes=10)
+    assert slot.held == 3
+
+    with pytest.raises(CapacityError):
+        await uc.create_hold(
+            FakeSlotRepo(slot),  # type: ignore[arg-type]
+            FakeResRepo(reserved=1),  # type: ignore[arg-type]
+            hold_repo,
+            slot_id=1,
+            user_id=2,
+            party_size=1,
+            ttl=timedelta(minutes=10),
+            now=now,
+        )
+
+
+@pytest.mark.asyncio
+async def test_create_hold_reclaims_expired_holds_first() -> None:
+    now = _utc_now_naive()
+    slot = _slot(capacity=2, held=2, held_until=now - timedelta(minutes=1))
+    hold_repo = FakeHoldRepo([_hold(1, 2, now - timedelta(minutes=1), user_id=9)])
+
+    await uc.create_hold(
+        FakeSlotRepo(slot),  # type: ignore[arg-type]
+        FakeResRepo(),  # type: ignore[arg-type]
+        hold_repo,
+        slot_id=1,
+        user_id=1,
+        party_size=2,
+        ttl=timedelta(minutes=10),
+        now=now,
+    )
+    assert [h.user_id for h in hold_repo.holds] == [1]
+
+
+@pytest.mark.asyncio
+async def test_create_reservation_consumes_own_hold() -> None:
+    now = _utc_now_naive()
+    slot = _slot(capacity=2, held=2, held_until=now + timedelta(minutes=5))
+    hold_repo = FakeHoldRepo([_hold(1, 2, now + timedelta(minutes=5))])
+    res_repo = FakeResRepo()
+
+    reservation, _ = await reservation_uc.create_reservation(
+        FakeSlotRepo(slot),  # type: ignore[arg-type]
+        res_repo,  # type: ignore[arg-type]
+        hold_repo=hold_repo,
+        slot_id=1,
+        user_id=1,
+        party_size=2,
+        hold_id=1,
+    )
+    assert reservation.party_size == 2
+    assert hold_repo.holds == []
+    assert slot.held == 0
+
+
+@pytest.mark.asyncio
+async def test_create_reservation_without_hold_respects_others_holds() -> None:
+    now = _utc_now_naive()
+    slot = _slot(capacity=2, held=2, held_until=now + timedelta(minutes=5))
+    hold_repo = FakeHoldRepo([_hold(1, 2, now + timedelta(minutes=5), user_id=9)])
+
+    with pytest.raises(CapacityError):
+        await reservation_uc.create_reservation(
+            FakeSlotRepo(slot),  # type: ignore[arg-type]
+            FakeResRepo(),  # type: ignore[arg-type]
+            hold_repo=hold_repo,
+            slot_id=1,
+            user_id=1,
+            party_size=1,
+        )
+
+
+@pytest.mark.asyncio
+async def test_create_reservation_rejects_expired_hold() -> None:
+    now = _utc_now_naive()
+    slot = _slot(capacity=2, held=2, held_until=now - timedelta(seconds=1))
+    hold_repo = FakeHoldRepo([_hold(1, 2, now - timedelta(seconds=1))])
+
+    with pytest.raises(HoldNotFoundError):
+        await reservation_uc.create_reservation(
+            FakeSlotRepo(slot),  # type: ignore[arg-type]
+            FakeResRepo(),  # type: ignore[arg-type]
+            hold_repo=hold_repo,
+            slot_id=1,
+            user_id=1,
+            party_size=2,
+            hold_id=1,
+        )
+
+
+@pytest.mark.asyncio
+async def test_reclaim_expired_holds_locks_and_reclaims_slots() -> None:
+    now = _utc_now_naive()
+    slot = _slot(held=2, held_until=now - timedelta(minutes=1))
+    hold_repo = FakeHoldRepo([_hold(1, 2, now - timedelta(minutes=1))])
+
+    reclaimed = await uc.reclaim_expired_holds(FakeSlotRepo(slot), hold_repo, now=now, batch_size=10)  # type: ignore[arg-type]
+
+    assert reclaimed == 1
+    assert hold_repo.reclaimed_slots == [1]
+    assert slot.held == 0
+
+
+@pytest.mark.asyncio
+async def test_list_availability_subtracts_live_holds_only() -> None:
+    now = _utc_now_naive()
+    live = _slot(capacity=4, held=2, held_until=now + timedelta(minutes=5))
+    rows = await slot_uc.list_availability(
+        FakeSlotRepo(live, reserved=1),  # type: ignore[arg-type]
+        shop_id=1,
+        start=now,
+        end=now + timedelta(days=7),
+        seat_id=None,
+    )
+    assert rows[0]["remaining"] == 1
+
+    stale = _slot(capacity=4, held=2, held_until=now - timedelta(minutes=5))
+    rows = await slot_uc.list_availability(
+        FakeSlotRepo(stale, reserved=1),  # type: ignore[arg-type]
+        shop_id=1,
+        start=now,
+        end=now + timedelta(days=7),
+        seat_id=None,
+    )
+    assert rows[0]["remaining"] == 3
@@ -0,0 +1,44 @@
+import pytest
+from app.domain.services import BookingPolicy
+from app.models import CapacityMode, ShopPolicy
+from app.usecases import policies as uc
+
+
+class FakeSavingPolicyRepo:
+    def __init__(self) -> None:
+        self.saved: list[tuple[int, BookingPolicy, int | None]] = []
+
+    async def get(self, shop_id: int) -> ShopPolicy | None:  # pragma: no cover
+        return None
+
+    async def get_for_update(self, shop_id: int) -> ShopPolicy | None:  # pragma: no cover
+        return None
+
+    async def get_booking_policy(self, shop_id: int) -> BookingPolicy:  # pragma: no cover
+        return BookingPolicy()
+
+    async def save(self, shop_id: int, policy: BookingPolicy, *, window_capacity: int | None) -> ShopPolicy:
+        self.saved.append((shop_id, policy, window_capacity))
+        return ShopPolicy(shop_id=shop_id, cutoff_days=policy.cutoff_days, window_capacity=window_capacity)
+
+
+@pytest.mark.asyncio
+async def test_update_shop_policy_saves_the_policy() -> None:
+    repo = FakeSavingPolicyRepo()
+    policy = BookingPolicy(cutoff_days=1, max_party_size=6)
+
+    saved = await uc.update_shop_policy(repo, shop_id=3, policy=policy, window_capacity=None)
+
+    assert repo.saved == [(3, policy, None)]
+    assert saved.cutoff_days == 1
+
+
+@pytest.mark.asyncio
+async def test_window_mode_requires_window_capacity() -> None:
+    repo = FakeSavingPolicyRepo()
+
+    with pytest.raises(ValueError):
+        await uc.update_shop_policy(
+            repo, shop_id=3, policy=BookingPolicy(capacity_mode=CapacityMode.WINDOW), window_capacity=None
+        )
+    assert repo.saved == []
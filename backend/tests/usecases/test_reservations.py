@@ -1,16 +1,27 @@
+from dataclasses import fields
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Tuple, cast
+from typing import List, Optional, Sequence, Tuple, cast
 
 import pytest
 from app.domain.errors import (
+    ActiveReservationConflictError,
     CancelNotAllowedError,
     CapacityError,
     DuplicateReservationError,
+    OverlappingReservationError,
     RescheduleNotAllowedError,
     SlotNotOpenError,
     VersionConflictError,
 )
-from app.models import Reservation, ReservationStatus, Slot, SlotStatus
+from app.domain.services import (
+    MAX_RESERVATION_ID,
+    AvailabilityBucket,
+    BookingPolicy,
+    ReservationRef,
+    ShopReservationCursor,
+    ShopReservationRow,
+)
+from app.models import CapacityMode, Reservation, ReservationStatus, ShopPolicy, Slot, SlotStatus
 from app.usecases import reservations as uc
 
 
@@ -38,6 +49,9 @@ class FakeResRepo:
         self.reschedule_called = True
         return reservation
 
+    async def resize(self, reservation: Reservation) -> Reservation:  # pragma: no cover
+        return reservation
+
     # unused in these tests
     async def user_has_active(self, slot_id: int, user_id: int) -> bool:  # pragma: no cover
         return False
@@ -61,6 +75,72 @@ class FakeResRepo:
     ) -> List[Tuple[Reservation, Slot]]:
         return [(self.reservation, self.reservation.slot)]
 
+    async def list_active_in_range(  # pragma: no cover
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+    ) -> List[Tuple[Reservation, Slot]]:
+        return []
+
+    async def lock_active_for_shop(  # pragma: no cover
+        self,
+        shop_id: int,
+        *,
+        slot_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+        seat_id: int | None,
+    ) -> List[ReservationRef]:
+        return []
+
+    async def list_overlapping_party(  # pragma: no cover
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> List[Tuple[datetime, datetime, int]]:
+        return []
+
+    async def lock_user(self, user_id: int) -> None:  # pragma: no cover
+        return None
+
+    async def user_has_overlapping(  # pragma: no cover
+        self,
+        shop_id: int,
+        user_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> bool:
+        return False
+
+    async def bulk_cancel(self, reservation_ids: Sequence[int]) -> int:  # pragma: no cover
+        return 0
+
+    async def lock_expired_pending(  # pragma: no cover
+        self, created_before: datetime, limit: int
+    ) -> List[ReservationRef]:
+        return []
+
+    async def list_shop_page(  # pragma: no cover
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        statuses: Sequence[ReservationStatus],
+        after: ShopReservationCursor | None,
+        slot_limit: int,
+    ) -> Tuple[List[ShopReservationRow], ShopReservationCursor | None]:
+        return [], None
+
     async def list_with_reserved(  # pragma: no cover - satisfy SlotRepository when used
         self,
         shop_id: int,
@@ -70,6 +150,58 @@ class FakeResRepo:
     ) -> list[tuple[Slot, int]]:
         return []
 
+    async def list_with_reserved_for_shops(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def list_overlapping_with_reserved(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def next_available(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def best_fit_seat_slots(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> list[int]:
+        return []
+
+    async def availability_buckets(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> list[AvailabilityBucket]:
+        return []
+
 
 class FakeReservationStruct:
     def __init__(self, status: ReservationStatus) -> None:
@@ -102,6 +234,9 @@ class FakeSlotRepo:
     async def get_for_update(self, slot_id: int) -> Slot | None:
         return self.slots.get(slot_id)
 
+    async def lock_many_skip_locked(self, slot_ids: Sequence[int]) -> list[Slot]:
+        return [self.slots[slot_id] for slot_id in slot_ids if slot_id in self.slots]
+
     async def create(
         self,
         *,
@@ -135,6 +270,69 @@ class FakeSlotRepo:
     ) -> list[tuple[Slot, int]]:
         return []
 
+    async def list_with_reserved_for_shops(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def list_overlapping_with_reserved(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def next_available(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def best_fit_seat_slots(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> list[int]:
+        return []
+
+    async def availability_buckets(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> list[AvailabilityBucket]:
+        return []
+
+    async def bulk_update_status(  # pragma: no cover - not used in these tests
+        self,
+        *,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+        status: SlotStatus,
+    ) -> list[int]:
+        return []
+
 
 class FakeRescheduleRepo:
     def __init__(
@@ -143,11 +341,19 @@ class FakeRescheduleRepo:
         *,
         reserved_by_slot: dict[int, int] | None = None,
         active_slots: set[int] | None = None,
+        overlapping: list[tuple[datetime, datetime, int]] | None = None,
+        user_overlaps: bool = False,
     ) -> None:
         self.reservation = reservation
         self.reserved_by_slot = reserved_by_slot or {}
         self.active_slots = active_slots or set()
+        self.overlapping = overlapping or []
+        self.user_overlaps = user_overlaps
+        self.create_error: Exception | None = None
+        self.user_locks: list[int] = []
+        self.excluded: list[int | None] = []
         self.reschedule_called = False
+        self.resize_called = False
 
     async def get_for_user_for_update(self, reservation_id: int, user_id: int) -> Tuple[Reservation, Slot]:
         return self.reservation, self.reservation.slot
@@ -163,19 +369,26 @@ class FakeRescheduleRepo:
         self.reservation = reservation
         return reservation
 
+    async def resize(self, reservation: Reservation) -> Reservation:
+        self.resize_called = True
+        self.reservation = reservation
+        return reservation
+
     async def user_has_active(self, slot_id: int, user_id: int) -> bool:
         return slot_id in self.active_slots
 
     async def sum_reserved(self, slot_id: int) -> int:
         return self.reserved_by_slot.get(slot_id, 0)
 
-    async def create(  # pragma: no cover
+    async def create(
         self,
         slot_id: int,
         user_id: int,
         party_size: int,
         status: ReservationStatus,
     ) -> Reservation:
+        if self.create_error is not None:
+            raise self.create_error
         return self.reservation
 
     async def list_by_user(  # pragma: no cover
@@ -185,6 +398,75 @@ class FakeRescheduleRepo:
     ) -> List[Tuple[Reservation, Slot]]:
         return [(self.reservation, self.reservation.slot)]
 
+    async def list_active_in_range(  # pragma: no cover
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+    ) -> List[Tuple[Reservation, Slot]]:
+        return []
+
+    async def lock_active_for_shop(  # pragma: no cover
+        self,
+        shop_id: int,
+        *,
+        slot_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+        seat_id: int | None,
+    ) -> List[ReservationRef]:
+        return []
+
+    async def list_overlapping_party(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> List[Tuple[datetime, datetime, int]]:
+        self.excluded.append(exclude_reservation_id)
+        return self.overlapping
+
+    async def lock_user(self, user_id: int) -> None:
+        self.user_locks.append(user_id)
+
+    async def user_has_overlapping(
+        self,
+        shop_id: int,
+        user_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> bool:
+        assert user_id in self.user_locks, "overlap checked without the user lock"
+        self.excluded.append(exclude_reservation_id)
+        return self.user_overlaps
+
+    async def bulk_cancel(self, reservation_ids: Sequence[int]) -> int:  # pragma: no cover
+        return 0
+
+    async def lock_expired_pending(  # pragma: no cover
+        self, created_before: datetime, limit: int
+    ) -> List[ReservationRef]:
+        return []
+
+    async def list_shop_page(  # pragma: no cover
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        statuses: Sequence[ReservationStatus],
+        after: ShopReservationCursor | None,
+        slot_limit: int,
+    ) -> Tuple[List[ShopReservationRow], ShopReservationCursor | None]:
+        return [], None
+
     async def list_with_reserved(  # pragma: no cover - satisfy SlotRepository when used
         self,
         shop_id: int,
@@ -194,6 +476,58 @@ class FakeRescheduleRepo:
     ) -> list[tuple[Slot, int]]:
         return []
 
+    async def list_with_reserved_for_shops(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def list_overlapping_with_reserved(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def next_available(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def best_fit_seat_slots(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> list[int]:
+        return []
+
+    async def availability_buckets(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> list[AvailabilityBucket]:
+        return []
+
 
 @pytest.mark.asyncio
 async def test_cancel_returns_existing_when_already_cancelled() -> None:
@@ -249,6 +583,24 @@ async def test_cancel_forbidden_within_cutoff() -> None:
         await uc.cancel_reservation(repo, reservation_id=1, user_id=1, version=1)
 
 
+@pytest.mark.asyncio
+async def test_cancel_cutoff_follows_the_shop_policy() -> None:
+    reservation_struct = FakeReservationStruct(ReservationStatus.BOOKED)
+    reservation_struct.slot.starts_at = _utc_now_naive() + timedelta(days=3)
+    repo = FakeResRepo(cast(Reservation, reservation_struct))
+
+    with pytest.raises(CancelNotAllowedError):
+        await uc.cancel_reservation(
+            repo, reservation_id=1, user_id=1, version=1, policy_repo=FakePolicyRepo(ShopPolicy(cutoff_days=5))
+        )
+
+    reservation_struct.slot.starts_at = _utc_now_naive() + timedelta(hours=12)
+    await uc.cancel_reservation(
+        repo, reservation_id=1, user_id=1, version=1, policy_repo=FakePolicyRepo(ShopPolicy(cutoff_days=0))
+    )
+    assert repo.cancel_called is True
+
+
 def _slot_with(
     slot_id: int,
     shop_id: int = 1,
@@ -425,3 +777,568 @@ async def test_reschedule_rejects_when_shop_differs() -> None:
             new_slot_id=2,
             version=1,
         )
+
+
+def _booked_on(slot: Slot, party_size: int) -> Reservation:
+    reservation = cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))
+    reservation.slot = slot
+    reservation.slot_id = slot.id
+    reservation.party_size = party_size
+    return reservation
+
+
+@pytest.mark.asyncio
+async def test_resize_checks_only_the_growth_against_remaining_capacity() -> None:
+    slot = _slot_with(1, capacity=6)
+    # 2 of the 5 reserved seats are this reservation's own.
+    repo = FakeRescheduleRepo(_booked_on(slot, 2), reserved_by_slot={1: 5})
+
+    with pytest.raises(CapacityError):
+        await uc.resize_reservation(repo, reservation_id=1, user_id=1, party_size=4, version=1)
+    assert repo.resize_called is False
+
+    updated, _, previous_party_size = await uc.resize_reservation(
+        repo, reservation_id=1, user_id=1, party_size=3, version=1
+    )
+    assert (updated.party_size, updated.version, previous_party_size) == (3, 2, 2)
+    assert repo.resize_called is True
+
+
+@pytest.mark.asyncio
+async def test_resize_to_the_same_size_is_idempotent() -> None:
+    repo = FakeRescheduleRepo(_booked_on(_slot_with(1), 2))
+
+    updated, _, previous_party_size = await uc.resize_reservation(
+        repo, reservation_id=1, user_id=1, party_size=2, version=1
+    )
+
+    assert (updated.version, previous_party_size, repo.resize_called) == (1, 2, False)
+
+
+@pytest.mark.asyncio
+async def test_resize_raises_on_version_conflict() -> None:
+    repo = FakeRescheduleRepo(_booked_on(_slot_with(1), 2))
+
+    with pytest.raises(VersionConflictError):
+        await uc.resize_reservation(repo, reservation_id=1, user_id=1, party_size=3, version=2)
+
+
+@pytest.mark.asyncio
+async def test_resize_shrink_forbidden_within_cutoff_but_growth_allowed() -> None:
+    slot = _slot_with(1, starts_at=_utc_now_naive() + timedelta(hours=12))
+    repo = FakeRescheduleRepo(_booked_on(slot, 2), reserved_by_slot={1: 2})
+
+    with pytest.raises(CancelNotAllowedError):
+        await uc.resize_reservation(repo, reservation_id=1, user_id=1, party_size=1, version=1)
+
+    updated, _, _ = await uc.resize_reservation(repo, reservation_id=1, user_id=1, party_size=3, version=1)
+    assert updated.party_size == 3
+
+
+@pytest.mark.asyncio
+async def test_resize_keeps_the_new_size_within_the_shop_party_limit() -> None:
+    repo = FakeRescheduleRepo(_booked_on(_slot_with(1, capacity=10), 2), reserved_by_slot={1: 2})
+    policy_repo = FakePolicyRepo(ShopPolicy(max_party_size=4))
+
+    with pytest.raises(CapacityError):
+        await uc.resize_reservation(
+            repo, reservation_id=1, user_id=1, party_size=5, version=1, policy_repo=policy_repo
+        )
+
+    updated, _, _ = await uc.resize_reservation(
+        repo, reservation_id=1, user_id=1, party_size=4, version=1, policy_repo=policy_repo
+    )
+    assert updated.party_size == 4
+
+
+@pytest.mark.asyncio
+async def test_resize_growth_skips_the_user_overlap_query() -> None:
+    # The only overlapping reservation of the user is the one being resized.
+    repo = FakeRescheduleRepo(_booked_on(_slot_with(1, capacity=10), 2), reserved_by_slot={1: 2}, user_overlaps=True)
+    policy_repo = FakePolicyRepo(ShopPolicy(reject_user_overlap=True))
+
+    updated, _, _ = await uc.resize_reservation(
+        repo, reservation_id=1, user_id=1, party_size=3, version=1, policy_repo=policy_repo
+    )
+    assert updated.party_size == 3
+    assert repo.excluded == []
+
+
+@pytest.mark.asyncio
+async def test_resize_counts_the_growth_against_the_time_window_peak() -> None:
+    slot = _slot_with(1, capacity=10)
+    start = slot.starts_at
+    # The peak already includes this reservation's 2 guests.
+    overlapping = [(start, start + timedelta(hours=1), 2), (start, start + timedelta(minutes=30), 3)]
+    repo = FakeRescheduleRepo(_booked_on(slot, 2), reserved_by_slot={1: 2}, overlapping=overlapping)
+
+    with pytest.raises(CapacityError):
+        await uc.resize_reservation(
+            repo, reservation_id=1, user_id=1, party_size=4, version=1, policy_repo=FakePolicyRepo(_window_policy(6))
+        )
+
+    updated, _, _ = await uc.resize_reservation(
+        repo, reservation_id=1, user_id=1, party_size=3, version=1, policy_repo=FakePolicyRepo(_window_policy(6))
+    )
+    assert updated.party_size == 3
+
+
+class FakeAnySeatSlotRepo(FakeSlotRepo):
+    def __init__(self, slots: dict[int, Slot], *, locked_elsewhere: set[int]) -> None:
+        super().__init__(slots)
+        self.locked_elsewhere = locked_elsewhere
+        self.lock_attempts: list[int] = []
+
+    async def best_fit_seat_slots(
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> list[int]:
+        return [slot.id for slot in self.slots.values() if slot.starts_at == starts_at][:limit]
+
+    async def lock_many_skip_locked(self, slot_ids: Sequence[int]) -> list[Slot]:
+        self.lock_attempts.extend(slot_ids)
+        return [self.slots[slot_id] for slot_id in slot_ids if slot_id not in self.locked_elsewhere]
+
+
+class FakeNoHoldRepo:
+    async def reclaim_expired(self, slot: Slot, now: datetime) -> int:
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_any_seat_skips_locked_and_filled_candidates() -> None:
+    start = _utc_now_naive() + timedelta(days=3)
+    slots = {slot_id: _slot_with(slot_id, starts_at=start, capacity=2) for slot_id in (1, 2, 3)}
+    slot_repo = FakeAnySeatSlotRepo(slots, locked_elsewhere={1})
+    reservation = cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))
+    # Slot 2 filled up between the candidate query and the lock.
+    repo = FakeRescheduleRepo(reservation, reserved_by_slot={2: 2})
+
+    _, slot = await uc.create_reservation_any_seat(
+        slot_repo,
+        repo,
+        hold_repo=FakeNoHoldRepo(),  # type: ignore[arg-type]
+        shop_id=1,
+        starts_at=start,
+        user_id=1,
+        party_size=2,
+    )
+
+    assert slot.id == 3
+    assert slot_repo.lock_attempts == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_any_seat_raises_when_no_seat_fits() -> None:
+    reservation = cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))
+
+    with pytest.raises(CapacityError):
+        await uc.create_reservation_any_seat(
+            FakeAnySeatSlotRepo({}, locked_elsewhere=set()),
+            FakeRescheduleRepo(reservation),
+            hold_repo=FakeNoHoldRepo(),  # type: ignore[arg-type]
+            shop_id=1,
+            starts_at=_utc_now_naive(),
+            user_id=1,
+            party_size=2,
+        )
+
+
+class FakePolicyRepo:
+    def __init__(self, policy: ShopPolicy | None) -> None:
+        self.policy = policy
+        self.locked = 0
+
+    async def get(self, shop_id: int) -> ShopPolicy | None:
+        return self.policy
+
+    async def get_for_update(self, shop_id: int) -> ShopPolicy | None:
+        self.locked += 1
+        return self.policy
+
+    async def get_booking_policy(self, shop_id: int) -> BookingPolicy:
+        if self.policy is None:
+            return BookingPolicy()
+        # Columns a test leaves unset are None on an unsaved row: keep the defaults for them.
+        values = {f.name: getattr(self.policy, f.name) for f in fields(BookingPolicy)}
+        return BookingPolicy(**{name: value for name, value in values.items() if value is not None})
+
+    async def save(  # pragma: no cover
+        self, shop_id: int, policy: BookingPolicy, *, window_capacity: int | None
+    ) -> ShopPolicy:
+        raise NotImplementedError
+
+
+def _window_policy(capacity: int) -> ShopPolicy:
+    return ShopPolicy(shop_id=1, capacity_mode=CapacityMode.WINDOW, window_capacity=capacity)
+
+
+@pytest.mark.asyncio
+async def test_reschedule_checks_time_window_peak_without_the_moved_reservation() -> None:
+    current_slot = _slot_with(1)
+    target_slot = _slot_with(2, capacity=10)
+    reservation_struct = FakeReservationStruct(ReservationStatus.BOOKED)
+    reservation_struct.party_size = 2
+    reservation = cast(Reservation, reservation_struct)
+    reservation.slot = current_slot
+    reservation.slot_id = current_slot.id
+    start = target_slot.starts_at
+    overlapping = [(start - timedelta(minutes=30), start + timedelta(minutes=30), 5)]
+    repo = FakeRescheduleRepo(reservation, overlapping=overlapping)
+    policy_repo = FakePolicyRepo(_window_policy(6))
+
+    with pytest.raises(CapacityError):
+        await uc.reschedule_reservation(
+            FakeSlotRepo({1: current_slot, 2: target_slot}),
+            repo,
+            reservation_id=1,
+            user_id=1,
+            new_slot_id=2,
+            version=1,
+            policy_repo=policy_repo,
+        )
+    assert repo.excluded == [reservation.id]
+    assert policy_repo.locked == 1
+
+    policy_repo.policy = _window_policy(7)
+    updated, _, _ = await uc.reschedule_reservation(
+        FakeSlotRepo({1: current_slot, 2: target_slot}),
+        repo,
+        reservation_id=1,
+        user_id=1,
+        new_slot_id=2,
+        version=1,
+        policy_repo=policy_repo,
+    )
+    assert updated.slot_id == 2
+
+
+@pytest.mark.asyncio
+async def test_reschedule_in_slot_mode_skips_the_window_lock_and_query() -> None:
+    current_slot = _slot_with(1)
+    target_slot = _slot_with(2)
+    reservation = cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))
+    reservation.slot = current_slot
+    reservation.slot_id = current_slot.id
+    repo = FakeRescheduleRepo(reservation)
+    policy_repo = FakePolicyRepo(ShopPolicy(shop_id=1, capacity_mode=CapacityMode.SLOT))
+
+    await uc.reschedule_reservation(
+        FakeSlotRepo({1: current_slot, 2: target_slot}),
+        repo,
+        reservation_id=1,
+        user_id=1,
+        new_slot_id=2,
+        version=1,
+        policy_repo=policy_repo,
+    )
+
+    assert (policy_repo.locked, repo.excluded) == (0, [])
+
+
+@pytest.mark.asyncio
+async def test_reschedule_rejects_overlap_with_another_reservation_of_the_user() -> None:
+    current_slot = _slot_with(1)
+    target_slot = _slot_with(2)
+    reservation = cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))
+    reservation.slot = current_slot
+    reservation.slot_id = current_slot.id
+    repo = FakeRescheduleRepo(reservation, user_overlaps=True)
+    policy_repo = FakePolicyRepo(ShopPolicy(shop_id=1, capacity_mode=CapacityMode.SLOT, reject_user_overlap=True))
+
+    with pytest.raises(OverlappingReservationError):
+        await uc.reschedule_reservation(
+            FakeSlotRepo({1: current_slot, 2: target_slot}),
+            repo,
+            reservation_id=1,
+            user_id=1,
+            new_slot_id=2,
+            version=1,
+            policy_repo=policy_repo,
+        )
+    assert repo.excluded == [reservation.id]
+
+
+@pytest.mark.asyncio
+async def test_any_seat_rejects_a_party_above_the_shop_limit_before_querying_seats() -> None:
+    start = _utc_now_naive() + timedelta(days=3)
+    slot_repo = FakeAnySeatSlotRepo({1: _slot_with(1, starts_at=start)}, locked_elsewhere=set())
+
+    with pytest.raises(CapacityError):
+        await uc.create_reservation_any_seat(
+            slot_repo,
+            FakeRescheduleRepo(cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))),
+            hold_repo=FakeNoHoldRepo(),  # type: ignore[arg-type]
+            shop_id=1,
+            starts_at=start,
+            user_id=1,
+            party_size=5,
+            policy_repo=FakePolicyRepo(ShopPolicy(shop_id=1, max_party_size=4)),
+        )
+    assert slot_repo.lock_attempts == []
+
+
+@pytest.mark.asyncio
+async def test_any_seat_stops_at_an_overlapping_reservation() -> None:
+    start = _utc_now_naive() + timedelta(days=3)
+    slots = {slot_id: _slot_with(slot_id, starts_at=start) for slot_id in (1, 2)}
+    slot_repo = FakeAnySeatSlotRepo(slots, locked_elsewhere=set())
+    reservation = cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))
+
+    repo = FakeRescheduleRepo(reservation, user_overlaps=True)
+
+    with pytest.raises(OverlappingReservationError):
+        await uc.create_reservation_any_seat(
+            slot_repo,
+            repo,
+            hold_repo=FakeNoHoldRepo(),  # type: ignore[arg-type]
+            shop_id=1,
+            starts_at=start,
+            user_id=1,
+            party_size=2,
+            policy_repo=FakePolicyRepo(ShopPolicy(shop_id=1, reject_user_overlap=True)),
+        )
+    assert slot_repo.lock_attempts == [1]
+    assert repo.user_locks == [1]
+
+
+@pytest.mark.asyncio
+async def test_user_lock_is_taken_only_when_the_shop_rejects_overlaps() -> None:
+    start = _utc_now_naive() + timedelta(days=3)
+    slot_repo = FakeAnySeatSlotRepo({1: _slot_with(1, starts_at=start)}, locked_elsewhere=set())
+    reservation = cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED))
+
+    for reject_user_overlap, expected_locks in ((False, []), (True, [7])):
+        repo = FakeRescheduleRepo(reservation)
+        await uc.create_reservation_any_seat(
+            slot_repo,
+            repo,
+            hold_repo=FakeNoHoldRepo(),  # type: ignore[arg-type]
+            shop_id=1,
+            starts_at=start,
+            user_id=7,
+            party_size=2,
+            policy_repo=FakePolicyRepo(ShopPolicy(shop_id=1, reject_user_overlap=reject_user_overlap)),
+        )
+        assert repo.user_locks == expected_locks
+
+
+@pytest.mark.asyncio
+async def test_any_seat_stops_when_the_insert_hits_the_active_unique_key() -> None:
+    start = _utc_now_naive() + timedelta(days=3)
+    slots = {slot_id: _slot_with(slot_id, starts_at=start) for slot_id in (1, 2)}
+    slot_repo = FakeAnySeatSlotRepo(slots, locked_elsewhere=set())
+    repo = FakeRescheduleRepo(cast(Reservation, FakeReservationStruct(ReservationStatus.BOOKED)))
+    # A concurrent booking of the same user won the race: the session is now unusable.
+    repo.create_error = ActiveReservationConflictError("duplicate")
+
+    with pytest.raises(ActiveReservationConflictError):
+        await uc.create_reservation_any_seat(
+            slot_repo,
+            repo,
+            hold_repo=FakeNoHoldRepo(),  # type: ignore[arg-type]
+            shop_id=1,
+            starts_at=start,
+            user_id=1,
+            party_size=2,
+        )
+    assert slot_repo.lock_attempts == [1]
+
+
+class FakeShopCancelRepo:
+    def __init__(self, refs: list[ReservationRef]) -> None:
+        self.refs = refs
+        self.cancelled_chunks: list[list[int]] = []
+        self.expired_query: tuple[datetime, int] | None = None
+
+    async def lock_active_for_shop(
+        self,
+        shop_id: int,
+        *,
+        slot_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+        seat_id: int | None,
+    ) -> List[ReservationRef]:
+        return self.refs
+
+    async def lock_expired_pending(self, created_before: datetime, limit: int) -> List[ReservationRef]:
+        self.expired_query = (created_before, limit)
+        return self.refs[:limit]
+
+    async def bulk_cancel(self, reservation_ids: Sequence[int]) -> int:
+        self.cancelled_chunks.append(list(reservation_ids))
+        return len(reservation_ids)
+
+
+def _ref(reservation_id: int, status: ReservationStatus = ReservationStatus.BOOKED) -> ReservationRef:
+    return ReservationRef(
+        reservation_id=reservation_id,
+        slot_id=1,
+        shop_id=1,
+        user_id=reservation_id + 100,
+        party_size=2,
+        status=status,
+        version=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_cancel_shop_reservations_updates_in_chunks_and_bumps_version() -> None:
+    refs = [_ref(i) for i in range(1, 6)] + [_ref(6, ReservationStatus.REQUEST_PENDING)]
+    repo = FakeShopCancelRepo(refs)
+
+    changes = await uc.cancel_shop_reservations(repo, shop_id=1, slot_id=1, chunk_size=4)  # type: ignore[arg-type]
+
+    assert repo.cancelled_chunks == [[1, 2, 3, 4], [5, 6]]
+    assert [c.reservation_id for c in changes] == [1, 2, 3, 4, 5, 6]
+    assert all(c.status_to == ReservationStatus.CANCELLED and c.version == 4 for c in changes)
+    assert changes[-1].status_from == ReservationStatus.REQUEST_PENDING
+
+
+@pytest.mark.asyncio
+async def test_cancel_shop_reservations_requires_slot_or_range() -> None:
+    repo = FakeShopCancelRepo([])
+    with pytest.raises(ValueError):
+        await uc.cancel_shop_reservations(repo, shop_id=1, start=_utc_now_naive())  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_autocancel_expired_pending_cancels_one_bounded_batch() -> None:
+    refs = [_ref(i, ReservationStatus.REQUEST_PENDING) for i in range(1, 4)]
+    repo = FakeShopCancelRepo(refs)
+    now = _utc_now_naive()
+
+    changes = await uc.autocancel_expired_pending(
+        repo,  # type: ignore[arg-type]
+        now=now,
+        expiry=timedelta(minutes=30),
+        batch_size=2,
+    )
+
+    assert repo.expired_query == (now - timedelta(minutes=30), 2)
+    assert repo.cancelled_chunks == [[1, 2]]
+    assert [(c.status_from, c.status_to) for c in changes] == [
+        (ReservationStatus.REQUEST_PENDING, ReservationStatus.CANCELLED)
+    ] * 2
+
+
+class FakeShopPageRepo:
+    """In-memory list_shop_page with the repository's window/cursor semantics."""
+
+    def __init__(
+        self, slots: dict[int, datetime], reservations: dict[int, list[tuple[int, ReservationStatus]]]
+    ) -> None:
+        self.slots = slots
+        self.reservations = reservations
+        self.calls = 0
+
+    async def list_shop_page(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        statuses: Sequence[ReservationStatus],
+        after: ShopReservationCursor | None,
+        slot_limit: int,
+    ) -> Tuple[List[ShopReservationRow], ShopReservationCursor | None]:
+        self.calls += 1
+        window = sorted(
+            (starts_at, slot_id)
+            for slot_id, starts_at in self.slots.items()
+            if start <= starts_at < end and (after is None or _in_window(after, starts_at, slot_id))
+        )[:slot_limit]
+        rows = [
+            ShopReservationRow(
+                reservation_id=res_id,
+                slot_id=slot_id,
+                seat_id=None,
+                starts_at=starts_at,
+                ends_at=starts_at + timedelta(hours=1),
+                user_id=res_id,
+                party_size=2,
+                status=res_status,
+                version=1,
+            )
+            for starts_at, slot_id in window
+            for res_id, res_status in sorted(self.reservations.get(slot_id, []))
+            if (not statuses or res_status in statuses)
+            and (after is None or slot_id != after.slot_id or res_id > after.reservation_id)
+        ]
+        if len(window) < slot_limit:
+            return rows, None
+        return rows, ShopReservationCursor(window[-1][0], window[-1][1], MAX_RESERVATION_ID)
+
+
+def _in_window(after: ShopReservationCursor, starts_at: datetime, slot_id: int) -> bool:
+    if after.reservation_id == MAX_RESERVATION_ID:
+        return (starts_at, slot_id) > (after.starts_at, after.slot_id)
+    return (starts_at, slot_id) >= (after.starts_at, after.slot_id)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+@pytest.mark.asyncio
+async def test_list_shop_reservations_pages_through_every_row_once(limit: int) -> None:
+    day = datetime(2030, 1, 1, 1, 0)
+    slots = {slot_id: day + timedelta(hours=slot_id) for slot_id in range(1, 6)}
+    booked, cancelled = ReservationStatus.BOOKED, ReservationStatus.CANCELLED
+    # Slot 2 is cut mid-way by the limit, slot 3 has no reservations, slot 4 only a cancelled one.
+    repo = FakeShopPageRepo(
+        slots,
+        {1: [(10, booked)], 2: [(20, booked), (21, booked), (22, booked)], 4: [(40, cancelled)], 5: [(50, booked)]},
+    )
+
+    seen: list[int] = []
+    cursor: str | None = None
+    while True:
+        rows, cursor, has_more = await uc.list_shop_reservations(
+            repo,  # type: ignore[arg-type]
+            shop_id=1,
+            start=day,
+            end=day + timedelta(days=1),
+            statuses=[booked],
+            cursor=cursor,
+            limit=limit,
+        )
+        assert len(rows) <= limit
+        seen += [row.reservation_id for row in rows]
+        if not has_more:
+            break
+        assert cursor is not None
+        assert repo.calls <= 20, "pagination does not advance"
+
+    assert seen == [10, 20, 21, 22, 50]
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_list_shop_reservations_validates_range_and_cursor() -> None:
+    repo = FakeShopPageRepo({}, {})
+    day = datetime(2030, 1, 1)
+    with pytest.raises(ValueError):
+        await uc.list_shop_reservations(
+            repo,  # type: ignore[arg-type]
+            shop_id=1,
+            start=day,
+            end=day,
+            statuses=[],
+            cursor=None,
+            limit=10,
+        )
+    with pytest.raises(ValueError):
+        await uc.list_shop_reservations(
+            repo,  # type: ignore[arg-type]
+            shop_id=1,
+            start=day,
+            end=day + timedelta(days=1),
+            statuses=[],
+            cursor="not-a-cursor",
+            limit=10,
+        )
+    assert repo.calls == 0
@@ -1,8 +1,10 @@
+from dataclasses import fields
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional, Sequence
 
 import pytest
-from app.models import Slot, SlotStatus
+from app.domain.services import AvailabilityBucket, BookingPolicy
+from app.models import Reservation, ReservationStatus, ShopPolicy, Slot, SlotStatus
 from app.usecases import slots as uc
 
 
@@ -11,8 +13,10 @@ def _utc_now_naive() -> datetime:
 
 
 class FakeSlotRepo:
-    def __init__(self) -> None:
+    def __init__(self, updated: Optional[list[int]] = None) -> None:
         self.created: Optional[Slot] = None
+        self.updated = updated or []
+        self.bulk_calls: list[dict[str, Any]] = []
 
     async def create(
         self,
@@ -41,6 +45,9 @@ class FakeSlotRepo:
     async def get_for_update(self, slot_id: int) -> Slot | None:  # pragma: no cover - unused in these tests
         return None
 
+    async def lock_many_skip_locked(self, slot_ids: Sequence[int]) -> list[Slot]:  # pragma: no cover - unused
+        return []
+
     async def list_with_reserved(  # pragma: no cover - unused in these tests
         self,
         shop_id: int,
@@ -50,6 +57,100 @@ class FakeSlotRepo:
     ) -> list[tuple[Slot, int]]:
         return []
 
+    async def list_with_reserved_for_shops(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def list_overlapping_with_reserved(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def next_available(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> list[tuple[Slot, int]]:
+        return []
+
+    async def best_fit_seat_slots(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        starts_at: datetime,
+        party_size: int,
+        limit: int,
+        now: datetime,
+    ) -> list[int]:
+        return []
+
+    async def availability_buckets(  # pragma: no cover - satisfy SlotRepository when used
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> list[AvailabilityBucket]:
+        return []
+
+    async def bulk_update_status(
+        self,
+        *,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+        status: SlotStatus,
+    ) -> list[int]:
+        self.bulk_calls.append({"shop_id": shop_id, "seat_id": seat_id, "status": status})
+        return self.updated
+
+
+class FakeResRepo:
+    def __init__(self, stranded: list[tuple[Reservation, Slot]] | None = None) -> None:
+        self.stranded = stranded or []
+        self.list_called = False
+
+    async def list_active_in_range(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        seat_id: int | None,
+    ) -> list[tuple[Reservation, Slot]]:
+        self.list_called = True
+        return self.stranded
+
+
+def _slot(start: datetime) -> Slot:
+    return Slot(
+        id=1,
+        shop_id=1,
+        seat_id=None,
+        starts_at=start,
+        ends_at=start + timedelta(hours=1),
+        capacity=4,
+        status=SlotStatus.CLOSED,
+        created_at=start,
+        updated_at=start,
+    )
+
 
 @pytest.mark.asyncio
 async def test_create_slot_persists_when_valid() -> None:
@@ -85,6 +186,33 @@ async def test_create_slot_rejects_invalid_time_range() -> None:
         )
 
 
+@pytest.mark.asyncio
+async def test_create_slot_rejects_slots_longer_than_the_lookback() -> None:
+    repo = FakeSlotRepo()
+    start = _utc_now_naive()
+    with pytest.raises(ValueError):
+        await uc.create_slot(
+            repo,
+            shop_id=1,
+            seat_id=None,
+            starts_at=start,
+            ends_at=start + uc.MAX_SLOT_LENGTH + timedelta(minutes=1),
+            capacity=4,
+            status=SlotStatus.OPEN,
+        )
+
+    slot = await uc.create_slot(
+        repo,
+        shop_id=1,
+        seat_id=None,
+        starts_at=start,
+        ends_at=start + uc.MAX_SLOT_LENGTH,
+        capacity=4,
+        status=SlotStatus.OPEN,
+    )
+    assert slot is repo.created
+
+
 @pytest.mark.asyncio
 async def test_create_slot_rejects_capacity_below_one() -> None:
     repo = FakeSlotRepo()
@@ -99,3 +227,319 @@ async def test_create_slot_rejects_capacity_below_one() -> None:
             capacity=0,
             status=SlotStatus.OPEN,
         )
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_status_returns_count_without_stranded_lookup() -> None:
+    slot_repo = FakeSlotRepo(updated=[1, 2, 3, 4, 5])
+    res_repo = FakeResRepo()
+    start = _utc_now_naive()
+    updated, stranded = await uc.bulk_update_status(
+        slot_repo,
+        res_repo,  # type: ignore[arg-type]
+        shop_id=1,
+        start=start,
+        end=start + timedelta(days=1),
+        seat_id=None,
+        status=SlotStatus.CLOSED,
+    )
+    assert updated == [1, 2, 3, 4, 5]
+    assert stranded == []
+    assert res_repo.list_called is False
+    assert slot_repo.bulk_calls == [{"shop_id": 1, "seat_id": None, "status": SlotStatus.CLOSED}]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_status_lists_stranded_reservations() -> None:
+    start = _utc_now_naive()
+    slot = _slot(start)
+    reservation = Reservation(
+        id=10,
+        slot_id=slot.id,
+        user_id=2,
+        party_size=2,
+        status=ReservationStatus.BOOKED,
+        version=1,
+        created_at=start,
+        updated_at=start,
+    )
+    slot_repo = FakeSlotRepo(updated=[7])
+    res_repo = FakeResRepo(stranded=[(reservation, slot)])
+    updated, stranded = await uc.bulk_update_status(
+        slot_repo,
+        res_repo,  # type: ignore[arg-type]
+        shop_id=1,
+        start=start,
+        end=start + timedelta(days=1),
+        seat_id=None,
+        status=SlotStatus.BLOCKED,
+        include_stranded=True,
+    )
+    assert updated == [7]
+    assert stranded == [(reservation, slot)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_status_rejects_open_status() -> None:
+    start = _utc_now_naive()
+    with pytest.raises(ValueError):
+        await uc.bulk_update_status(
+            FakeSlotRepo(),
+            FakeResRepo(),  # type: ignore[arg-type]
+            shop_id=1,
+            start=start,
+            end=start + timedelta(days=1),
+            seat_id=None,
+            status=SlotStatus.OPEN,
+        )
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_status_rejects_invalid_range() -> None:
+    start = _utc_now_naive()
+    with pytest.raises(ValueError):
+        await uc.bulk_update_status(
+            FakeSlotRepo(),
+            FakeResRepo(),  # type: ignore[arg-type]
+            shop_id=1,
+            start=start,
+            end=start,
+            seat_id=None,
+            status=SlotStatus.CLOSED,
+        )
+
+
+class FakeDwellSlotRepo(FakeSlotRepo):
+    def __init__(self, rows: list[tuple[Slot, int]]) -> None:
+        super().__init__()
+        self.rows = rows
+        self.calls: list[dict[str, Any]] = []
+
+    async def list_overlapping_with_reserved(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+    ) -> list[tuple[Slot, int]]:
+        self.calls.append({"start": start, "end": end, "starts_from": starts_from})
+        return self.rows
+
+
+class FakePolicyRepo:
+    def __init__(self, policy: ShopPolicy | None) -> None:
+        self.policy = policy
+
+    async def get(self, shop_id: int) -> ShopPolicy | None:
+        return self.policy
+
+    async def get_for_update(self, shop_id: int) -> ShopPolicy | None:  # pragma: no cover
+        return self.policy
+
+    async def get_booking_policy(self, shop_id: int) -> BookingPolicy:
+        if self.policy is None:
+            return BookingPolicy()
+        # Columns a test leaves unset are None on an unsaved row: keep the defaults for them.
+        values = {f.name: getattr(self.policy, f.name) for f in fields(BookingPolicy)}
+        return BookingPolicy(**{name: value for name, value in values.items() if value is not None})
+
+    async def save(  # pragma: no cover
+        self, shop_id: int, policy: BookingPolicy, *, window_capacity: int | None
+    ) -> ShopPolicy:
+        raise NotImplementedError
+
+
+def _seat_slot(slot_id: int, start: datetime, *, capacity: int = 4) -> Slot:
+    return Slot(
+        id=slot_id,
+        shop_id=1,
+        seat_id=7,
+        starts_at=start,
+        ends_at=start + timedelta(hours=1),
+        capacity=capacity,
+        status=SlotStatus.OPEN,
+        held=0,
+        created_at=start,
+        updated_at=start,
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_dwell_uses_shop_default_and_merges_slots() -> None:
+    start = datetime(2030, 1, 1, 10, 0)
+    repo = FakeDwellSlotRepo([(_seat_slot(1, start), 1), (_seat_slot(2, start + timedelta(hours=1)), 2)])
+    policy = ShopPolicy(shop_id=1, default_dwell_minutes=90, updated_at=start)
+
+    dwell, options = await uc.search_dwell(
+        repo,
+        FakePolicyRepo(policy),
+        shop_id=1,
+        desired_start=start + timedelta(minutes=15),
+        dwell_minutes=None,
+        party_size=2,
+    )
+
+    assert dwell == 90
+    assert [(o.slot_ids, o.remaining) for o in options] == [((1, 2), 2)]
+    assert repo.calls[0]["end"] == start + timedelta(minutes=105)
+    assert repo.calls[0]["starts_from"] == start + timedelta(minutes=15) - uc.MAX_SLOT_LENGTH
+
+
+@pytest.mark.asyncio
+async def test_search_dwell_falls_back_without_policy_and_validates_input() -> None:
+    start = datetime(2030, 1, 1, 10, 0)
+    dwell, options = await uc.search_dwell(
+        FakeDwellSlotRepo([(_seat_slot(1, start), 3)]),
+        FakePolicyRepo(None),
+        shop_id=1,
+        desired_start=start,
+        dwell_minutes=None,
+        party_size=2,
+    )
+    assert (dwell, options) == (uc.DEFAULT_DWELL_MINUTES, [])
+
+    with pytest.raises(ValueError):
+        await uc.search_dwell(
+            FakeDwellSlotRepo([]),
+            FakePolicyRepo(None),
+            shop_id=1,
+            desired_start=start,
+            dwell_minutes=0,
+            party_size=2,
+        )
+
+
+class FakeNextSlotRepo(FakeSlotRepo):
+    def __init__(self, rows: list[tuple[Slot, int]]) -> None:
+        super().__init__()
+        self.rows = rows
+        self.calls: list[dict[str, Any]] = []
+
+    async def next_available(
+        self,
+        shop_id: int,
+        *,
+        after: datetime,
+        party_size: int,
+        seat_id: int | None,
+        limit: int,
+        now: datetime,
+    ) -> list[tuple[Slot, int]]:
+        self.calls.append({"after": after, "party_size": party_size, "seat_id": seat_id, "limit": limit})
+        return self.rows[:limit]
+
+
+@pytest.mark.asyncio
+async def test_next_available_returns_remaining_in_start_order() -> None:
+    start = datetime(2030, 1, 1, 10, 0)
+    slot = _seat_slot(1, start)
+    slot.held = 1
+    slot.held_until = _utc_now_naive() + timedelta(minutes=5)
+    repo = FakeNextSlotRepo([(slot, 1), (_seat_slot(2, start + timedelta(hours=1)), 0)])
+
+    rows = await uc.next_available(repo, shop_id=1, after=start, party_size=2, seat_id=7, limit=1)
+
+    assert [(row["slot"].id, row["remaining"]) for row in rows] == [(1, 2)]
+    assert repo.calls == [{"after": start, "party_size": 2, "seat_id": 7, "limit": 1}]
+
+
+@pytest.mark.asyncio
+async def test_next_available_rejects_non_positive_party_or_limit() -> None:
+    start = datetime(2030, 1, 1, 10, 0)
+    with pytest.raises(ValueError):
+        await uc.next_available(FakeNextSlotRepo([]), shop_id=1, after=start, party_size=0, seat_id=None, limit=1)
+    with pytest.raises(ValueError):
+        await uc.next_available(FakeNextSlotRepo([]), shop_id=1, after=start, party_size=1, seat_id=None, limit=0)
+
+
+class FakeHeatmapSlotRepo(FakeSlotRepo):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[dict[str, Any]] = []
+
+    async def availability_buckets(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        now: datetime,
+    ) -> list[AvailabilityBucket]:
+        self.calls.append({"start": start, "end": end, "bucket": bucket})
+        return [AvailabilityBucket(starts_at=start, capacity=8, reserved=3, bookable_slots=2)]
+
+
+@pytest.mark.asyncio
+async def test_availability_heatmap_passes_bucket_to_repository() -> None:
+    start = datetime(2030, 1, 1)
+    repo = FakeHeatmapSlotRepo()
+
+    buckets = await uc.availability_heatmap(
+        repo, shop_id=1, start=start, end=start + timedelta(days=31), bucket="hour"
+    )
+
+    assert buckets[0].bookable_slots == 2
+    assert repo.calls == [{"start": start, "end": start + timedelta(days=31), "bucket": "hour"}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("bucket", "days"),
+    [("week", 7), ("day", 0), ("day", 367)],
+)
+async def test_availability_heatmap_rejects_bad_bucket_or_range(bucket: str, days: int) -> None:
+    start = datetime(2030, 1, 1)
+    with pytest.raises(ValueError):
+        await uc.availability_heatmap(
+            FakeHeatmapSlotRepo(), shop_id=1, start=start, end=start + timedelta(days=days), bucket=bucket
+        )
+
+
+class FakeBatchSlotRepo(FakeSlotRepo):
+    def __init__(self, rows: list[tuple[Slot, int]]) -> None:
+        super().__init__()
+        self.rows = rows
+        self.calls: list[Sequence[int]] = []
+
+    async def list_with_reserved_for_shops(
+        self,
+        shop_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[Slot, int]]:
+        self.calls.append(shop_ids)
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_list_availability_for_shops_groups_open_slots_in_request_order() -> None:
+    start = datetime(2030, 1, 1, 10, 0)
+    closed = _seat_slot(3, start)
+    closed.status = SlotStatus.CLOSED
+    other_shop = _seat_slot(4, start)
+    other_shop.shop_id = 2
+    repo = FakeBatchSlotRepo([(_seat_slot(1, start), 1), (closed, 0), (other_shop, 4)])
+
+    grouped = await uc.list_availability_for_shops(
+        repo, shop_ids=[2, 1, 5, 2], start=start, end=start + timedelta(days=1)
+    )
+
+    assert list(grouped) == [2, 1, 5]
+    assert [(row["slot"].id, row["remaining"]) for row in grouped[1]] == [(1, 3)]
+    assert [(row["slot"].id, row["remaining"]) for row in grouped[2]] == [(4, 0)]
+    assert grouped[5] == []
+    assert repo.calls == [[2, 1, 5]]
+
+
+@pytest.mark.asyncio
+async def test_list_availability_for_shops_limits_batch_size() -> None:
+    start = datetime(2030, 1, 1, 10, 0)
+    with pytest.raises(ValueError):
+        await uc.list_availability_for_shops(
+            FakeBatchSlotRepo([]),
+            shop_ids=list(range(uc.MAX_BATCH_SHOPS + 1)),
+            start=start,
+            end=start + timedelta(days=1),
+        )
@@ -0,0 +1,377 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.domain.errors import CapacityError, SlotNotOpenError, WaitlistNotAllowedError
+from app.domain.services import BookingPolicy
+from app.models import CapacityMode, Reservation, ReservationStatus, ShopPolicy, Slot, SlotStatus, WaitlistEntry
+from app.usecases import waitlist as uc
+
+
+def _utc_now_naive() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _slot(capacity: int = 4, status: SlotStatus = SlotStatus.OPEN) -> Slot:
+    start = _utc_now_naive() + timedelta(days=3)
+    return Slot(
+        id=1,
+        shop_id=1,
+        seat_id=None,
+        starts_at=start,
+        ends_at=start + timedelta(hours=1),
+        capacity=capacity,
+        status=status,
+        held=0,
+        held_until=None,
+        created_at=start,
+        updated_at=start,
+    )
+
+
+class FakeSlotRepo:
+    def __init__(self, slot: Slot) -> None:
+        self.slot = slot
+
+    async def get_for_update(self, slot_id: int) -> Slot | None:
+        return self.slot if slot_id == self.slot.id else None
+
+
+class FakeResRepo:
+    def __init__(
+        self,
+        reserved: int = 0,
+        active_users: set[int] | None = None,
+        overlapping: list[tuple[datetime, datetime, int]] | None = None,
+    ) -> None:
+        self.reserved = reserved
+        self.active_users = active_users or set()
+        self.overlapping = overlapping or []
+        self.created: list[Reservation] = []
+        self.overlapping_users: set[int] = set()
+        self.user_locks: list[int] = []
+
+    async def lock_user(self, user_id: int) -> None:
+        self.user_locks.append(user_id)
+
+    async def user_has_overlapping(
+        self,
+        shop_id: int,
+        user_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> bool:
+        assert user_id in self.user_locks
+        return user_id in self.overlapping_users
+
+    async def list_overlapping_party(
+        self,
+        shop_id: int,
+        *,
+        start: datetime,
+        end: datetime,
+        starts_from: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> list[tuple[datetime, datetime, int]]:
+        return self.overlapping + [(start, end, r.party_size) for r in self.created]
+
+    async def user_has_active(self, slot_id: int, user_id: int) -> bool:
+        return user_id in self.active_users
+
+    async def sum_reserved(self, slot_id: int) -> int:
+        return self.reserved
+
+    async def create(self, slot_id: int, user_id: int, party_size: int, status: ReservationStatus) -> Reservation:
+        now = _utc_now_naive()
+        reservation = Reservation(
+            id=len(self.created) + 1,
+            slot_id=slot_id,
+            user_id=user_id,
+            party_size=party_size,
+            status=status,
+            version=1,
+            created_at=now,
+            updated_at=now,
+        )
+        self.created.append(reservation)
+        self.reserved += party_size
+        self.active_users.add(user_id)
+        return reservation
+
+
+class FakePolicyRepo:
+    def __init__(self, policy: ShopPolicy) -> None:
+        self.policy = policy
+        self.locked = 0
+
+    async def get_for_update(self, shop_id: int) -> ShopPolicy | None:
+        self.locked += 1
+        return self.policy
+
+    async def get_booking_policy(self, shop_id: int) -> BookingPolicy:
+        return BookingPolicy(
+            capacity_mode=self.policy.capacity_mode,
+            reject_user_overlap=bool(self.policy.reject_user_overlap),
+            max_party_size=self.policy.max_party_size,
+        )
+
+
+def _window_policy(capacity: int) -> FakePolicyRepo:
+    return FakePolicyRepo(ShopPolicy(shop_id=1, capacity_mode=CapacityMode.WINDOW, window_capacity=capacity))
+
+
+class FakeWaitlistRepo:
+    def __init__(self, entries: list[WaitlistEntry] | None = None) -> None:
+        self.entries = entries or []
+        self.lookups: list[int] = []
+
+    async def add(self, *, slot_id: int, user_id: int, party_size: int) -> WaitlistEntry:
+        entry = WaitlistEntry(
+            id=len(self.entries) + 1,
+            slot_id=slot_id,
+            user_id=user_id,
+            party_size=party_size,
+            created_at=_utc_now_naive(),
+        )
+        self.entries.append(entry)
+        return entry
+
+    async def earliest_fitting(self, slot_id: int, max_party_size: int) -> WaitlistEntry | None:
+        self.lookups.append(max_party_size)
+        fitting = [e for e in self.entries if e.slot_id == slot_id and e.party_size <= max_party_size]
+        return min(fitting, key=lambda e: (e.created_at, e.id), default=None)
+
+    async def remove(self, entry: WaitlistEntry) -> None:
+        self.entries.remove(entry)
+
+    async def remove_for_user(self, entry_id: int, user_id: int) -> bool:
+        for entry in self.entries:
+            if entry.id == entry_id and entry.user_id == user_id:
+                self.entries.remove(entry)
+                return True
+        return False
+
+
+def _entry(entry_id: int, user_id: int, party_size: int, minutes_ago: int) -> WaitlistEntry:
+    return WaitlistEntry(
+        id=entry_id,
+        slot_id=1,
+        user_id=user_id,
+        party_size=party_size,
+        created_at=_utc_now_naive() - timedelta(minutes=minutes_ago),
+    )
+
+
+@pytest.mark.asyncio
+async def test_join_waitlist_only_when_full() -> None:
+    waitlist_repo = FakeWaitlistRepo()
+
+    entry = await uc.join_waitlist(
+        FakeSlotRepo(_slot(capacity=4)),  # type: ignore[arg-type]
+        FakeResRepo(reserved=3),  # type: ignore[arg-type]
+        waitlist_repo,
+        slot_id=1,
+        user_id=5,
+        party_size=2,
+    )
+    assert entry.user_id == 5
+    assert len(waitlist_repo.entries) == 1
+
+    with pytest.raises(WaitlistNotAllowedError):
+        await uc.join_waitlist(
+            FakeSlotRepo(_slot(capacity=4)),  # type: ignore[arg-type]
+            FakeResRepo(reserved=2),  # type: ignore[arg-type]
+            waitlist_repo,
+            slot_id=1,
+            user_id=6,
+            party_size=2,
+        )
+
+    with pytest.raises(CapacityError):
+        await uc.join_waitlist(
+            FakeSlotRepo(_slot(capacity=4)),  # type: ignore[arg-type]
+            FakeResRepo(reserved=4),  # type: ignore[arg-type]
+            waitlist_repo,
+            slot_id=1,
+            user_id=7,
+            party_size=5,
+        )
+
+
+@pytest.mark.asyncio
+async def test_join_waitlist_rejects_closed_slot() -> None:
+    with pytest.raises(SlotNotOpenError):
+        await uc.join_waitlist(
+            FakeSlotRepo(_slot(status=SlotStatus.CLOSED)),  # type: ignore[arg-type]
+            FakeResRepo(reserved=4),  # type: ignore[arg-type]
+            FakeWaitlistRepo(),
+            slot_id=1,
+            user_id=5,
+            party_size=1,
+        )
+
+
+@pytest.mark.asyncio
+async def test_promote_waitlist_books_earliest_fitting_entries() -> None:
+    # 3 seats free: the 4-person head is skipped, then 2 + 1 fill the slot.
+    waitlist_repo = FakeWaitlistRepo(
+        [
+            _entry(1, user_id=11, party_size=4, minutes_ago=30),
+            _entry(2, user_id=12, party_size=2, minutes_ago=20),
+            _entry(3, user_id=13, party_size=2, minutes_ago=15),
+            _entry(4, user_id=14, party_size=1, minutes_ago=10),
+        ]
+    )
+    res_repo = FakeResRepo(reserved=1)
+
+    promoted = await uc.promote_waitlist(res_repo, waitlist_repo, slot=_slot(capacity=4))  # type: ignore[arg-type]
+
+    assert [r.user_id for r in promoted] == [12, 14]
+    assert all(r.status == ReservationStatus.BOOKED for r in promoted)
+    assert [e.id for e in waitlist_repo.entries] == [1, 3]
+    assert waitlist_repo.lookups == [3, 1]
+
+
+@pytest.mark.asyncio
+async def test_promote_waitlist_skips_users_already_booked() -> None:
+    waitlist_repo = FakeWaitlistRepo(
+        [
+            _entry(1, user_id=11, party_size=1, minutes_ago=30),
+            _entry(2, user_id=12, party_size=1, minutes_ago=20),
+        ]
+    )
+    res_repo = FakeResRepo(reserved=3, active_users={11})
+
+    promoted = await uc.promote_waitlist(res_repo, waitlist_repo, slot=_slot(capacity=4))  # type: ignore[arg-type]
+
+    assert [r.user_id for r in promoted] == [12]
+    assert waitlist_repo.entries == []
+
+
+@pytest.mark.asyncio
+async def test_promote_waitlist_noop_for_closed_slot() -> None:
+    waitlist_repo = FakeWaitlistRepo([_entry(1, user_id=11, party_size=1, minutes_ago=5)])
+
+    promoted = await uc.promote_waitlist(
+        FakeResRepo(),  # type: ignore[arg-type]
+        waitlist_repo,
+        slot=_slot(status=SlotStatus.CLOSED),
+    )
+
+    assert promoted == []
+    assert len(waitlist_repo.entries) == 1
+
+
+@pytest.mark.asyncio
+async def test_promote_waitlist_stops_at_the_time_window_capacity() -> None:
+    slot = _slot(capacity=10)
+    # 2 guests left on the slot after a cancel; the window allows 4 at once.
+    waitlist_repo = FakeWaitlistRepo(
+        [
+            _entry(1, user_id=11, party_size=3, minutes_ago=30),
+            _entry(2, user_id=12, party_size=2, minutes_ago=20),
+            _entry(3, user_id=13, party_size=1, minutes_ago=10),
+        ]
+    )
+    res_repo = FakeResRepo(reserved=2, overlapping=[(slot.starts_at, slot.ends_at, 2)])
+
+    promoted = await uc.promote_waitlist(
+        res_repo,  # type: ignore[arg-type]
+        waitlist_repo,
+        slot=slot,
+        policy_repo=_window_policy(4),  # type: ignore[arg-type]
+    )
+
+    # The 3-person head would exceed the window; the 2-person party fills it.
+    assert [r.user_id for r in promoted] == [12]
+    assert [e.id for e in waitlist_repo.entries] == [1, 3]
+    assert waitlist_repo.lookups == [8, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_join_waitlist_when_the_time_window_is_full() -> None:
+    slot = _slot(capacity=10)
+    # Seats are left on the slot, but overlapping slots already fill the window.
+    res_repo = FakeResRepo(reserved=2, overlapping=[(slot.starts_at, slot.ends_at, 4)])
+    waitlist_repo = FakeWaitlistRepo()
+
+    entry = await uc.join_waitlist(
+        FakeSlotRepo(slot),  # type: ignore[arg-type]
+        res_repo,  # type: ignore[arg-type]
+        waitlist_repo,
+        slot_id=1,
+        user_id=5,
+        party_size=2,
+        policy_repo=_window_policy(4),  # type: ignore[arg-type]
+    )
+    assert entry.user_id == 5
+
+    with pytest.raises(CapacityError):
+        await uc.join_waitlist(
+            FakeSlotRepo(slot),  # type: ignore[arg-type]
+            res_repo,  # type: ignore[arg-type]
+            waitlist_repo,
+            slot_id=1,
+            user_id=6,
+            party_size=5,
+            policy_repo=_window_policy(4),  # type: ignore[arg-type]
+        )
+
+
+@pytest.mark.asyncio
+async def test_promote_waitlist_drops_entries_that_overlap_when_the_shop_rejects_it() -> None:
+    waitlist_repo = FakeWaitlistRepo(
+        [
+            _entry(1, user_id=11, party_size=1, minutes_ago=30),
+            _entry(2, user_id=12, party_size=1, minutes_ago=20),
+        ]
+    )
+    res_repo = FakeResRepo(reserved=2)
+    # User 11 booked another seat at the same time while waiting.
+    res_repo.overlapping_users = {11}
+
+    promoted = await uc.promote_waitlist(
+        res_repo,  # type: ignore[arg-type]
+        waitlist_repo,
+        slot=_slot(capacity=4),
+        policy_repo=FakePolicyRepo(ShopPolicy(shop_id=1, reject_user_overlap=True)),  # type: ignore[arg-type]
+    )
+
+    assert [r.user_id for r in promoted] == [12]
+    assert waitlist_repo.entries == []
+    assert res_repo.user_locks == [11, 12]
+
+
+@pytest.mark.asyncio
+async def test_waitlist_respects_the_shop_party_limit() -> None:
+    policy_repo = FakePolicyRepo(ShopPolicy(shop_id=1, max_party_size=2))
+    with pytest.raises(CapacityError):
+        await uc.join_waitlist(
+            FakeSlotRepo(_slot(capacity=4)),  # type: ignore[arg-type]
+            FakeResRepo(reserved=4),  # type: ignore[arg-type]
+            FakeWaitlistRepo(),
+            slot_id=1,
+            user_id=5,
+            party_size=3,
+            policy_repo=policy_repo,  # type: ignore[arg-type]
+        )
+
+    # Queued before the limit was lowered: left waiting, the 2-person party is promoted.
+    waitlist_repo = FakeWaitlistRepo(
+        [
+            _entry(1, user_id=11, party_size=3, minutes_ago=30),
+            _entry(2, user_id=12, party_size=2, minutes_ago=20),
+        ]
+    )
+    promoted = await uc.promote_waitlist(
+        FakeResRepo(),  # type: ignore[arg-type]
+        waitlist_repo,
+        slot=_slot(capacity=4),
+        policy_repo=policy_repo,  # type: ignore[arg-type]
+    )
+
+    assert [r.user_id for r in promoted] == [12]
+    assert [e.id for e in waitlist_repo.entries] == [1]
+    assert waitlist_repo.lookups[0] == 2
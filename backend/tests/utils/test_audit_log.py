@@ -1,5 +1,5 @@
 import json
-from typing import Any, List
+from typing import Any, List, Sequence
 
 import pytest
 from app.models import ReservationStatus
@@ -7,7 +7,8 @@ from app.utils import audit_log
 from app.utils.request_id import set_request_id
 
 
-def test_emit_audit_log_outputs_json(monkeypatch: pytest.MonkeyPatch) -> None:
+@pytest.mark.asyncio
+async def test_emit_audit_log_outputs_json(monkeypatch: pytest.MonkeyPatch) -> None:
     messages: List[str] = []
 
     class DummyLogger:
@@ -18,7 +19,7 @@ def test_emit_audit_log_outputs_json(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(audit_log, "_audit_logger", dummy_logger)
 
     set_request_id("req-123")
-    audit_log.emit_audit_log(
+    await audit_log.emit_audit_log(
         action="reservation.created",
         initiator="user",
         reservation_id=1,
@@ -39,7 +40,8 @@ def test_emit_audit_log_outputs_json(monkeypatch: pytest.MonkeyPatch) -> None:
     assert "timestamp" in payload
 
 
-def test_emit_audit_log_raises_on_logger_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+@pytest.mark.asyncio
+async def test_emit_audit_log_raises_on_logger_failure(monkeypatch: pytest.MonkeyPatch) -> None:
     class DummyLogger:
         def info(self, _: Any) -> None:
             raise ValueError("fail")
@@ -48,7 +50,7 @@ def test_emit_audit_log_raises_on_logger_failure(monkeypatch: pytest.MonkeyPatch
     monkeypatch.setattr(audit_log, "_audit_logger", dummy_logger)
 
     with pytest.raises(RuntimeError):
-        audit_log.emit_audit_log(
+        await audit_log.emit_audit_log(
             action="reservation.cancelled",
             initiator="user",
             reservation_id=1,
@@ -60,3 +62,133 @@ def test_emit_audit_log_raises_on_logger_failure(monkeypatch: pytest.MonkeyPatch
             status_to=ReservationStatus.CANCELLED,
             version=2,
         )
+
+
+@pytest.mark.asyncio
+async def test_emit_audit_logs_writes_batch_in_one_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    messages: List[str] = []
+
+    class DummyLogger:
+        def info(self, message: str) -> None:
+            messages.append(message)
+
+    monkeypatch.setattr(audit_log, "_audit_logger", DummyLogger())
+
+    set_request_id("req-batch")
+    await audit_log.emit_audit_logs(
+        audit_log.AuditRecord(
+            action="reservation.shop_cancelled",
+            initiator="shop",
+            reservation_id=i,
+            slot_id=2,
+            shop_id=3,
+            user_id=4,
+            party_size=2,
+            status_from=ReservationStatus.BOOKED,
+            status_to=ReservationStatus.CANCELLED,
+            version=2,
+        )
+        for i in range(3)
+    )
+    assert len(messages) == 1
+    lines = [json.loads(line) for line in messages[0].split("\n")]
+    assert [line["reservation_id"] for line in lines] == [0, 1, 2]
+    assert all(line["initiator"] == "shop" and line["request_id"] == "req-batch" for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_emit_audit_logs_skips_empty_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    class DummyLogger:
+        def info(self, _: Any) -> None:  # pragma: no cover - must not be called
+            raise AssertionError("unexpected write")
+
+    monkeypatch.setattr(audit_log, "_audit_logger", DummyLogger())
+    await audit_log.emit_audit_logs([])
+
+
+@pytest.mark.asyncio
+async def test_emit_audit_logs_with_outbox_inserts_instead_of_writing(monkeypatch: pytest.MonkeyPatch) -> None:
+    class DummyLogger:
+        def info(self, _: Any) -> None:  # pragma: no cover - must not be called
+            raise AssertionError("unexpected write")
+
+    class DummyOutbox:
+        def __init__(self) -> None:
+            self.payloads: List[str] = []
+
+        async def add_many(self, payloads: Sequence[str]) -> None:
+            self.payloads.extend(payloads)
+
+    monkeypatch.setattr(audit_log, "_audit_logger", DummyLogger())
+    outbox = DummyOutbox()
+    await audit_log.emit_audit_log(
+        action="reservation.created",
+        initiator="user",
+        reservation_id=1,
+        slot_id=2,
+        shop_id=3,
+        user_id=4,
+        party_size=2,
+        status_from=None,
+        status_to=ReservationStatus.BOOKED,
+        version=1,
+        outbox=outbox,  # type: ignore[arg-type]
+    )
+    assert [json.loads(p)["reservation_id"] for p in outbox.payloads] == [1]
+
+
+@pytest.mark.asyncio
+async def test_emit_audit_logs_outbox_failure_raises_runtime_error() -> None:
+    class BrokenOutbox:
+        async def add_many(self, payloads: Sequence[str]) -> None:
+            raise ValueError("db down")
+
+    with pytest.raises(RuntimeError):
+        await audit_log.emit_audit_logs(
+            [
+                audit_log.AuditRecord(
+                    action="reservation.cancelled",
+                    initiator="user",
+                    reservation_id=1,
+                    slot_id=2,
+                    shop_id=3,
+                    user_id=4,
+                    party_size=2,
+                    status_from=ReservationStatus.BOOKED,
+                    status_to=ReservationStatus.CANCELLED,
+                    version=2,
+                )
+            ],
+            outbox=BrokenOutbox(),  # type: ignore[arg-type]
+        )
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {},
+        {"slot_id": None, "shop_id": None, "user_id": None, "party_size": None, "version": None},
+        {"status_from": ReservationStatus.BOOKED, "status_to": "cancelled"},
+        {"message": '店休日のため\n"cancel"\t\x00'},
+        {"extra": {"slot_id_from": 9, "note": "é", "skip": None, "nested": {"a": [1, None, 2.5, True]}}},
+        {"extra": {"slot_id": 99, "message": "override"}},
+        {"extra": {1: "int key"}},
+    ],
+)
+def test_fast_encoder_is_byte_identical_to_generic(overrides: dict[str, Any]) -> None:
+    fields: dict[str, Any] = {
+        "action": "reservation.cancelled",
+        "initiator": "user",
+        "reservation_id": 1,
+        "slot_id": 2,
+        "shop_id": 3,
+        "user_id": 4,
+        "party_size": 2,
+        "status_from": ReservationStatus.BOOKED,
+        "status_to": ReservationStatus.CANCELLED,
+        "version": 2,
+    }
+    record = audit_log.AuditRecord(**{**fields, **overrides})
+    for request_id in ("req-1", None):
+        kwargs: dict[str, Any] = {"timestamp": "2024-01-01T00:00:00+00:00", "request_id": request_id}
+        assert audit_log._encode(record, **kwargs) == audit_log._encode_generic(record, **kwargs)
@@ -0,0 +1,131 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+import pytest
+from app.utils import audit_lookup, audit_segments
+from app.utils.audit_segments import SegmentedAuditWriter, iter_segments, lookup
+
+
+def _line(reservation_id: int, action: str = "reservation.created", user_id: int = 7) -> str:
+    return json.dumps({"action": action, "reservation_id": reservation_id, "user_id": user_id, "shop_id": 1})
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("compression", ["gzip", "none"])
+def test_lookup_returns_history_across_rotated_segments(tmp_path: Path, compression: str) -> None:
+    clock = FakeClock()
+    writer = SegmentedAuditWriter(str(tmp_path), max_bytes=1, compression=compression, clock=clock)
+    writer("\n".join([_line(1), _line(2)]))
+    clock.now += 1
+    writer(_line(3))
+    clock.now += 1
+    writer(_line(1, action="reservation.cancelled"))
+    writer.close()
+
+    segments = list(iter_segments(str(tmp_path)))
+    assert len(segments) == 3
+    assert all(Path(f"{segment}.idx").exists() for segment in segments)
+
+    history = [json.loads(line)["action"] for line in lookup(str(tmp_path), kind="reservation_id", key=1)]
+    assert history == ["reservation.created", "reservation.cancelled"]
+    assert len(lookup(str(tmp_path), kind="user_id", key=7)) == 4
+    assert lookup(str(tmp_path), kind="reservation_id", key=99) == []
+
+
+def test_gzip_segments_stay_readable_as_plain_gzip(tmp_path: Path) -> None:
+    writer = SegmentedAuditWriter(str(tmp_path), compression="gzip")
+    writer(_line(1))
+    writer(_line(2))
+    writer.close()
+
+    (segment,) = iter_segments(str(tmp_path))
+    assert gzip.decompress(segment.read_bytes()).decode().splitlines() == [_line(1), _line(2)]
+
+
+def test_time_based_rotation(tmp_path: Path) -> None:
+    clock = FakeClock()
+    writer = SegmentedAuditWriter(str(tmp_path), max_age_seconds=60, compression="none", clock=clock)
+    writer(_line(1))
+    clock.now += 30
+    writer(_line(2))
+    clock.now += 31
+    writer(_line(3))
+    writer.close()
+
+    assert len(list(iter_segments(str(tmp_path)))) == 2
+
+
+def test_active_and_crashed_segments_are_searchable_and_sealed_on_restart(tmp_path: Path) -> None:
+    child = os.fork()
+    if child == 0:  # pragma: no cover - runs in the child
+        crashed = SegmentedAuditWriter(str(tmp_path), compression="gzip")
+        crashed(_line(5))
+        # Exit without close(): the segment only has its unsorted .pending entries.
+        os._exit(0)
+    os.waitpid(child, 0)
+    (segment,) = iter_segments(str(tmp_path))
+    assert lookup(str(tmp_path), kind="reservation_id", key=5) == [_line(5)]
+
+    restarted = SegmentedAuditWriter(str(tmp_path), compression="gzip")
+    assert Path(f"{segment}.idx").exists()
+    assert not Path(f"{segment}.pending").exists()
+    restarted(_line(5, action="reservation.cancelled"))
+    restarted.close()
+
+    assert len(lookup(str(tmp_path), kind="reservation_id", key=5)) == 2
+
+
+def test_starting_worker_leaves_live_segments_of_other_workers_alone(tmp_path: Path) -> None:
+    clock = FakeClock()
+    busy = SegmentedAuditWriter(str(tmp_path), compression="none", clock=clock, pid=100)
+    busy(_line(1))
+    idle = SegmentedAuditWriter(str(tmp_path), compression="none", clock=clock, pid=200)
+
+    SegmentedAuditWriter(str(tmp_path), compression="none", clock=clock, pid=300).close()
+
+    # Neither live segment was sealed, nor the empty one removed.
+    for live in (busy.segment, idle.segment):
+        assert live.exists()
+        assert Path(f"{live}.pending").exists()
+        assert not Path(f"{live}.idx").exists()
+    idle(_line(2))
+    busy.close()
+    idle.close()
+    assert [json.loads(line)["reservation_id"] for line in lookup(str(tmp_path), kind="user_id", key=7)] == [1, 2]
+
+
+def test_writers_opening_in_the_same_second_get_distinct_segments(tmp_path: Path) -> None:
+    clock = FakeClock()
+    first = SegmentedAuditWriter(str(tmp_path), compression="none", clock=clock, pid=100)
+    # Same pid too (e.g. a reused pid): the exclusive create moves to the next sequence number.
+    second = SegmentedAuditWriter(str(tmp_path), compression="none", clock=clock, pid=100)
+
+    assert first.segment != second.segment
+    assert first.segment.name.split("-")[2] == "100"
+    first.close()
+    second.close()
+
+
+def test_zstd_requires_optional_dependency(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(audit_segments, "zstandard", None)
+    with pytest.raises(ValueError):
+        SegmentedAuditWriter(str(tmp_path), compression="zstd")
+
+
+def test_lookup_cli_prints_matching_lines(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    writer = SegmentedAuditWriter(str(tmp_path))
+    writer("\n".join([_line(1), _line(2)]))
+    writer.close()
+
+    assert audit_lookup.main(["--dir", str(tmp_path), "--reservation-id", "2"]) == 0
+    assert capsys.readouterr().out.splitlines() == [_line(2)]
+    assert audit_lookup.main(["--dir", str(tmp_path), "--shop-id", "9"]) == 1
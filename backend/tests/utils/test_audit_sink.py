@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from app.models import ReservationStatus
+from app.utils import audit_log
+from app.utils.audit_sink import AuditSink, FileAuditWriter
+
+
+def _record(reservation_id: int) -> audit_log.AuditRecord:
+    return audit_log.AuditRecord(
+        action="reservation.created",
+        initiator="user",
+        reservation_id=reservation_id,
+        slot_id=2,
+        shop_id=3,
+        user_id=4,
+        party_size=2,
+        status_from=None,
+        status_to=ReservationStatus.BOOKED,
+        version=1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sink_batches_concurrent_submits_into_few_writes() -> None:
+    writes: list[str] = []
+    release = threading.Event()
+
+    def slow_write(payload: str) -> None:
+        release.wait(timeout=1)
+        writes.append(payload)
+
+    sink = AuditSink(slow_write)
+    sink.start()
+    # The first submit occupies the writer; the rest queue up and share one write.
+    tasks = [asyncio.create_task(sink.submit([f"line-{i}"])) for i in range(10)]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*tasks)
+    await sink.close()
+
+    assert "\n".join(writes).split("\n") == [f"line-{i}" for i in range(10)]
+    assert len(writes) <= 2
+    assert sink.records == 10
+
+
+@pytest.mark.asyncio
+async def test_sink_fails_every_submitter_of_a_failed_batch() -> None:
+    def broken_write(payload: str) -> None:
+        raise OSError("disk full")
+
+    sink = AuditSink(broken_write)
+    sink.start()
+    results = await asyncio.gather(sink.submit(["a"]), sink.submit(["b"]), return_exceptions=True)
+    await sink.close()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_sink_times_out_when_writer_stalls() -> None:
+    release = threading.Event()
+
+    def stalled_write(payload: str) -> None:
+        release.wait(timeout=1)
+
+    sink = AuditSink(stalled_write, ack_timeout=0.05)
+    sink.start()
+    with pytest.raises(RuntimeError):
+        await sink.submit(["stalled"])
+    release.set()
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_sink_rejects_submit_when_not_running() -> None:
+    with pytest.raises(RuntimeError):
+        await AuditSink(lambda payload: None).submit(["x"])
+
+
+@pytest.mark.asyncio
+async def test_emit_audit_log_goes_through_installed_sink(tmp_path: Path) -> None:
+    path = tmp_path / "audit.log"
+    writer = FileAuditWriter(str(path), fsync=True)
+    sink = AuditSink(writer)
+    sink.start()
+    audit_log.set_audit_sink(sink)
+    try:
+        await audit_log.emit_audit_logs([_record(1), _record(2)])
+    finally:
+        audit_log.set_audit_sink(None)
+        await sink.close()
+        writer.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["reservation_id"] for line in lines] == [1, 2]
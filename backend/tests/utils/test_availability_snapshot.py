@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from app.domain.services import AvailabilityDelta
+from app.models import SlotStatus
+from app.utils.availability_snapshot import SEQLOCK, AvailabilitySnapshot
+
+START = datetime(2030, 1, 1)
+NOW = 1_000_000.0
+
+
+def _delta(
+    slot_id: int,
+    hour: int,
+    *,
+    remaining: int = 4,
+    status: SlotStatus = SlotStatus.OPEN,
+    seat_id: int | None = None,
+    shop_id: int = 1,
+) -> AvailabilityDelta:
+    return AvailabilityDelta(
+        slot_id=slot_id,
+        shop_id=shop_id,
+        seat_id=seat_id,
+        starts_at=START + timedelta(hours=hour),
+        ends_at=START + timedelta(hours=hour + 1),
+        capacity=4,
+        remaining=remaining,
+        status=status,
+    )
+
+
+@pytest.fixture
+def snapshot(tmp_path: Path) -> Iterator[AvailabilitySnapshot]:
+    snap = AvailabilitySnapshot(str(tmp_path / "snap"), [1, 2], slots_per_shop=8, clock=lambda: NOW)
+    snap.open()
+    yield snap
+    snap.close()
+
+
+def _load(snap: AvailabilitySnapshot, deltas: list[AvailabilityDelta], *, seq: int = 10) -> None:
+    snap.load(1, deltas, seq=seq, covered_from=START, covered_to=START + timedelta(days=1))
+
+
+def _query(snap: AvailabilitySnapshot, *, hours: int = 24, seat_id: int | None = None) -> list[int] | None:
+    rows = snap.query(1, start=START, end=START + timedelta(hours=hours), seat_id=seat_id)
+    return None if rows is None else [row.slot_id for row in rows]
+
+
+def test_query_returns_open_slots_in_range_sorted_by_start(snapshot: AvailabilitySnapshot) -> None:
+    _load(
+        snapshot,
+        [
+            _delta(3, 5),
+            _delta(1, 1, seat_id=7),
+            _delta(2, 2, status=SlotStatus.CLOSED, remaining=0),
+            _delta(4, 10),
+        ],
+    )
+
+    assert _query(snapshot) == [1, 3, 4]
+    assert _query(snapshot, hours=6) == [1, 3]
+    assert _query(snapshot, seat_id=7) == [1]
+    rows = snapshot.query(1, start=START, end=START + timedelta(hours=2), seat_id=None)
+    assert rows == [_delta(1, 1, seat_id=7)]
+
+
+def test_query_declines_when_not_loaded_uncovered_or_stale(tmp_path: Path) -> None:
+    now = [NOW]
+    snap = AvailabilitySnapshot(str(tmp_path / "snap"), [1], max_age_seconds=30, clock=lambda: now[0])
+    snap.open()
+    try:
+        assert _query(snap) is None
+        _load(snap, [_delta(1, 1)])
+        assert snap.query(2, start=START, end=START + timedelta(hours=1), seat_id=None) is None
+        assert _query(snap, hours=48) is None
+        assert _query(snap) == [1]
+        now[0] += 31
+        assert _query(snap) is None
+    finally:
+        snap.close()
+
+
+def test_apply_updates_in_place_and_ignores_older_deltas(snapshot: AvailabilitySnapshot) -> None:
+    _load(snapshot, [_delta(1, 1), _delta(2, 2)])
+
+    snapshot.apply([_delta(1, 1, remaining=1)], seq=12)
+    snapshot.apply([_delta(1, 1, remaining=3)], seq=11)
+    snapshot.apply([_delta(9, 1, shop_id=99)], seq=13)
+
+    rows = snapshot.query(1, start=START, end=START + timedelta(days=1), seat_id=None)
+    assert rows is not None and [row.remaining for row in rows] == [1, 4]
+
+
+def test_apply_inserts_new_slots_in_order_until_the_region_is_full(snapshot: AvailabilitySnapshot) -> None:
+    _load(snapshot, [_delta(1, 1), _delta(3, 3)])
+
+    snapshot.apply([_delta(2, 2), _delta(5, 30)], seq=11)
+    assert _query(snapshot) == [1, 2, 3]
+
+    snapshot.apply([_delta(10 + hour, hour) for hour in range(4, 9)], seq=12)
+    assert _query(snapshot) == [1, 2, 3, 14, 15, 16, 17, 18]
+    snapshot.apply([_delta(20, 20)], seq=13)
+    # No room for the new slot: the region stops answering until reloaded.
+    assert _query(snapshot) is None
+
+
+def test_load_keeps_rows_updated_after_its_read(snapshot: AvailabilitySnapshot) -> None:
+    _load(snapshot, [_delta(1, 1), _delta(2, 2)])
+    snapshot.apply([_delta(1, 1, remaining=0, status=SlotStatus.CLOSED), _delta(3, 3)], seq=15)
+
+    _load(snapshot, [_delta(1, 1), _delta(2, 2, remaining=2)], seq=14)
+
+    rows = snapshot.query(1, start=START, end=START + timedelta(days=1), seat_id=None)
+    assert rows is not None and [(row.slot_id, row.remaining) for row in rows] == [(2, 2), (3, 4)]
+
+
+def test_load_truncates_to_capacity_and_narrows_coverage(snapshot: AvailabilitySnapshot) -> None:
+    _load(snapshot, [_delta(hour, hour) for hour in range(10)])
+
+    assert _query(snapshot, hours=8) == list(range(8))
+    assert _query(snapshot, hours=9) is None
+
+
+def test_writes_are_visible_to_other_processes_mapping_the_file(tmp_path: Path) -> None:
+    writer = AvailabilitySnapshot(str(tmp_path / "snap"), [1], clock=lambda: NOW)
+    reader = AvailabilitySnapshot(str(tmp_path / "snap"), [1], clock=lambda: NOW)
+    writer.open()
+    reader.open()
+    try:
+        _load(writer, [_delta(1, 1)])
+        writer.apply([_delta(1, 1, remaining=2)], seq=11)
+
+        rows = reader.query(1, start=START, end=START + timedelta(days=1), seat_id=None)
+        assert rows is not None and rows[0].remaining == 2
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_reader_gives_up_while_a_write_is_in_progress(snapshot: AvailabilitySnapshot) -> None:
+    _load(snapshot, [_delta(1, 1)])
+    snapshot._set_field(0, SEQLOCK, snapshot._field(0, SEQLOCK) + 1)
+
+    assert _query(snapshot) is None
+
+    # The next writer finishes what a crashed one left odd.
+    snapshot.apply([_delta(1, 1, remaining=2)], seq=11)
+    assert _query(snapshot) == [1]
+
+
+def test_another_layout_gets_its_own_file_and_leaves_mapped_workers_alone(tmp_path: Path) -> None:
+    path = str(tmp_path / "snap")
+    first = AvailabilitySnapshot(path, [1], clock=lambda: NOW)
+    first.open()
+    _load(first, [_delta(1, 1)])
+
+    other = AvailabilitySnapshot(path, [1, 2], clock=lambda: NOW)
+    other.open()
+    try:
+        assert other.file_path != first.file_path
+        assert _query(other) is None
+        # The worker still on the old configuration keeps its mapping and its rows.
+        assert _query(first) == [1]
+    finally:
+        other.close()
+        first.close()
+
+    same = AvailabilitySnapshot(path, [1], clock=lambda: NOW)
+    same.open()
+    assert _query(same) == [1]
+    same.close()
+
+
+def test_damaged_file_is_declined_and_rebuilt_aside(tmp_path: Path) -> None:
+    path = str(tmp_path / "snap")
+    first = AvailabilitySnapshot(path, [1], clock=lambda: NOW)
+    first.open()
+    _load(first, [_delta(1, 1)])
+    with open(first.file_path, "r+b") as handle:
+        handle.write(b"garbage!")
+
+    assert _query(first) is None
+
+    rebuilt = AvailabilitySnapshot(path, [1], clock=lambda: NOW)
+    rebuilt.open()
+    try:
+        assert _query(rebuilt) is None
+        _load(rebuilt, [_delta(2, 2)])
+        assert _query(rebuilt) == [2]
+        # The replaced inode is still mapped by the first worker, untouched by the rebuild.
+        assert _query(first) is None
+    finally:
+        rebuilt.close()
+        first.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [Path(rebuilt.file_path).name]
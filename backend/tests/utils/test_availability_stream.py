@@ -0,0 +1,106 @@
+import json
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import pytest
+from app.domain.services import AvailabilityDelta
+from app.models import SlotStatus
+from app.utils.availability_stream import KEEPALIVE_FRAME, RETRY_FRAME, AvailabilityHub, Subscription
+
+START = datetime(2030, 1, 1, 0, 0)
+
+
+def _delta(slot_id: int, *, shop_id: int = 1, hours: int = 0, remaining: int = 2) -> AvailabilityDelta:
+    starts_at = START + timedelta(hours=hours)
+    return AvailabilityDelta(
+        slot_id=slot_id,
+        shop_id=shop_id,
+        seat_id=None,
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(hours=1),
+        capacity=4,
+        remaining=remaining,
+        status=SlotStatus.OPEN,
+    )
+
+
+def _pending(subscription: Subscription) -> list[bytes]:
+    return list(subscription._frames)
+
+
+def test_publish_shares_one_frame_across_matching_subscribers() -> None:
+    hub = AvailabilityHub()
+    first = hub.subscribe(1, start=START, end=START + timedelta(days=1))
+    second = hub.subscribe(1, start=START, end=START + timedelta(days=1))
+    out_of_range = hub.subscribe(1, start=START + timedelta(days=1), end=START + timedelta(days=2))
+    other_shop = hub.subscribe(2, start=START, end=START + timedelta(days=1))
+
+    hub.publish([_delta(10, remaining=1)], seq=42)
+
+    assert _pending(first)[0] is _pending(second)[0]
+    assert _pending(out_of_range) == [] and _pending(other_shop) == []
+    assert hub.published == 1
+    frame = _pending(first)[0].decode()
+    assert frame.startswith("id: 42\nevent: availability\ndata: ")
+    data = json.loads(frame.split("data: ", 1)[1])
+    assert (data["slot_id"], data["remaining"], data["seq"]) == (10, 1, 42)
+    assert data["starts_at"] == "2030-01-01T09:00:00+09:00"
+
+
+def test_slow_subscriber_is_dropped_without_blocking_others() -> None:
+    hub = AvailabilityHub(max_pending=2)
+    slow = hub.subscribe(1, start=START, end=START + timedelta(days=1))
+
+    hub.publish([_delta(1), _delta(2), _delta(3)], seq=1)
+
+    assert slow.closed
+    assert hub.dropped == 1
+    assert not hub.has_subscribers(1)
+
+
+def test_listeners_receive_every_publish_for_their_shops() -> None:
+    class Listener:
+        def __init__(self) -> None:
+            self.applied: list[tuple[list[int], int]] = []
+
+        def covers(self, shop_id: int) -> bool:
+            return shop_id == 1
+
+        def apply(self, deltas: Sequence[AvailabilityDelta], *, seq: int) -> None:
+            self.applied.append(([delta.slot_id for delta in deltas], seq))
+
+    hub = AvailabilityHub()
+    listener = Listener()
+    hub.add_listener(listener)
+
+    assert hub.has_subscribers(1) and not hub.has_subscribers(2)
+    hub.publish(iter([_delta(10), _delta(11)]), seq=7)
+
+    assert listener.applied == [([10, 11], 7)]
+    assert hub.published == 0
+
+
+def test_heartbeat_reaches_every_subscriber() -> None:
+    hub = AvailabilityHub()
+    subs = [hub.subscribe(shop_id, start=START, end=START + timedelta(days=1)) for shop_id in (1, 2)]
+
+    hub.heartbeat()
+
+    assert all(_pending(sub) == [KEEPALIVE_FRAME] for sub in subs)
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_first_frame_then_batches_and_unsubscribes() -> None:
+    hub = AvailabilityHub()
+    subscription = hub.subscribe(1, start=START, end=START + timedelta(days=1))
+    body = hub.stream(subscription, first=b"snapshot\n\n")
+
+    assert await body.__anext__() == RETRY_FRAME + b"snapshot\n\n"
+    hub.publish([_delta(1), _delta(2)], seq=5)
+    chunk = await body.__anext__()
+    assert chunk.count(b"event: availability") == 2
+
+    hub.close()
+    with pytest.raises(StopAsyncIteration):
+        await body.__anext__()
+    assert hub.subscribers == 0
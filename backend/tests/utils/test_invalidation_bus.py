@@ -0,0 +1,118 @@
+import asyncio
+import socket
+from pathlib import Path
+
+import pytest
+from app.utils.invalidation_bus import (
+    InvalidatingCache,
+    InvalidationBus,
+    decode_invalidations,
+    encode_invalidations,
+)
+
+
+def test_datagram_round_trip() -> None:
+    entries = [("shop", 1), ("slot", 2**40), ("user", 7)]
+    assert decode_invalidations(encode_invalidations(123, entries)) == (123, entries)
+
+
+def test_local_only_bus_dispatches_in_process() -> None:
+    seen: list[tuple[str, int]] = []
+    bus = InvalidationBus()
+    bus.subscribe(lambda kind, key: seen.append((kind, key)))
+    bus.start()
+
+    bus.publish([("slot", 1), ("slot", 1), ("user", 2)])
+
+    assert seen == [("slot", 1), ("user", 2)]
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_other_workers_but_not_itself(tmp_path: Path) -> None:
+    sender = InvalidationBus(str(tmp_path), pid=1)
+    receiver = InvalidationBus(str(tmp_path), pid=2)
+    sent: list[tuple[str, int]] = []
+    received: list[tuple[str, int]] = []
+    sender.subscribe(lambda kind, key: sent.append((kind, key)))
+    receiver.subscribe(lambda kind, key: received.append((kind, key)))
+    sender.start()
+    receiver.start()
+    try:
+        sender.publish([("shop", 10), ("slot", 20)])
+        for _ in range(100):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        sender.close()
+        receiver.close()
+
+    assert sent == [("shop", 10), ("slot", 20)]
+    assert received == [("shop", 10), ("slot", 20)]
+    assert (sender.sent, receiver.received) == (1, 1)
+    assert not list(tmp_path.glob("*.sock"))
+
+
+@pytest.mark.asyncio
+async def test_socket_of_exited_worker_is_removed(tmp_path: Path) -> None:
+    stale = tmp_path / "999.sock"
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead.bind(str(stale))
+    dead.close()
+    bus = InvalidationBus(str(tmp_path), pid=1)
+    bus.start()
+    try:
+        bus.publish([("shop", 1)])
+    finally:
+        bus.close()
+
+    assert not stale.exists()
+
+
+def test_cache_expires_after_ttl_and_on_invalidation() -> None:
+    now = [0.0]
+    cache: InvalidatingCache[int, str] = InvalidatingCache("shop", ttl_seconds=30, clock=lambda: now[0])
+    cache.put(1, "a")
+    cache.put(2, "b")
+
+    cache.handle("slot", 1)
+    assert cache.get(1) == "a"
+    cache.handle("shop", 1)
+    assert cache.get(1) is None
+
+    now[0] = 30.0
+    assert cache.get(2) is None
+
+
+def test_cache_maps_composite_keys_to_bus_keys() -> None:
+    cache: InvalidatingCache[tuple[int, str], int] = InvalidatingCache(
+        "shop", ttl_seconds=30, key_of=lambda key: key[0]
+    )
+    cache.put((1, "2030-01-01"), 1)
+    cache.put((1, "2030-01-02"), 2)
+    cache.put((2, "2030-01-01"), 3)
+
+    cache.handle("shop", 1)
+
+    assert cache.get((1, "2030-01-01")) is None and cache.get((1, "2030-01-02")) is None
+    assert cache.get((2, "2030-01-01")) == 3
+
+
+def test_cache_put_is_skipped_after_an_invalidation_during_the_fill() -> None:
+    cache: InvalidatingCache[tuple[int, str], int] = InvalidatingCache(
+        "shop", ttl_seconds=30, key_of=lambda key: key[0]
+    )
+    generation = cache.generation((1, "2030-01-01"))
+    cache.handle("shop", 2)
+    cache.put((1, "2030-01-01"), 1, generation=generation)
+    assert cache.get((1, "2030-01-01")) == 1
+
+    generation = cache.generation((1, "2030-01-02"))
+    cache.handle("shop", 1)
+    cache.put((1, "2030-01-02"), 2, generation=generation)
+    assert cache.get((1, "2030-01-02")) is None
+
+    generation = cache.generation((2, "2030-01-01"))
+    cache.clear()
+    cache.put((2, "2030-01-01"), 3, generation=generation)
+    assert cache.get((2, "2030-01-01")) is None
@@ -0,0 +1,58 @@
+from app.domain.services import NO_SEAT, OccupancyColumns
+from app.utils.occupancy import occupancy_grid
+
+HOUR = 3600
+START = 1_893_456_000  # 2030-01-01T00:00:00Z, 09:00 JST
+
+
+def _columns(
+    slots: list[tuple[int, int, int, int]],
+    reservations: list[tuple[int, int, int, int]],
+) -> OccupancyColumns:
+    slot_cols = list(zip(*slots)) if slots else [(), (), (), ()]
+    res_cols = list(zip(*reservations)) if reservations else [(), (), (), ()]
+    return OccupancyColumns(*slot_cols, *res_cols)
+
+
+def test_grid_accumulates_reservations_over_open_capacity_per_seat_and_bucket() -> None:
+    columns = _columns(
+        slots=[
+            (1, START, START + 2 * HOUR, 4),
+            (1, START + 2 * HOUR, START + 4 * HOUR, 4),
+            (NO_SEAT, START + HOUR, START + 3 * HOUR, 2),
+        ],
+        reservations=[
+            (1, START, START + 2 * HOUR, 2),
+            (1, START + 2 * HOUR, START + 4 * HOUR, 4),
+            (NO_SEAT, START + HOUR, START + 3 * HOUR, 1),
+        ],
+    )
+
+    grid = occupancy_grid(columns, start=START, end=START + 4 * HOUR, bucket_seconds=2 * HOUR)
+
+    assert grid.seats == [None, 1]
+    assert grid.bucket_starts == [START, START + 2 * HOUR]
+    assert grid.occupancy == [[50.0, 50.0], [50.0, 100.0]]
+    assert grid.seat_utilization == [50.0, 75.0]
+    # Hours of day in JST: 09:00-13:00.
+    assert grid.hour_utilization[9:13] == [50.0, 50.0, 83.3, 100.0]
+    assert grid.hour_utilization[13] is None
+
+
+def test_grid_clips_intervals_to_the_range_and_handles_overlaps() -> None:
+    columns = _columns(
+        slots=[(5, START - HOUR, START + HOUR, 4), (5, START, START + HOUR, 4)],
+        reservations=[(5, START - HOUR, START + HOUR, 4), (5, START, START + HOUR, 2)],
+    )
+
+    grid = occupancy_grid(columns, start=START, end=START + HOUR + HOUR // 2, bucket_seconds=HOUR)
+
+    assert grid.bucket_starts == [START, START + HOUR]
+    assert grid.occupancy == [[75.0, None]]
+
+
+def test_grid_without_rows_is_empty() -> None:
+    grid = occupancy_grid(_columns([], []), start=START, end=START + HOUR, bucket_seconds=HOUR)
+
+    assert (grid.seats, grid.occupancy, grid.bucket_starts) == ([], [], [START])
+    assert all(value is None for value in grid.hour_utilization)
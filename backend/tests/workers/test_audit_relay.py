@@ -0,0 +1,81 @@
+import json
+from datetime import datetime
+from typing import Sequence, cast
+
+import pytest
+from app.models import AuditOutbox
+from app.workers import audit_relay as worker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class DummySession:
+    async def __aenter__(self) -> "DummySession":
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> bool:
+        return False
+
+    def begin(self) -> "DummySession":
+        return self
+
+
+class FakeOutbox:
+    rows: list[AuditOutbox] = []
+    shipped: list[int] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def lock_unshipped(self, limit: int) -> list[AuditOutbox]:
+        return [row for row in FakeOutbox.rows if row.id not in FakeOutbox.shipped][:limit]
+
+    async def mark_shipped(self, ids: Sequence[int], shipped_at: datetime) -> int:
+        FakeOutbox.shipped.extend(ids)
+        return len(ids)
+
+
+@pytest.fixture(autouse=True)
+def _outbox(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeOutbox.rows = [
+        AuditOutbox(id=i, payload=json.dumps({"action": "reservation.created", "reservation_id": i}))
+        for i in range(1, 4)
+    ]
+    FakeOutbox.shipped = []
+    monkeypatch.setattr(worker, "SqlAlchemyAuditOutboxRepository", FakeOutbox)
+
+
+def _relay(shipped_lines: list[str], *, fail: bool = False) -> worker.AuditRelay:
+    async def ship(lines: Sequence[str]) -> None:
+        if fail:
+            raise RuntimeError("sink down")
+        shipped_lines.extend(lines)
+
+    return worker.AuditRelay(
+        cast(async_sessionmaker[AsyncSession], DummySession),
+        ship,
+        batch_size=2,
+        interval_seconds=1.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_once_ships_batch_with_outbox_id_and_marks_rows() -> None:
+    lines: list[str] = []
+    relay = _relay(lines)
+
+    assert await relay.run_once() == 2
+    assert await relay.run_once() == 1
+    assert await relay.run_once() == 0
+
+    payloads = [json.loads(line) for line in lines]
+    assert [(p["reservation_id"], p["outbox_id"]) for p in payloads] == [(1, 1), (2, 2), (3, 3)]
+    assert FakeOutbox.shipped == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_run_once_leaves_rows_unshipped_when_sink_fails() -> None:
+    relay = _relay([], fail=True)
+
+    with pytest.raises(RuntimeError):
+        await relay.run_once()
+    assert FakeOutbox.shipped == []
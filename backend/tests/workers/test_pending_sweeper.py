@@ -0,0 +1,107 @@
+from datetime import timedelta
+from typing import Any, Iterable, cast
+
+import pytest
+from app.domain.services import ChangeEvent, ReservationStatusChange
+from app.models import ReservationStatus
+from app.utils.audit_log import AuditRecord
+from app.workers import pending_sweeper as worker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class DummySession:
+    async def __aenter__(self) -> "DummySession":
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> bool:
+        return False
+
+    def begin(self) -> "DummySession":
+        return self
+
+
+class DummyChangeLogRepo:
+    events: list[ChangeEvent] = []
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def append(self, events: Iterable[ChangeEvent]) -> dict[int, int]:
+        DummyChangeLogRepo.events.extend(events)
+        return {event.shop_id: len(DummyChangeLogRepo.events) for event in DummyChangeLogRepo.events}
+
+
+def _sweeper(batch_size: int = 2) -> worker.PendingSweeper:
+    return worker.PendingSweeper(
+        cast(async_sessionmaker[AsyncSession], DummySession),
+        expiry=timedelta(minutes=30),
+        batch_size=batch_size,
+        rate_per_second=100.0,
+        interval_seconds=30.0,
+    )
+
+
+def _change(reservation_id: int) -> ReservationStatusChange:
+    return ReservationStatusChange(
+        reservation_id=reservation_id,
+        slot_id=1,
+        shop_id=1,
+        user_id=5,
+        party_size=2,
+        status_from=ReservationStatus.REQUEST_PENDING,
+        status_to=ReservationStatus.CANCELLED,
+        version=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_once_emits_system_audit_and_tracks_throughput(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_autocancel(*args: object, **kwargs: Any) -> list[ReservationStatusChange]:
+        assert kwargs["batch_size"] == 2
+        return [_change(1), _change(2)]
+
+    batches: list[list[AuditRecord]] = []
+    monkeypatch.setattr(worker, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(worker.reservation_usecase, "autocancel_expired_pending", fake_autocancel)  # type: ignore[attr-defined]
+
+    async def fake_emit(records: Any, **kwargs: Any) -> None:
+        batches.append(list(records))
+
+    monkeypatch.setattr(worker, "emit_audit_logs", fake_emit)
+    monkeypatch.setattr(worker, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    DummyChangeLogRepo.events = []
+
+    sweeper = _sweeper()
+    processed = await sweeper.run_once()
+
+    assert processed == 2
+    assert len(batches) == 1
+    assert {(r.action, r.initiator) for r in batches[0]} == {("reservation.autocancelled", "system")}
+    assert [(e.entity_id, e.action) for e in DummyChangeLogRepo.events] == [(1, "autocancelled"), (2, "autocancelled")]
+    assert sweeper.stats.cancelled_total == 2
+    assert sweeper.stats.batches == 1
+    assert sweeper.stats.throughput_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_run_once_propagates_audit_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_autocancel(*args: object, **kwargs: object) -> list[ReservationStatusChange]:
+        return [_change(1)]
+
+    async def fail_emit(records: Any, **kwargs: Any) -> None:
+        raise RuntimeError("fail log")
+
+    monkeypatch.setattr(worker, "SqlAlchemyReservationRepository", lambda s: s)
+    monkeypatch.setattr(worker.reservation_usecase, "autocancel_expired_pending", fake_autocancel)  # type: ignore[attr-defined]
+    monkeypatch.setattr(worker, "emit_audit_logs", fail_emit)
+
+    sweeper = _sweeper()
+    with pytest.raises(RuntimeError):
+        await sweeper.run_once()
+    assert sweeper.stats.cancelled_total == 0
+
+
+def test_next_delay_paces_full_batches_and_idles_otherwise() -> None:
+    sweeper = _sweeper(batch_size=50)
+    assert sweeper.next_delay(50) == pytest.approx(0.5)
+    assert sweeper.next_delay(10) == 30.0
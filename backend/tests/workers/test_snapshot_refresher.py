@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from app.domain.services import AvailabilityDelta
+from app.models import SlotStatus
+from app.utils.availability_snapshot import AvailabilitySnapshot
+from app.workers import snapshot_refresher as worker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class DummySession:
+    async def __aenter__(self) -> "DummySession":
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> bool:
+        return False
+
+    def begin(self) -> "DummySession":
+        return self
+
+
+class DummyChangeLogRepo:
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def last_seq(self, shop_id: int) -> int:
+        return 40 + shop_id
+
+
+@pytest.mark.asyncio
+async def test_run_once_loads_stale_shops_only(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    loaded: list[int] = []
+
+    async def fake_window(*args: object, **kwargs: Any) -> list[AvailabilityDelta]:
+        loaded.append(kwargs["shop_id"])
+        starts_at = now + timedelta(hours=1)
+        return [
+            AvailabilityDelta(
+                slot_id=kwargs["shop_id"] * 10,
+                shop_id=kwargs["shop_id"],
+                seat_id=None,
+                starts_at=starts_at,
+                ends_at=starts_at + timedelta(hours=1),
+                capacity=4,
+                remaining=3,
+                status=SlotStatus.OPEN,
+            )
+        ]
+
+    monkeypatch.setattr(worker, "SqlAlchemyChangeLogRepository", DummyChangeLogRepo)
+    monkeypatch.setattr(worker, "SqlAlchemySlotRepository", lambda session: session)
+    monkeypatch.setattr(worker.slot_usecase, "availability_window", fake_window)  # type: ignore[attr-defined]
+    snapshot = AvailabilitySnapshot(str(tmp_path / "snap"), [1, 2])
+    snapshot.open()
+    refresher = worker.SnapshotRefresher(
+        cast(async_sessionmaker[AsyncSession], DummySession),
+        snapshot,
+        horizon_days=7,
+        interval_seconds=5.0,
+    )
+    try:
+        assert await refresher.run_once() == 2
+        assert await refresher.run_once() == 0
+
+        rows = snapshot.query(2, start=now, end=now + timedelta(days=1), seat_id=None)
+        assert rows is not None and [(row.slot_id, row.remaining) for row in rows] == [(20, 3)]
+        assert loaded == [1, 2]
+    finally:
+        snapshot.close()